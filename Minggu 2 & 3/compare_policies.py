@@ -0,0 +1,78 @@
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from simcore.replication import replication_seeds
+from simcore.stats import OnlineStats
+import simulasi_2_server as ali_first
+import simulasi_2_server_random_ali_badu as random_tie_break
+
+POLICIES = {"Ali first": ali_first, "Random tie-break": random_tie_break}
+COMPARED_METRICS = ["average_waiting_time", "average_idle_time", "ali_idle_time", "badu_idle_time"]
+
+
+def policy_metrics(policy, num_customers, arrival_rolls, service_rolls, rng):
+    summary, ali_count, badu_count, idle_time = policy.simulate_customers(num_customers, arrival_rolls, service_rolls,
+                                                                         output="summary", rng=rng)
+    simulation_report = policy.report_metrics(policy.report(summary, num_customers, ali_count, badu_count,
+                                                            idle_time))
+    metrics = dict(zip(policy.REPORT_METRICS, simulation_report))
+    return np.array([metrics[name] for name in COMPARED_METRICS], dtype=float)
+
+
+def compare_policies(num_customers, num_simulations, seed=None):
+    """Run both dispatch policies on common random numbers.
+
+    Every simulation draws one arrival and one service roll per customer and
+    feeds the same rolls to both policies, so the difference between them
+    is only the dispatch rule. Random tie-breaks come from a
+    ``random.Random`` seeded per simulation, the global ``random`` is left
+    alone. Returns OnlineStats of each policy
+    and of the paired differences (random tie-break minus Ali first).
+    """
+    stats = {name: OnlineStats(COMPARED_METRICS) for name in POLICIES}
+    differences = OnlineStats(COMPARED_METRICS)
+
+    for seed_sequence in replication_seeds(num_simulations, seed):
+        rng = np.random.default_rng(seed_sequence)
+        arrival_rolls = rng.integers(1, 101, num_customers).tolist()
+        service_rolls = rng.integers(1, 101, num_customers).tolist()
+        tie_break_seed = int(rng.integers(2**32))
+
+        results = {name: policy_metrics(policy, num_customers, arrival_rolls, service_rolls,
+                                        random.Random(tie_break_seed))
+                   for name, policy in POLICIES.items()}
+        for name, result in results.items():
+            stats[name].update(result)
+        differences.update(results["Random tie-break"] - results["Ali first"])
+
+    return stats, differences
+
+
+def print_comparison(stats, differences):
+    print(f"Paired comparison over {differences.count} simulations (mean ± 95% confidence half-width)")
+    for name in POLICIES:
+        print(f"{name}:")
+        for metric, (mean, half_width) in stats[name].summary().items():
+            print(f"  {metric}: {mean} ± {half_width}")
+
+    # Half-width the same number of independent runs would give
+    unpaired_half_width = np.sqrt(sum(policy_stats.half_width() ** 2 for policy_stats in stats.values()))
+    print("Random tie-break minus Ali first:")
+    for metric, (mean, half_width), unpaired in zip(differences.names, differences.summary().values(),
+                                                    unpaired_half_width):
+        print(f"  {metric}: {mean} ± {half_width} (independent runs: ± {unpaired})")
+
+
+def main():
+    customers_number = input("Select number of Customers: ")
+    num_simulations = input("How many simulations? ")
+    stats, differences = compare_policies(int(customers_number), int(num_simulations))
+    print_comparison(stats, differences)
+
+if __name__ == '__main__':
+    main()
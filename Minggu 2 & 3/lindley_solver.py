@@ -0,0 +1,110 @@
+import numpy as np
+
+from simulasi import ARRIVAL_DIST, SERVICE_DIST
+
+
+def distribution_pmf(distribution):
+    # Dense PMF indexed by value, values must be non-negative integers
+    pmf = np.zeros(max(distribution.values) + 1)
+    np.add.at(pmf, np.asarray(distribution.values), distribution.probabilities)
+    return pmf
+
+
+def increment_pmf(arrival_dist=ARRIVAL_DIST, service_dist=SERVICE_DIST):
+    """PMF of U = S - A, returned with the smallest value of its support."""
+    arrival_pmf = distribution_pmf(arrival_dist)
+    service_pmf = distribution_pmf(service_dist)
+    return np.convolve(service_pmf, arrival_pmf[::-1]), -(len(arrival_pmf) - 1)
+
+
+def lindley_step(waiting_pmf, u_pmf, u_min):
+    """One step of W' = max(0, W + U) on PMFs.
+
+    Returns the PMF of W' and the expected idle time max(0, -(W + U)) the
+    clipping stands for.
+    """
+    total = np.convolve(waiting_pmf, u_pmf)
+    values = np.arange(len(total)) + u_min
+    clipped = values <= 0
+    next_pmf = total[-u_min:].copy() if u_min < 0 else np.concatenate([np.zeros(u_min), total])
+    next_pmf[0] = total[clipped].sum()
+    idle_time = -(values[clipped] * total[clipped]).sum()
+    return next_pmf, idle_time
+
+
+def finite_horizon(num_customers, arrival_dist=ARRIVAL_DIST, service_dist=SERVICE_DIST):
+    """Exact waiting-time distribution of each of the first ``num_customers``.
+
+    The first customer arrives at an idle server. ``average_idle_time`` and
+    ``average_waiting_time`` are the expectations of the report() figures
+    (total idle and last customer's wait, divided by the number of customers).
+    """
+    u_pmf, u_min = increment_pmf(arrival_dist, service_dist)
+    waiting_pmfs = [np.ones(1)]
+    idle_times = [0.0]
+    for _ in range(num_customers - 1):
+        waiting_pmf, idle_time = lindley_step(waiting_pmfs[-1], u_pmf, u_min)
+        waiting_pmfs.append(waiting_pmf)
+        idle_times.append(idle_time)
+
+    mean_waits = np.array([pmf @ np.arange(len(pmf)) for pmf in waiting_pmfs])
+    return {
+        'waiting_pmfs': waiting_pmfs,
+        'mean_waits': mean_waits,
+        'mean_wait': mean_waits.mean(),
+        'idle_times': np.array(idle_times),
+        'average_idle_time': sum(idle_times) / num_customers,
+        'average_waiting_time': mean_waits[-1] / num_customers
+    }
+
+
+def steady_state(arrival_dist=ARRIVAL_DIST, service_dist=SERVICE_DIST, tol=1e-12, max_iterations=100000):
+    """Stationary waiting-time distribution, iterating the recursion until the
+    PMF changes by less than ``tol`` (L1). The tail below ``tol`` is dropped
+    on every step so the support stays bounded.
+
+    The server is idle a fraction 1 - E[S] / E[A] of the time and for
+    E[A] - E[S] per customer on average.
+    """
+    if service_dist.mean >= arrival_dist.mean:
+        raise ValueError("The queue has no steady state unless E[S] < E[A]")
+
+    u_pmf, u_min = increment_pmf(arrival_dist, service_dist)
+    waiting_pmf = np.ones(1)
+    for iteration in range(1, max_iterations + 1):
+        next_pmf, idle_time = lindley_step(waiting_pmf, u_pmf, u_min)
+        tail = np.cumsum(next_pmf[::-1])[::-1]
+        next_pmf = next_pmf[:max(1, np.count_nonzero(tail >= tol))]
+
+        size = max(len(next_pmf), len(waiting_pmf))
+        change = np.abs(np.pad(next_pmf, (0, size - len(next_pmf)))
+                        - np.pad(waiting_pmf, (0, size - len(waiting_pmf)))).sum()
+        waiting_pmf = next_pmf
+        if change < tol:
+            break
+
+    return {
+        'waiting_pmf': waiting_pmf,
+        'mean_wait': waiting_pmf @ np.arange(len(waiting_pmf)),
+        'probability_no_wait': waiting_pmf[0],
+        'idle_time_per_customer': idle_time,
+        'idle_fraction': 1 - service_dist.mean / arrival_dist.mean,
+        'iterations': iteration
+    }
+
+
+if __name__ == '__main__':
+    customers_number = int(input("Select number of Customers: "))
+
+    finite = finite_horizon(customers_number)
+    print(f"Exact results for the first {customers_number} customers: ")
+    print(f"Mean Waiting Time per Customer: {finite['mean_wait']}")
+    print(f"Expected Average Idle Time (report): {finite['average_idle_time']}")
+    print(f"Expected Average Waiting Time (report): {finite['average_waiting_time']}")
+
+    steady = steady_state()
+    print(f"Steady state (after {steady['iterations']} iterations): ")
+    print(f"Mean Waiting Time: {steady['mean_wait']}")
+    print(f"Probability of not waiting: {steady['probability_no_wait']}")
+    print(f"Idle Time per Customer: {steady['idle_time_per_customer']}")
+    print(f"Server Idle Fraction: {steady['idle_fraction']}")
@@ -0,0 +1,235 @@
+import heapq
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from simcore.distributions import DiscreteDistribution
+
+
+class Server:
+    def __init__(self, index, name, service_dist):
+        self.index = index
+        self.name = name
+        self.service_dist = service_dist
+        self.expected_service_time = service_dist.mean
+        self.available_time = 0
+        self.busy_time = 0
+        self.idle_time = 0
+        self.count = 0
+
+
+# Pools of servers a policy picks from, either the idle servers or the ones
+# that are free first when everybody is busy
+class KeyedPool:
+    def __init__(self, key):
+        self.key = key
+        self.heap = []
+
+    def push(self, server):
+        heapq.heappush(self.heap, (self.key(server), server.index, server))
+
+    def pop(self, rng):
+        return heapq.heappop(self.heap)[2]
+
+    def drain(self):
+        servers = [entry[2] for entry in self.heap]
+        self.heap = []
+        return servers
+
+    def __len__(self):
+        return len(self.heap)
+
+
+class RandomPool:
+    def __init__(self):
+        self.servers = []
+
+    def push(self, server):
+        self.servers.append(server)
+
+    def pop(self, rng):
+        # Swap the pick with the last server, O(1)
+        i = rng.randrange(len(self.servers))
+        self.servers[i], self.servers[-1] = self.servers[-1], self.servers[i]
+        return self.servers.pop()
+
+    def drain(self):
+        servers, self.servers = self.servers, []
+        return servers
+
+    def __len__(self):
+        return len(self.servers)
+
+
+POLICIES = {
+    "first-listed": lambda: KeyedPool(lambda server: server.index),
+    "random": RandomPool,
+    "fastest-expected": lambda: KeyedPool(lambda server: server.expected_service_time),
+    "least-busy": lambda: KeyedPool(lambda server: server.busy_time)
+}
+
+
+def make_servers(server_specs):
+    # Specs are (name, service table) pairs, the table a range table or a DiscreteDistribution
+    servers = []
+    for index, (name, service) in enumerate(server_specs):
+        if not isinstance(service, DiscreteDistribution):
+            service = DiscreteDistribution.from_range_table(service)
+        servers.append(Server(index, name, service))
+    if len({server.service_dist.die for server in servers}) != 1:
+        raise ValueError("All service tables must use the same dice")
+    return servers
+
+
+# Per-customer columns of the "columns" output, int32 times and the uint8 server index
+CUSTOMER_COLUMNS = ['arrival_delay', 'arrival_time', 'service_start', 'service_time', 'service_end',
+                    'server_assigned', 'waiting_time']
+
+
+def simulate_multi_server(num_customers, server_specs, arrival_dist, policy="first-listed",
+                          arrival_rolls=None, service_rolls=None, rng=random, record_idle=False,
+                          output="records"):
+    """Serve ``num_customers`` with any number of servers.
+
+    Busy servers sit in a heap keyed by the time they are free, and servers
+    that are free when a customer arrives move to a pool ordered by the
+    dispatch policy, so each dispatch is O(log k). When every server is busy
+    the customer waits for the first one free, and the policy breaks ties.
+    Returns the customer records, the customers served and the idle time
+    per server name. With ``record_idle`` every record also carries the
+    running idle time of each server as ``idle_time_<name>``.
+
+    ``output`` picks what is kept per customer: "records" is a list of dicts,
+    "columns" preallocated int32 arrays (see ``columns_frame``) and
+    "summary" only the totals of arrival delay, service and waiting time.
+    """
+    if output not in ("records", "columns", "summary"):
+        raise ValueError(f"Unknown output {output}")
+    servers = make_servers(server_specs)
+    new_pool = POLICIES[policy]
+    service_die = servers[0].service_dist.die
+    busy = [(server.available_time, server.index, server) for server in servers]
+    heapq.heapify(busy)
+    idle = new_pool()
+
+    customers = []
+    if output == "columns":
+        columns = {name: np.empty(num_customers, dtype=np.uint8 if name == 'server_assigned' else np.int32)
+                   for name in CUSTOMER_COLUMNS}
+        idle_columns = [np.empty(num_customers, dtype=np.int32) for _ in servers] if record_idle else []
+    totals = {'arrival_delay': 0, 'service_time': 0, 'waiting_time': 0}
+    arrival_time = 0
+    for i in range(num_customers):
+        arrival_delay = 0
+        if i > 0:
+            arrival_roll = rng.randint(1, arrival_dist.die) if arrival_rolls is None else arrival_rolls[i]
+            arrival_delay = arrival_dist.lookup(arrival_roll)
+            arrival_time += arrival_delay
+
+        # Drawn before the assignment so it does not depend on the server
+        service_roll = rng.randint(1, service_die) if service_rolls is None else service_rolls[i]
+
+        while busy and busy[0][0] <= arrival_time:
+            idle.push(heapq.heappop(busy)[2])
+
+        if idle:
+            server = idle.pop(rng)
+            server.idle_time += arrival_time - server.available_time
+        else:
+            # Everybody is busy, the policy picks among the servers free first
+            first = heapq.heappop(busy)[2]
+            tied = new_pool()
+            tied.push(first)
+            while busy and busy[0][0] == first.available_time:
+                tied.push(heapq.heappop(busy)[2])
+            server = tied.pop(rng)
+            for other in tied.drain():
+                heapq.heappush(busy, (other.available_time, other.index, other))
+
+        service_time = server.service_dist.lookup(service_roll)
+        service_start = max(arrival_time, server.available_time)
+        service_end = service_start + service_time
+        server.available_time = service_end
+        server.busy_time += service_time
+        server.count += 1
+        heapq.heappush(busy, (server.available_time, server.index, server))
+
+        if output == "records":
+            customer = {
+                'customer': i + 1,
+                'arrival_delay': arrival_delay,
+                'arrival_time': arrival_time,
+                'service_start': service_start,
+                'service_time': service_time,
+                'service_end': service_end,
+                'server_assigned': server.name,
+                'waiting_time': service_start - arrival_time
+            }
+            if record_idle:
+                for other in servers:
+                    customer[f'idle_time_{other.name}'] = other.idle_time
+            customers.append(customer)
+        elif output == "columns":
+            columns['arrival_delay'][i] = arrival_delay
+            columns['arrival_time'][i] = arrival_time
+            columns['service_start'][i] = service_start
+            columns['service_time'][i] = service_time
+            columns['service_end'][i] = service_end
+            columns['server_assigned'][i] = server.index
+            columns['waiting_time'][i] = service_start - arrival_time
+            for other, idle_column in zip(servers, idle_columns):
+                idle_column[i] = other.idle_time
+        else:
+            totals['arrival_delay'] += arrival_delay
+            totals['service_time'] += service_time
+            totals['waiting_time'] += service_start - arrival_time
+
+    if output == "columns":
+        customers = {'customer': np.arange(1, num_customers + 1, dtype=np.int32), **columns,
+                     'server_names': [server.name for server in servers]}
+        for server, idle_column in zip(servers, idle_columns):
+            customers[f'idle_time_{server.name}'] = idle_column
+    elif output == "summary":
+        customers = totals
+
+    counts = {server.name: server.count for server in servers}
+    idle_time = {server.name: server.idle_time for server in servers}
+    return customers, counts, idle_time
+
+
+def columns_frame(columns):
+    # DataFrame over the "columns" arrays, server ids shown as names
+    import pandas as pd
+
+    frame = {name: values for name, values in columns.items() if name != 'server_names'}
+    frame['server_assigned'] = pd.Categorical.from_codes(columns['server_assigned'], columns['server_names'])
+    return pd.DataFrame(frame, copy=False)
+
+
+# Per-replication figures of replication_rows, averages per customer
+SUMMARY_METRICS = ['average_idle_time', 'average_waiting_time', 'average_service_time', 'average_arrival_delay']
+
+
+def replication_rows(rng, count, num_customers, server_specs, arrival_dist, policy="first-listed"):
+    # One SUMMARY_METRICS row per replication. The (count x customers)
+    # arrival and service rolls are drawn first, in the same order as
+    # two_server_batch.simulate_batch, so every server count and policy
+    # sees the same customers for a given rng. Random tie-breaks come from
+    # a random.Random per replication seeded after the rolls
+    service_die = make_servers(server_specs)[0].service_dist.die
+    arrival_rolls = rng.integers(1, arrival_dist.die + 1, size=(count, num_customers))
+    service_rolls = rng.integers(1, service_die + 1, size=(count, num_customers))
+    rows = np.empty((count, len(SUMMARY_METRICS)))
+    for row, replication_arrival_rolls, replication_service_rolls in zip(rows, arrival_rolls, service_rolls):
+        stream = random.Random(int(rng.integers(2**63)))
+        totals, _, idle_time = simulate_multi_server(num_customers, server_specs, arrival_dist, policy,
+                                                     replication_arrival_rolls.tolist(),
+                                                     replication_service_rolls.tolist(), rng=stream,
+                                                     output="summary")
+        row[:] = (sum(idle_time.values()) / num_customers, totals['waiting_time'] / num_customers,
+                  totals['service_time'] / num_customers, totals['arrival_delay'] / num_customers)
+    return rows
@@ -1,5 +1,16 @@
+import os
 import random
-import pandas as pd
+import sys
+from functools import partial
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from simcore.cache import cached_rows
+from simcore.distributions import DiscreteDistribution
+from simcore.replication import run_replications
+from simcore.stats import OnlineStats, run_until_precise
+from simcore.store import write_batches
 
 time_between_arrival_arrival = [
     (1, 125, 1), # Assigned Number 1, Assigned Number 2, Value
@@ -21,6 +32,9 @@ service_time_dist = [
     (96, 100, 6)
 ]
 
+ARRIVAL_DIST = DiscreteDistribution.from_range_table(time_between_arrival_arrival)
+SERVICE_DIST = DiscreteDistribution.from_range_table(service_time_dist)
+
 def roll_d1000():
     return random.randint(1, 1000)
 
@@ -28,21 +42,30 @@ def roll_d100():
     return random.randint(1, 100)
 
 def get_time_between_arrival_arrival(roll):
-    for start, end, value in time_between_arrival_arrival:
-        if start <= roll <= end:
-            return value
-    return 0
+    return ARRIVAL_DIST.lookup(roll)
 
 def get_service_time(roll):
-    for start, end, value in service_time_dist:
-        if start <= roll <= end:
-            return value
-    return 0
+    return SERVICE_DIST.lookup(roll)
 
-def simulate_customers(num_customers=20):
+CUSTOMER_COLUMNS = ['customer', 'time_between_arrival', 'arrival_time', 'time_service_begins',
+                    'service_time_duration', 'time_service_ends', 'waiting_time', 'idle_time']
+
+def simulate_customers(num_customers=20, output="records"):
+    # output is "records" (list of dicts), "columns" (preallocated int32
+    # arrays, pd.DataFrame(columns) builds the table) or "summary" (only the
+    # totals report_summary() needs, nothing per customer)
+    if output not in ("records", "columns", "summary"):
+        raise ValueError(f"Unknown output {output}")
     customers = []
+    if output == "columns":
+        columns = {name: np.empty(num_customers, dtype=np.int32) for name in CUSTOMER_COLUMNS}
+    total_time_between_arrival = 0
+    total_service_time = 0
     total_idle_time = 0
     starting_time = 0  
+    arrival_time = starting_time
+    time_service_ends = starting_time
+    waiting_time = 0
     
     for i in range(num_customers):
         time_between_arrival = 0
@@ -51,30 +74,52 @@ def simulate_customers(num_customers=20):
         else:
             arrival_roll = roll_d1000()
             time_between_arrival = get_time_between_arrival_arrival(arrival_roll)
-            arrival_time = customers[-1]['arrival_time'] + time_between_arrival
+            arrival_time = arrival_time + time_between_arrival
 
         service_roll = roll_d100()
         service_time = get_service_time(service_roll)
         
-        time_service_begins = max(arrival_time, customers[-1]['time_service_ends']) if i > 0 else arrival_time
+        previous_service_ends = time_service_ends
+        time_service_begins = max(arrival_time, previous_service_ends) if i > 0 else arrival_time
         time_service_ends = time_service_begins + service_time
-        idle_time = max(0, time_service_begins - customers[-1]['time_service_ends']) if i > 0 else 0
+        idle_time = max(0, time_service_begins - previous_service_ends) if i > 0 else 0
 
         waiting_time = max(0, time_service_begins - arrival_time)
 
         total_idle_time += idle_time
-
-        customers.append({
-            'customer': i + 1,
-            'time_between_arrival': time_between_arrival,
-            'arrival_time': arrival_time,
-            'time_service_begins': time_service_begins,
-            'service_time_duration': service_time,
-            'time_service_ends': time_service_ends,
-            'waiting_time': waiting_time,
-            'idle_time': total_idle_time
-        })
-
+        total_time_between_arrival += time_between_arrival
+        total_service_time += service_time
+
+        if output == "records":
+            customers.append({
+                'customer': i + 1,
+                'time_between_arrival': time_between_arrival,
+                'arrival_time': arrival_time,
+                'time_service_begins': time_service_begins,
+                'service_time_duration': service_time,
+                'time_service_ends': time_service_ends,
+                'waiting_time': waiting_time,
+                'idle_time': total_idle_time
+            })
+        elif output == "columns":
+            columns['customer'][i] = i + 1
+            columns['time_between_arrival'][i] = time_between_arrival
+            columns['arrival_time'][i] = arrival_time
+            columns['time_service_begins'][i] = time_service_begins
+            columns['service_time_duration'][i] = service_time
+            columns['time_service_ends'][i] = time_service_ends
+            columns['waiting_time'][i] = waiting_time
+            columns['idle_time'][i] = total_idle_time
+
+    if output == "columns":
+        return columns
+    elif output == "summary":
+        return {
+            'idle_time': total_idle_time,
+            'last_waiting_time': waiting_time,
+            'time_between_arrival': total_time_between_arrival,
+            'service_time_duration': total_service_time
+        }
     return customers
 
 def report(df, num_customers):
@@ -94,34 +139,168 @@ def report(df, num_customers):
 
     return(average_idle_time, average_waiting_time, average_time_between_arrival, average_service_time_duration)
 
-customers_number = input("Select number of Customers: ")
+def report_summary(summary, num_customers):
+    # report() from simulate_customers(output="summary"), no DataFrame needed
+    num_customers = float(num_customers)
+    return(summary['idle_time'] / num_customers, summary['last_waiting_time'] / num_customers,
+           summary['time_between_arrival'] / num_customers, summary['service_time_duration'] / num_customers)
+
+# Vectorized engine
+def simulate_from_rolls(arrival_rolls, service_rolls):
+    # Rolls are (replications x customers) arrays, the first arrival roll of each row is ignored
+    arrival_rolls = np.atleast_2d(arrival_rolls)
+    service_rolls = np.atleast_2d(service_rolls)
+
+    time_between_arrival = ARRIVAL_DIST.lookup(arrival_rolls)
+    time_between_arrival[:, 0] = 0  # First customer arrives at time 0
+    service_time = SERVICE_DIST.lookup(service_rolls)
+    arrival_time = np.cumsum(time_between_arrival, axis=1)
+
+    # Lindley recursion W[i] = max(0, W[i-1] + S[i-1] - A[i]) solved as C[i] - min(C[0..i])
+    step = np.zeros_like(service_time)
+    step[:, 1:] = service_time[:, :-1] - time_between_arrival[:, 1:]
+    cumulative = np.cumsum(step, axis=1)
+    waiting_time = cumulative - np.minimum.accumulate(np.minimum(cumulative, 0), axis=1)
+
+    # Idle time is whatever the max(0, ...) clipped away
+    idle_time = np.zeros_like(waiting_time)
+    idle_time[:, 1:] = waiting_time[:, 1:] - waiting_time[:, :-1] - step[:, 1:]
+
+    time_service_begins = arrival_time + waiting_time
+    customer = np.broadcast_to(np.arange(1, service_time.shape[1] + 1), service_time.shape)
+
+    return {
+        'customer': customer,
+        'time_between_arrival': time_between_arrival,
+        'arrival_time': arrival_time,
+        'time_service_begins': time_service_begins,
+        'service_time_duration': service_time,
+        'time_service_ends': time_service_begins + service_time,
+        'waiting_time': waiting_time,
+        'idle_time': np.cumsum(idle_time, axis=1)
+    }
+
+def simulate_customers_vectorized(num_customers=20, num_replications=1, rng=None):
+    rng = np.random.default_rng(rng)
+    arrival_rolls = rng.integers(1, ARRIVAL_DIST.die + 1, size=(num_replications, num_customers))
+    service_rolls = rng.integers(1, SERVICE_DIST.die + 1, size=(num_replications, num_customers))
+    return simulate_from_rolls(arrival_rolls, service_rolls)
+
+def report_vectorized(columns, num_customers):
+    # Same values as report(), one entry per replication
+    num_customers = float(num_customers)
+    average_idle_time = columns['idle_time'][:, -1] / num_customers
+    average_waiting_time = columns['waiting_time'][:, -1] / num_customers
+    average_time_between_arrival = columns['time_between_arrival'].sum(axis=1) / num_customers
+    average_service_time_duration = columns['service_time_duration'].sum(axis=1) / num_customers
 
-mode = input("Select mode 1 (Single), 2 (Multiple) (Type the number): ")
-
-if mode == "1":
-    customers_data = simulate_customers(int(customers_number))
-
-    df_customers = pd.DataFrame(customers_data)
-
-    simulation_report = report(df_customers, customers_number)
-
-    print(df_customers)
+    return(average_idle_time, average_waiting_time, average_time_between_arrival, average_service_time_duration)
 
-    print("Simulation Report: ")
-    print(f"Average Idle Time: {simulation_report[0]}")
-    print(f"Average Waiting Time: {simulation_report[1]}")
-    print(f"Average Time Between Arrival: {simulation_report[2]}")
-    print(f"Average Service Time Duration: {simulation_report[3]}")
-elif mode == "2":
-    num_simulations = input("How many simulations? ")
-    total_average_idle_time = 0
-    total_average_waiting_time = 0
-    total_average_time_between_arrival = 0
-    total_average_service_time_duration = 0
+def customers_frame(columns, replication=0):
+    import pandas as pd
+
+    return pd.DataFrame({name: values[replication] for name, values in columns.items()})
+
+def replicate(num_customers, rng):
+    # One replication reduced to the report() tuple, cheap to send between processes
+    columns = simulate_customers_vectorized(num_customers, 1, rng)
+    return tuple(float(metric[0]) for metric in report_vectorized(columns, num_customers))
+
+def simulate_parallel(num_customers, num_simulations, seed=None, workers=None):
+    reports = run_replications(partial(replicate, num_customers), num_simulations, seed, workers)
+
+    # Summed in replication order so the totals do not depend on the worker count
+    totals = [0.0, 0.0, 0.0, 0.0]
+    for simulation_report in reports:
+        for i, value in enumerate(simulation_report):
+            totals[i] += value
+
+    return tuple(total / num_simulations for total in totals)
+
+def simulate_antithetic(num_customers, num_pairs, rng=None):
+    # Every replication is paired with one on the mirrored rolls (die + 1 - roll),
+    # long gaps become short ones and long services short ones, and the pair
+    # average is one observation
+    rng = np.random.default_rng(rng)
+    arrival_rolls = rng.integers(1, ARRIVAL_DIST.die + 1, size=(num_pairs, num_customers))
+    service_rolls = rng.integers(1, SERVICE_DIST.die + 1, size=(num_pairs, num_customers))
+
+    reports = np.array(report_vectorized(simulate_from_rolls(arrival_rolls, service_rolls), num_customers))
+    mirrored = np.array(report_vectorized(simulate_from_rolls(ARRIVAL_DIST.die + 1 - arrival_rolls,
+                                                              SERVICE_DIST.die + 1 - service_rolls),
+                                          num_customers))
+
+    stats = OnlineStats(REPORT_METRICS)
+    independent = OnlineStats(REPORT_METRICS)
+    for pair_report, simulation_report, mirrored_report in zip(((reports + mirrored) / 2).T, reports.T, mirrored.T):
+        stats.update(pair_report)
+        independent.update(simulation_report)
+        independent.update(mirrored_report)
+
+    # Variance of a pair average against the average of two independent
+    # replications, inf when the pairs cancel exactly
+    with np.errstate(divide='ignore'):
+        variance_reduction = (independent.variance / 2) / stats.variance
+    return stats, variance_reduction
+
+REPORT_METRICS = [
+    "average_idle_time",
+    "average_waiting_time",
+    "average_time_between_arrival",
+    "average_service_time_duration"
+]
 
-    for num in range(int(num_simulations)):
-        print(f"Simulation {num + 1}")
-        customers_data = simulate_customers(int(customers_number))
+def replication_rows(rng, count, num_customers):
+    # One report() row per replication
+    return np.column_stack(report_vectorized(simulate_customers_vectorized(num_customers, count, rng), num_customers))
+
+CACHE_VERSION = 1
+
+def cached_replications(num_customers, num_replications, seed=0, cache=None, workers=1):
+    # (replications x REPORT_METRICS) of replication_rows, cached
+    parameters = {'num_customers': num_customers, 'arrival': ARRIVAL_DIST, 'service': SERVICE_DIST}
+    return cached_rows('simulasi', parameters, partial(replication_rows, num_customers=num_customers),
+                       num_replications, seed, CACHE_VERSION, cache, block_size=10000, names=REPORT_METRICS,
+                       workers=workers)
+
+def write_replications(writer, rng, replication, num_customers):
+    columns = simulate_customers_vectorized(num_customers, len(replication), rng)
+    customers = {name: values.ravel() for name, values in columns.items()}
+    writer.append('customers', {'replication': np.repeat(replication, num_customers), **customers})
+    writer.append('replications', {'replication': replication,
+                                   **dict(zip(REPORT_METRICS, report_vectorized(columns, num_customers)))})
+
+def simulate_to_store(directory, num_customers, num_replications, seed=None, batch_size=10000):
+    # Every customer and every replication report into a simcore result store
+    tables = {
+        'customers': [('replication', '<u4')] + [(name, '<i4') for name in CUSTOMER_COLUMNS],
+        'replications': [('replication', '<u4')] + [(name, '<f8') for name in REPORT_METRICS]
+    }
+    capacity = {'customers': num_replications * num_customers, 'replications': num_replications}
+    write_batches(directory, 'simulasi', tables, partial(write_replications, num_customers=num_customers),
+                  num_replications, seed, {'num_customers': num_customers}, capacity, batch_size)
+
+def print_total_report(stats):
+    half_width = stats.half_width()
+
+    print("Simulation Report (mean ± 95% confidence half-width): ")
+    print(f"Total Average Idle Time: {stats.mean[0]} ± {half_width[0]}")
+    print(f"Total Average Waiting Time: {stats.mean[1]} ± {half_width[1]}")
+    print(f"Total Average Time Between Arrival: {stats.mean[2]} ± {half_width[2]}")
+    print(f"Total Average Service Time Duration: {stats.mean[3]} ± {half_width[3]}")
+
+def main():
+    customers_number = input("Select number of Customers: ")
+
+    mode = input("Select mode 1 (Single), 2 (Multiple), 3 (Parallel), 4 (Until precise), 5 (Antithetic) "
+                 "(Type the number): ")
+
+    if mode in ("1", "2"):
+        # Only the table modes pay for importing pandas
+        import pandas as pd
+
+    if mode == "1":
+        customers_data = simulate_customers(int(customers_number), output="columns")
 
         df_customers = pd.DataFrame(customers_data)
 
@@ -134,20 +313,67 @@ elif mode == "2":
         print(f"Average Waiting Time: {simulation_report[1]}")
         print(f"Average Time Between Arrival: {simulation_report[2]}")
         print(f"Average Service Time Duration: {simulation_report[3]}")
-        print("------------------------------------------------------------")
-
-        total_average_idle_time += simulation_report[0]
-        total_average_waiting_time += simulation_report[1]
-        total_average_time_between_arrival += simulation_report[2]
-        total_average_service_time_duration += simulation_report[3]
-
-    total_average_idle_time = total_average_idle_time / int(num_simulations)
-    total_average_waiting_time = total_average_waiting_time / int(num_simulations)
-    total_average_time_between_arrival = total_average_time_between_arrival / int(num_simulations)
-    total_average_service_time_duration = total_average_service_time_duration / int(num_simulations)
-
-    print("Simulation Report: ")
-    print(f"Total Average Idle Time: {total_average_idle_time}")
-    print(f"Total Average Waiting Time: {total_average_waiting_time}")
-    print(f"Total Average Time Between Arrival: {total_average_time_between_arrival}")
-    print(f"Total Average Service Time Duration: {total_average_service_time_duration}")
+    elif mode == "2":
+        num_simulations = input("How many simulations? ")
+        stats = OnlineStats(REPORT_METRICS)
+
+        for num in range(int(num_simulations)):
+            print(f"Simulation {num + 1}")
+            customers_data = simulate_customers(int(customers_number), output="columns")
+
+            df_customers = pd.DataFrame(customers_data)
+
+            simulation_report = report(df_customers, customers_number)
+
+            print(df_customers)
+
+            print("Simulation Report: ")
+            print(f"Average Idle Time: {simulation_report[0]}")
+            print(f"Average Waiting Time: {simulation_report[1]}")
+            print(f"Average Time Between Arrival: {simulation_report[2]}")
+            print(f"Average Service Time Duration: {simulation_report[3]}")
+            print("------------------------------------------------------------")
+
+            stats.update(simulation_report)
+
+        print_total_report(stats)
+    elif mode == "3":
+        num_simulations = input("How many simulations? ")
+        seed = input("Seed (leave empty for random): ")
+        workers = input("How many workers? (leave empty for all cores) ")
+
+        total_report = simulate_parallel(int(customers_number), int(num_simulations),
+                                         int(seed) if seed else None,
+                                         int(workers) if workers else None)
+
+        print("Simulation Report: ")
+        print(f"Total Average Idle Time: {total_report[0]}")
+        print(f"Total Average Waiting Time: {total_report[1]}")
+        print(f"Total Average Time Between Arrival: {total_report[2]}")
+        print(f"Total Average Service Time Duration: {total_report[3]}")
+    elif mode == "4":
+        target = input("Target confidence interval half-width: ")
+        max_simulations = input("Maximum number of simulations (leave empty for no limit): ")
+        seed = input("Seed (leave empty for random): ")
+
+        rng = np.random.default_rng(int(seed) if seed else None)
+        stats = run_until_precise(partial(replicate, int(customers_number), rng), REPORT_METRICS, float(target),
+                                  max_replications=int(max_simulations) if max_simulations else None)
+
+        print(f"Stopped after {stats.count} simulations")
+        print_total_report(stats)
+    elif mode == "5":
+        num_pairs = input("How many antithetic pairs? ")
+        seed = input("Seed (leave empty for random): ")
+
+        stats, variance_reduction = simulate_antithetic(int(customers_number), int(num_pairs),
+                                                        int(seed) if seed else None)
+
+        print(f"{stats.count} antithetic pairs ({2 * stats.count} simulations)")
+        print_total_report(stats)
+        print("Variance reduction against independent replications: ")
+        for name, factor in zip(REPORT_METRICS, variance_reduction):
+            print(f"{name}: {factor}")
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,13 @@
+import os
 import random
-import pandas as pd
+import sys
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from simcore.distributions import DiscreteDistribution
+from simcore.stats import OnlineStats, run_until_precise
+from multi_server import columns_frame, simulate_multi_server
 
 arrival_delay_arrival = [
     (1, 25, 1), 
@@ -22,213 +30,172 @@ service_time_badu = [
     (81, 100, 6)
 ]
 
+ARRIVAL_DELAY_DIST = DiscreteDistribution.from_range_table(arrival_delay_arrival)
+SERVICE_DISTS = {
+    "Ali": DiscreteDistribution.from_range_table(service_time_ali),
+    "Badu": DiscreteDistribution.from_range_table(service_time_badu)
+}
+SERVERS = list(SERVICE_DISTS.items())
+# Random when both are free together, otherwise whoever is free (first)
+DISPATCH_POLICY = "random"
+
 def roll_d100():
     return random.randint(1, 100)
 
 def get_arrival_delay_arrival(roll):
-    for start, end, value in arrival_delay_arrival:
-        if start <= roll <= end:
-            return value
-    return 0
+    return ARRIVAL_DELAY_DIST.lookup(roll)
 
 def get_service_time(roll, server):
-    if server == "Ali":
-        for start, end, value in service_time_ali:
-            if start <= roll <= end:
-                return value
-    elif server == "Badu":
-        for start, end, value in service_time_badu:
-            if start <= roll <= end:
-                return value
+    if server in SERVICE_DISTS:
+        return SERVICE_DISTS[server].lookup(roll)
     return 0
 
-def simulate_customers(num_customers=20):
-    customers = []
-    server_available_time = {"Ali": 0, "Badu": 0} 
-    idle_time = {"Ali": 0, "Badu": 0}
-    ali_count = 0
-    badu_count = 0
-
-    for i in range(num_customers):
-        arrival_delay = 0
-        if i == 0:
-            arrival_time = 0  # First customer arrives at time 0
-        else:
-            arrival_roll = roll_d100()
-            arrival_delay = get_arrival_delay_arrival(arrival_roll)
-            arrival_time = customers[-1]['arrival_time'] + arrival_delay
-
-        # Determine which server is available first (Ali or Badu)
-        ali_idle = arrival_time >= server_available_time["Ali"]
-        badu_idle = arrival_time >= server_available_time["Badu"]
-
-        # Both are available, random
-        if ali_idle and badu_idle:
-            server_assigned = random.choice(["Ali", "Badu"])
-
-        # Only Ali
-        elif ali_idle:
-            server_assigned = "Ali"
-
-        # Only Badu
-        elif badu_idle:
-            server_assigned = "Badu"
-
-        # Both are unavailable
-        else:
-            # Ali finish first
-            if server_available_time["Ali"] < server_available_time["Badu"]:
-                server_assigned = "Ali"
-            # Badu finish first
-            elif server_available_time["Badu"] < server_available_time["Ali"]:
-                server_assigned = "Badu"
-            else:
-                # Both finish at the same time
-                server_assigned = random.choice(["Ali", "Badu"])
-
-        # Increment the count for the server assigned
-        if server_assigned == "Ali":
-            ali_count += 1
-            if arrival_time > server_available_time["Ali"]:
-                idle_time["Ali"] += arrival_time - server_available_time["Ali"]
-        else:
-            badu_count += 1
-            if arrival_time > server_available_time["Badu"]:
-                idle_time["Badu"] += arrival_time - server_available_time["Badu"]
-
-        service_roll = roll_d100()
-        service_time = get_service_time(service_roll, server_assigned)
-
-        # Service begins either when the server is free or when the customer arrives (whichever is later)
-        service_start = max(arrival_time, server_available_time[server_assigned])
-        service_end = service_start + service_time
-
-        waiting_time = service_start - arrival_time
-
-        # Update server's next available time
-        server_available_time[server_assigned] = service_end
-
-        customers.append({
-            'customer': i + 1,
-            'arrival_delay': arrival_delay,
-            'arrival_time': arrival_time,
-            'service_start': service_start,
-            'service_time': service_time,
-            'service_end': service_end,
-            'server_assigned': server_assigned,
-            'waiting_time': waiting_time,
-            'idle_time_Ali': idle_time["Ali"],
-            'idle_time_Badu': idle_time["Badu"],
-        })
-
-    return customers, ali_count, badu_count, idle_time
+def simulate_customers(num_customers=20, arrival_rolls=None, service_rolls=None, output="records", rng=random):
+    # Rolls can be given per customer (index 0 arrival roll is unused) so
+    # several dispatch policies can be run on the same streams. output is
+    # "records", "columns" (typed arrays, see columns_frame) or "summary"
+    # (only the totals report() needs). Draws the rolls not given and any
+    # random tie-breaks from rng
+    customers, counts, idle_time = simulate_multi_server(num_customers, SERVERS, ARRIVAL_DELAY_DIST, DISPATCH_POLICY,
+                                                         arrival_rolls, service_rolls, rng=rng, record_idle=True,
+                                                         output=output)
+    return customers, counts["Ali"], counts["Badu"], idle_time
 
 def report(df, num_customers, ali_count, badu_count, idle_time):
-    # Report generation
+    # Report generation, df can also be the columns or the summary of simulate_customers
     total_idle = idle_time["Ali"] + idle_time["Badu"]
     average_idle_time = total_idle / num_customers
     average_ali_idle_time = idle_time["Ali"] / num_customers
     average_badu_idle_time = idle_time["Badu"] / num_customers
 
-    waiting_time = df['waiting_time'].sum()
+    waiting_time = np.sum(df['waiting_time'])
     total_waiting_time = waiting_time
     average_waiting_time = total_waiting_time / num_customers
 
-    service_time = df['service_time'].sum()
+    service_time = np.sum(df['service_time'])
     average_service_time = service_time / num_customers
 
-    arrival_delay = df['arrival_delay'].sum()
+    arrival_delay = np.sum(df['arrival_delay'])
     average_arrival_delay = arrival_delay / num_customers
 
     return (average_idle_time, average_waiting_time, average_service_time, ali_count, badu_count, idle_time, average_arrival_delay, average_ali_idle_time, average_badu_idle_time)
 
-customers_number = input("Select number of Customers: ")
-
-mode = input("Select mode 1 (Single), 2 (Multiple) (Type the number): ")
-
-if mode == "1": # Single Simulation
-    customers_data, ali_count, badu_count, idle_time = simulate_customers(int(customers_number))
-    df_customers = pd.DataFrame(customers_data)
-    simulation_report = report(df_customers, int(customers_number), ali_count, badu_count, idle_time)
-    print(df_customers)
-    print("Simulation Report: ")
-    print(f"Average Idle Time: {simulation_report[0]}")
-    print(f"Average Time Between Arrival: {simulation_report[6]}")
-    print(f"Average Waiting Time: {simulation_report[1]}")
-    print(f"Average Service Time Duration: {simulation_report[2]}")
-    print(f"Total customers served by Ali: {simulation_report[3]}")
-    print(f"Total customers served by Badu: {simulation_report[4]}")
-    print(f"Total idle time for Ali: {simulation_report[5]['Ali']}")
-    print(f"Average idle time for Ali: {simulation_report[7]}")
-    print(f"Total idle time for Badu: {simulation_report[5]['Badu']}")
-    print(f"Average idle time for Badu: {simulation_report[8]}")
-
-elif mode == "2": # Multiple Simulations
-    num_simulations = input("How many simulations? ") # Number of simulations
-    print_mode = input("Need to print the table? (Type y or n)") # Print simulation info or not
-    total_average_idle_time = 0
-    total_average_arrival_delay = 0
-    total_average_waiting_time = 0
-    total_average_service_time = 0
-    total_ali_count = 0
-    total_badu_count = 0
-    total_ali_idle = 0
-    average_ali_idle = 0
-    total_badu_idle = 0
-    average_badu_idle = 0
-
-    for num in range(int(num_simulations)):
-        customers_data, ali_count, badu_count, idle_time = simulate_customers(int(customers_number))
-        df_customers = pd.DataFrame(customers_data)
+REPORT_METRICS = [
+    "average_idle_time",
+    "average_waiting_time",
+    "average_service_time",
+    "ali_count",
+    "badu_count",
+    "ali_idle_time",
+    "badu_idle_time",
+    "average_arrival_delay",
+    "average_ali_idle_time",
+    "average_badu_idle_time"
+]
+
+def report_metrics(simulation_report):
+    # report() tuple flattened in REPORT_METRICS order
+    idle_time = simulation_report[5]
+    return simulation_report[:5] + (idle_time["Ali"], idle_time["Badu"]) + simulation_report[6:]
+
+def print_total_report(stats):
+    mean = dict(zip(stats.names, stats.mean))
+    half_width = dict(zip(stats.names, stats.half_width()))
+
+    print("Total Simulation Report (mean ± 95% confidence half-width): ")
+    print(f"Total Average Idle Time: {mean['average_idle_time']} ± {half_width['average_idle_time']}")
+    print(f"Total Average Waiting Time: {mean['average_waiting_time']} ± {half_width['average_waiting_time']}")
+    print(f"Total Average Service Time Duration: {mean['average_service_time']} ± {half_width['average_service_time']}")
+    print(f"Average customers served by Ali per simulation: {mean['ali_count']} ± {half_width['ali_count']}")
+    print(f"Average customers served by Badu per simulation: {mean['badu_count']} ± {half_width['badu_count']}")
+    print(f"Total Average idle time for Ali: {mean['ali_idle_time']} ± {half_width['ali_idle_time']}")
+    print(f"Average idle per customer time for Ali: {mean['average_ali_idle_time']} ± {half_width['average_ali_idle_time']}")
+    print(f"Total Average idle time for Badu: {mean['badu_idle_time']} ± {half_width['badu_idle_time']}")
+    print(f"Average idle per customer time for Badu: {mean['average_badu_idle_time']} ± {half_width['average_badu_idle_time']}")
+
+def main():
+    customers_number = input("Select number of Customers: ")
+
+    mode = input("Select mode 1 (Single), 2 (Multiple), 3 (Until precise), 4 (Batched) (Type the number): ")
+
+    if mode == "1": # Single Simulation
+        customers_data, ali_count, badu_count, idle_time = simulate_customers(int(customers_number), output="columns")
+        df_customers = columns_frame(customers_data)
         simulation_report = report(df_customers, int(customers_number), ali_count, badu_count, idle_time)
+        print(df_customers)
+        print("Simulation Report: ")
+        print(f"Average Idle Time: {simulation_report[0]}")
+        print(f"Average Time Between Arrival: {simulation_report[6]}")
+        print(f"Average Waiting Time: {simulation_report[1]}")
+        print(f"Average Service Time Duration: {simulation_report[2]}")
+        print(f"Total customers served by Ali: {simulation_report[3]}")
+        print(f"Total customers served by Badu: {simulation_report[4]}")
+        print(f"Total idle time for Ali: {simulation_report[5]['Ali']}")
+        print(f"Average idle time for Ali: {simulation_report[7]}")
+        print(f"Total idle time for Badu: {simulation_report[5]['Badu']}")
+        print(f"Average idle time for Badu: {simulation_report[8]}")
+
+    elif mode == "2": # Multiple Simulations
+        num_simulations = input("How many simulations? ") # Number of simulations
+        print_mode = input("Need to print the table? (Type y or n)") # Print simulation info or not
+        stats = OnlineStats(REPORT_METRICS)
+
+        for num in range(int(num_simulations)):
+            # Per-customer rows are only kept when the table is printed
+            if print_mode == "y":
+                customers_data, ali_count, badu_count, idle_time = simulate_customers(int(customers_number),
+                                                                                      output="columns")
+                df_customers = columns_frame(customers_data)
+            else:
+                df_customers, ali_count, badu_count, idle_time = simulate_customers(int(customers_number),
+                                                                                    output="summary")
+            simulation_report = report(df_customers, int(customers_number), ali_count, badu_count, idle_time)
+
+            if print_mode == "y": # Prints information per simulation
+                print(f"Simulation {num + 1}")
+                print(df_customers.to_string())
+                print("Simulation Report: ")
+                print(f"Average Idle Time: {simulation_report[0]}")
+                print(f"Average Time Between Arrival: {simulation_report[6]}")
+                print(f"Average Waiting Time: {simulation_report[1]}")
+                print(f"Average Service Time Duration: {simulation_report[2]}")
+                print(f"Total customers served by Ali: {simulation_report[3]}")
+                print(f"Total customers served by Badu: {simulation_report[4]}")
+                print(f"Total idle time for Ali: {simulation_report[5]['Ali']}")
+                print(f"Average idle time for Ali: {simulation_report[7]}")
+                print(f"Total idle time for Badu: {simulation_report[5]['Badu']}")
+                print(f"Average idle time for Badu: {simulation_report[8]}")
+                print("------------------------------------------------------------")
+            else:
+                print(f"Simulation {num + 1} out of {num_simulations}")
+
+            stats.update(report_metrics(simulation_report))
+
+        print_total_report(stats)
+
+    elif mode == "3": # Simulate until every confidence interval is narrow enough
+        target = input("Target confidence interval half-width: ")
+        max_simulations = input("Maximum number of simulations (leave empty for no limit): ")
+
+        def replicate():
+            summary, ali_count, badu_count, idle_time = simulate_customers(int(customers_number), output="summary")
+            return report_metrics(report(summary, int(customers_number), ali_count, badu_count, idle_time))
+
+        stats = run_until_precise(replicate, REPORT_METRICS, float(target),
+                                  max_replications=int(max_simulations) if max_simulations else None)
+
+        print(f"Stopped after {stats.count} simulations")
+        print_total_report(stats)
+
+    elif mode == "4": # All simulations at once, no tables
+        from two_server_batch import batch_report_metrics, simulate_batch
+
+        num_simulations = input("How many simulations? ")
+        seed = input("Seed (leave empty for random): ")
+        stats = OnlineStats(REPORT_METRICS)
+        stats.update_many(batch_report_metrics(simulate_batch(int(customers_number), int(num_simulations),
+                                                              DISPATCH_POLICY, int(seed) if seed else None)))
+        print_total_report(stats)
 
-        if print_mode == "y": # Prints information per simulation
-            print(f"Simulation {num + 1}")
-            print(df_customers.to_string())
-            print("Simulation Report: ")
-            print(f"Average Idle Time: {simulation_report[0]}")
-            print(f"Average Time Between Arrival: {simulation_report[6]}")
-            print(f"Average Waiting Time: {simulation_report[1]}")
-            print(f"Average Service Time Duration: {simulation_report[2]}")
-            print(f"Total customers served by Ali: {simulation_report[3]}")
-            print(f"Total customers served by Badu: {simulation_report[4]}")
-            print(f"Total idle time for Ali: {simulation_report[5]['Ali']}")
-            print(f"Average idle time for Ali: {simulation_report[7]}")
-            print(f"Total idle time for Badu: {simulation_report[5]['Badu']}")
-            print(f"Average idle time for Badu: {simulation_report[8]}")
-            print("------------------------------------------------------------")
-        else:
-            print(f"Simulation {num + 1} out of {num_simulations}")
-
-        total_average_idle_time += simulation_report[0]
-        total_average_arrival_delay += simulation_report[6]
-        total_average_waiting_time += simulation_report[1]
-        total_average_service_time += simulation_report[2]
-        total_ali_count += ali_count
-        total_badu_count += badu_count
-        total_ali_idle += simulation_report[5]['Ali']
-        average_ali_idle += simulation_report[7]
-        total_badu_idle += simulation_report[5]['Badu']
-        average_badu_idle += simulation_report[8]
-
-    total_average_idle_time = total_average_idle_time / int(num_simulations)
-    total_average_arrival_delay = total_average_arrival_delay / int(num_simulations)
-    total_average_waiting_time = total_average_waiting_time / int(num_simulations)
-    total_average_service_time = total_average_service_time / int(num_simulations)
-    total_ali_count = total_ali_count / int(num_simulations)
-    total_badu_count = total_badu_count / int(num_simulations)
-    total_ali_idle = total_ali_idle / int(num_simulations)
-    average_ali_idle = average_ali_idle / int(num_simulations)
-    total_badu_idle = total_badu_idle / int(num_simulations)
-    average_badu_idle = average_badu_idle / int(num_simulations)
-
-    print("Total Simulation Report: ")
-    print(f"Total Average Idle Time: {total_average_idle_time}")
-    print(f"Total Average Waiting Time: {total_average_waiting_time}")
-    print(f"Total Average Service Time Duration: {total_average_service_time}")
-    print(f"Average customers served by Ali per simulation: {total_ali_count}")
-    print(f"Average customers served by Badu per simulation: {total_badu_count}")
-    print(f"Total Average idle time for Ali: {total_ali_idle}")
-    print(f"Average idle per customer time for Ali: {average_ali_idle}")
-    print(f"Total Average idle time for Badu: {total_badu_idle}")
-    print(f"Average idle per customer time for Badu: {average_badu_idle}")
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+import os
+import sys
+from functools import partial
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from simcore.cache import cached_rows
+from simcore.store import write_batches
+from multi_server import SUMMARY_METRICS
+from simulasi_2_server import ARRIVAL_DELAY_DIST, REPORT_METRICS, SERVICE_DISTS
+
+# Per-customer columns of record_customers, server_assigned is 0 for Ali and 1 for Badu
+CUSTOMER_COLUMNS = ['arrival_delay', 'arrival_time', 'service_start', 'service_time', 'service_end',
+                    'server_assigned', 'waiting_time']
+
+
+def simulate_batch(num_customers, num_replications, policy="first-listed", rng=None,
+                   arrival_rolls=None, service_rolls=None, record_customers=False):
+    """Run ``num_replications`` Ali/Badu simulations in lockstep.
+
+    Every replication's servers, idle totals and counts are arrays of length
+    R and each customer is one vectorized step, with the dispatch rules of
+    the two scripts as masks ("first-listed" is simulasi_2_server.py,
+    "random" simulasi_2_server_random_ali_badu.py). Rolls are optional
+    (R x customers) arrays as in simulate_customers. Returns report()'s
+    figures per replication, keyed by REPORT_METRICS, and with
+    ``record_customers`` also (R x customers) arrays of CUSTOMER_COLUMNS.
+    """
+    rng = np.random.default_rng(rng)
+    shape = (num_replications, num_customers)
+    if arrival_rolls is None:
+        arrival_rolls = rng.integers(1, ARRIVAL_DELAY_DIST.die + 1, size=shape)
+    if service_rolls is None:
+        service_rolls = rng.integers(1, SERVICE_DISTS["Ali"].die + 1, size=shape)
+    arrival_delays = ARRIVAL_DELAY_DIST.lookup(np.asarray(arrival_rolls))
+    arrival_delays[:, 0] = 0  # First customer arrives at time 0
+    ali_service_times = SERVICE_DISTS["Ali"].lookup(np.asarray(service_rolls))
+    badu_service_times = SERVICE_DISTS["Badu"].lookup(np.asarray(service_rolls))
+
+    ali_available_time = np.zeros(num_replications, dtype=np.int64)
+    badu_available_time = np.zeros(num_replications, dtype=np.int64)
+    ali_idle_time = np.zeros(num_replications, dtype=np.int64)
+    badu_idle_time = np.zeros(num_replications, dtype=np.int64)
+    ali_count = np.zeros(num_replications, dtype=np.int64)
+    total_waiting_time = np.zeros(num_replications, dtype=np.int64)
+    total_service_time = np.zeros(num_replications, dtype=np.int64)
+    arrival_time = np.zeros(num_replications, dtype=np.int64)
+    if record_customers:
+        customers = {name: np.empty(shape, dtype=np.uint8 if name == 'server_assigned' else np.int32)
+                     for name in CUSTOMER_COLUMNS}
+        customers['arrival_delay'][:] = arrival_delays
+
+    for i in range(num_customers):
+        arrival_time += arrival_delays[:, i]
+        ali_idle = arrival_time >= ali_available_time
+        badu_idle = arrival_time >= badu_available_time
+        both_busy = ~ali_idle & ~badu_idle
+
+        if policy == "first-listed":
+            # Ali if free, else Badu if free, else whoever is free first (Ali on ties)
+            to_ali = ali_idle | (both_busy & (ali_available_time <= badu_available_time))
+        elif policy == "random":
+            # Coin flip when both are free, or both are busy until the same time
+            coin = rng.random(num_replications) < 0.5
+            tie = (ali_idle & badu_idle) | (both_busy & (ali_available_time == badu_available_time))
+            to_ali = np.where(tie, coin, (ali_idle & ~badu_idle) | (both_busy & (ali_available_time < badu_available_time)))
+        else:
+            raise ValueError(f"Lockstep engine has no dispatch policy {policy}")
+
+        available_time = np.where(to_ali, ali_available_time, badu_available_time)
+        idle_gap = np.maximum(arrival_time - available_time, 0)
+        ali_idle_time += np.where(to_ali, idle_gap, 0)
+        badu_idle_time += np.where(to_ali, 0, idle_gap)
+
+        service_time = np.where(to_ali, ali_service_times[:, i], badu_service_times[:, i])
+        service_start = np.maximum(arrival_time, available_time)
+        service_end = service_start + service_time
+        ali_available_time = np.where(to_ali, service_end, ali_available_time)
+        badu_available_time = np.where(to_ali, badu_available_time, service_end)
+
+        ali_count += to_ali
+        total_waiting_time += service_start - arrival_time
+        total_service_time += service_time
+        if record_customers:
+            customers['arrival_time'][:, i] = arrival_time
+            customers['service_start'][:, i] = service_start
+            customers['service_time'][:, i] = service_time
+            customers['service_end'][:, i] = service_end
+            customers['server_assigned'][:, i] = ~to_ali
+            customers['waiting_time'][:, i] = service_start - arrival_time
+
+    results = {
+        "average_idle_time": (ali_idle_time + badu_idle_time) / num_customers,
+        "average_waiting_time": total_waiting_time / num_customers,
+        "average_service_time": total_service_time / num_customers,
+        "ali_count": ali_count,
+        "badu_count": num_customers - ali_count,
+        "ali_idle_time": ali_idle_time,
+        "badu_idle_time": badu_idle_time,
+        "average_arrival_delay": arrival_delays.sum(axis=1) / num_customers,
+        "average_ali_idle_time": ali_idle_time / num_customers,
+        "average_badu_idle_time": badu_idle_time / num_customers
+    }
+    if record_customers:
+        return results, customers
+    return results
+
+
+def batch_report_metrics(results):
+    # (replications x metrics) in REPORT_METRICS order, ready for OnlineStats.update_many
+    return np.column_stack([results[name] for name in REPORT_METRICS])
+
+
+def replication_rows(rng, count, num_customers, policy="first-listed"):
+    return batch_report_metrics(simulate_batch(num_customers, count, policy, rng))
+
+
+def summary_rows(rng, count, num_customers, policy="first-listed"):
+    # multi_server.SUMMARY_METRICS rows, for comparisons with other server counts
+    results = simulate_batch(num_customers, count, policy, rng)
+    return np.column_stack([results[name] for name in SUMMARY_METRICS])
+
+
+CACHE_VERSION = 1
+
+
+def cached_replications(num_customers, num_replications, policy="first-listed", seed=0, cache=None, workers=1):
+    # replication_rows for one policy, cached per policy
+    parameters = {'num_customers': num_customers, 'policy': policy, 'arrival_delay': ARRIVAL_DELAY_DIST,
+                  'service': SERVICE_DISTS}
+    return cached_rows('two_server', parameters,
+                       partial(replication_rows, num_customers=num_customers, policy=policy),
+                       num_replications, seed, CACHE_VERSION, cache, block_size=10000, names=REPORT_METRICS,
+                       workers=workers)
+
+
+def write_replications(writer, rng, replication, num_customers, policy="first-listed"):
+    results, customers = simulate_batch(num_customers, len(replication), policy, rng, record_customers=True)
+    writer.append('customers', {
+        'replication': np.repeat(replication, num_customers),
+        'customer': np.tile(np.arange(1, num_customers + 1), len(replication)),
+        **{name: values.ravel() for name, values in customers.items()}
+    })
+    writer.append('replications', {'replication': replication, **results})
+
+
+def simulate_to_store(directory, num_customers, num_replications, policy="first-listed", seed=None,
+                      batch_size=10000):
+    # Every customer and every replication report into a simcore result store
+    tables = {
+        'customers': [('replication', '<u4'), ('customer', '<u4')]
+                     + [(name, 'u1' if name == 'server_assigned' else '<i4') for name in CUSTOMER_COLUMNS],
+        'replications': [('replication', '<u4')] + [(name, '<f8') for name in REPORT_METRICS]
+    }
+    metadata = {'num_customers': num_customers, 'policy': policy, 'servers': list(SERVICE_DISTS)}
+    capacity = {'customers': num_replications * num_customers, 'replications': num_replications}
+    write_batches(directory, 'two_server', tables,
+                  partial(write_replications, num_customers=num_customers, policy=policy),
+                  num_replications, seed, metadata, capacity, batch_size)
@@ -0,0 +1,107 @@
+import numpy as np
+
+from simulasi_2_server import ARRIVAL_DELAY_DIST, SERVICE_DISTS
+
+POLICIES = ["Ali first", "Random tie-break"]
+
+
+def states(max_backlog):
+    # State index a * (max_backlog + 1) + b, where a and b are the time until
+    # Ali and Badu are free when a customer arrives
+    return np.divmod(np.arange((max_backlog + 1) ** 2), max_backlog + 1)
+
+
+def ali_probability(policy, a, b):
+    """Probability that the arriving customer goes to Ali in state (a, b)."""
+    if policy == "Ali first":
+        # Ali when idle, else Badu when idle, else whoever is free first (Ali on ties)
+        return ((a == 0) | ((b != 0) & (a <= b))).astype(float)
+    elif policy == "Random tie-break":
+        # The free (or first free) server, a coin flip when they are free together
+        return np.where(a == b, 0.5, (a < b).astype(float))
+    raise ValueError(f"Unknown dispatch policy {policy}")
+
+
+def transition_matrix(policy, max_backlog):
+    """Sparse transition matrix of the chain embedded at arrival epochs.
+
+    The assigned server's backlog grows by its service time, then both
+    backlogs shrink by the next arrival delay. Backlogs past
+    ``max_backlog`` are clipped to it.
+    """
+    from scipy.sparse import coo_matrix
+
+    a, b = states(max_backlog)
+    p_ali = ali_probability(policy, a, b)
+    arrival = list(zip(ARRIVAL_DELAY_DIST.values, ARRIVAL_DELAY_DIST.probabilities))
+
+    rows, cols, values = [], [], []
+    for server, p_server in (("Ali", p_ali), ("Badu", 1 - p_ali)):
+        service_dist = SERVICE_DISTS[server]
+        for service_time, p_service in zip(service_dist.values, service_dist.probabilities):
+            for delay, p_delay in arrival:
+                next_a = a + service_time if server == "Ali" else a
+                next_b = b + service_time if server == "Badu" else b
+                next_a = np.minimum(np.maximum(next_a - delay, 0), max_backlog)
+                next_b = np.minimum(np.maximum(next_b - delay, 0), max_backlog)
+                probability = p_server * p_service * p_delay
+                moves = probability > 0
+                rows.append(np.flatnonzero(moves))
+                cols.append((next_a * (max_backlog + 1) + next_b)[moves])
+                values.append(probability[moves])
+
+    size = (max_backlog + 1) ** 2
+    return coo_matrix((np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+                      shape=(size, size)).tocsr()
+
+
+def stationary_distribution(transition):
+    # pi (P - I) = 0 with the first equation replaced by sum(pi) = 1
+    from scipy.sparse import identity
+    from scipy.sparse.linalg import spsolve
+
+    system = (transition.T - identity(transition.shape[0], format='csr')).tolil()
+    system[0, :] = 1.0
+    rhs = np.zeros(transition.shape[0])
+    rhs[0] = 1.0
+    return spsolve(system.tocsr(), rhs)
+
+
+def solve(policy="Ali first", max_backlog=16, tol=1e-10):
+    """Steady state of the two-server system under a dispatch policy.
+
+    The backlogs are unbounded once customers queue, so the state space is
+    truncated at ``max_backlog`` and doubled until the stationary mass on
+    the truncation boundary is below ``tol``.
+    """
+    while True:
+        pi = stationary_distribution(transition_matrix(policy, max_backlog))
+        a, b = states(max_backlog)
+        boundary_mass = pi[(a == max_backlog) | (b == max_backlog)].sum()
+        if boundary_mass < tol:
+            break
+        max_backlog *= 2
+
+    p_ali = ali_probability(policy, a, b)
+    share = {"Ali": pi @ p_ali, "Badu": pi @ (1 - p_ali)}
+    arrival_rate = 1 / ARRIVAL_DELAY_DIST.mean
+    return {
+        'mean_wait': pi @ (p_ali * a + (1 - p_ali) * b),
+        'probability_no_wait': pi @ (p_ali * (a == 0) + (1 - p_ali) * (b == 0)),
+        'share': share,
+        'utilization': {server: arrival_rate * share[server] * SERVICE_DISTS[server].mean for server in share},
+        'max_backlog': max_backlog,
+        'boundary_mass': boundary_mass
+    }
+
+
+if __name__ == '__main__':
+    for policy in POLICIES:
+        solution = solve(policy)
+        print(f"Steady state, {policy} (backlog truncated at {solution['max_backlog']}): ")
+        print(f"Average Waiting Time: {solution['mean_wait']}")
+        print(f"Probability of not waiting: {solution['probability_no_wait']}")
+        for server in ("Ali", "Badu"):
+            print(f"Share of customers served by {server}: {solution['share'][server]}")
+            print(f"Utilization of {server}: {solution['utilization'][server]}")
+        print()
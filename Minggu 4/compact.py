@@ -0,0 +1,89 @@
+import numpy as np
+
+# Lengths are whole decimetres, types are the vehicle_count_by_type index
+DECK_LENGTH_DM = 320
+VEHICLE_CODES = {'Car': 0, 'Lorry': 1, 'Motorcycle': 2}
+
+
+class DeckManifest:
+    """Load plans of many decks in a few flat arrays.
+
+    Every loaded vehicle is one entry of ``types`` (uint8), ``lengths``
+    (int16 decimetres) and ``columns`` (uint8), in loading order. Deck ``i``
+    owns entries ``offsets[i]:offsets[i + 1]``.
+    """
+
+    def __init__(self, capacity=1024, deck_capacity=128):
+        self.types = np.empty(capacity, dtype=np.uint8)
+        self.lengths = np.empty(capacity, dtype=np.int16)
+        self.columns = np.empty(capacity, dtype=np.uint8)
+        self.offsets = np.zeros(deck_capacity + 1, dtype=np.int64)
+        self.size = 0
+        self.num_decks = 0
+
+    def __len__(self):
+        return self.num_decks
+
+    @staticmethod
+    def _grow(buffer, used, needed):
+        if needed <= len(buffer):
+            return buffer
+        grown = np.empty(max(needed, 2 * len(buffer)), dtype=buffer.dtype)
+        grown[:used] = buffer[:used]
+        return grown
+
+    def _reserve(self, vehicles, decks):
+        self.types = self._grow(self.types, self.size, self.size + vehicles)
+        self.lengths = self._grow(self.lengths, self.size, self.size + vehicles)
+        self.columns = self._grow(self.columns, self.size, self.size + vehicles)
+        self.offsets = self._grow(self.offsets, self.num_decks + 1, self.num_decks + decks + 1)
+
+    def append_deck(self, deck):
+        # deck is a loaded main.FerryDeck
+        self._reserve(sum(len(vehicles) for vehicles in deck.deck), 1)
+        for column, vehicles in enumerate(deck.deck):
+            count = len(vehicles)
+            self.types[self.size:self.size + count] = [VEHICLE_CODES[vehicle.type] for vehicle in vehicles]
+            self.lengths[self.size:self.size + count] = [vehicle.decimetres for vehicle in vehicles]
+            self.columns[self.size:self.size + count] = column
+            self.size += count
+        self.num_decks += 1
+        self.offsets[self.num_decks] = self.size
+
+    def extend(self, deck_counts, types, lengths, columns):
+        # Bulk append, entries already grouped by deck with deck_counts entries each
+        count = len(types)
+        self._reserve(count, len(deck_counts))
+        self.types[self.size:self.size + count] = types
+        self.lengths[self.size:self.size + count] = lengths
+        self.columns[self.size:self.size + count] = columns
+        self.offsets[self.num_decks + 1:self.num_decks + len(deck_counts) + 1] = self.size + np.cumsum(deck_counts)
+        self.size += count
+        self.num_decks += len(deck_counts)
+
+    def deck(self, i):
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.types[start:end], self.lengths[start:end], self.columns[start:end]
+
+    def space_remaining(self):
+        # (decks x 2) decimetres left on every deck
+        deck_index = np.repeat(np.arange(self.num_decks), np.diff(self.offsets[:self.num_decks + 1]))
+        used = np.zeros((self.num_decks, 2), dtype=np.int64)
+        np.add.at(used, (deck_index, self.columns[:self.size]), self.lengths[:self.size])
+        return DECK_LENGTH_DM - used
+
+    def save(self, path):
+        np.savez(path, types=self.types[:self.size], lengths=self.lengths[:self.size],
+                 columns=self.columns[:self.size], offsets=self.offsets[:self.num_decks + 1])
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        manifest = cls(0, 0)
+        manifest.types = data['types']
+        manifest.lengths = data['lengths']
+        manifest.columns = data['columns']
+        manifest.offsets = data['offsets']
+        manifest.size = len(manifest.types)
+        manifest.num_decks = len(manifest.offsets) - 1
+        return manifest
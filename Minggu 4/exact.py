@@ -0,0 +1,103 @@
+import numpy as np
+
+from compact import DECK_LENGTH_DM
+from main import VEHICLE_LENGTHS, VEHICLE_TYPE_DIST
+
+# Type codes follow FerryDeck.vehicle_count_by_type
+VEHICLE_TYPES = ['Car', 'Lorry', 'Motorcycle']
+
+
+def length_pmf():
+    """(3 x max length + 1) probability of drawing each type and decimetre length.
+
+    ``random_vehicle`` draws the type from VEHICLE_TYPE_DIST and a uniform
+    length that ``Vehicle`` truncates to 0.1m, so every whole decimetre in
+    [low, high) is equally likely.
+    """
+    type_probabilities = dict(zip(VEHICLE_TYPE_DIST.values, VEHICLE_TYPE_DIST.probabilities))
+    longest = max(int(round(high * 10)) for _, high in VEHICLE_LENGTHS.values())
+    pmf = np.zeros((len(VEHICLE_TYPES), longest + 1))
+    for code, vehicle_type in enumerate(VEHICLE_TYPES):
+        low, high = (int(round(bound * 10)) for bound in VEHICLE_LENGTHS[vehicle_type])
+        pmf[code, low:high] = type_probabilities.get(vehicle_type, 0.0) / (high - low)
+    return pmf
+
+
+def solve_one_deck_first(pmf=None, deck_length=DECK_LENGTH_DM):
+    """Exact expectations of one deck loaded with procedure 1.
+
+    The deck state is the remaining decimetres (r0, r1) of both columns. A
+    vehicle of length L goes to column 0 if L <= r0, else to column 1 if
+    L <= r1, else the deck is closed with r0 + r1 wasted. Mass only moves to
+    a smaller r0 or, within a row, to a smaller r1, so rows are solved from
+    r0 = deck_length down. Inside a row the moves to column 1 are the
+    recurrence m[r1] = in[r1] + sum(q[L] * m[r1 + L] for L > r0), which is
+    an IIR filter over the reversed row.
+
+    Returns a dict with the expected wasted space (m), vehicles carried,
+    vehicles carried by type and the type shares.
+    """
+    from scipy.signal import lfilter
+
+    if pmf is None:
+        pmf = length_pmf()
+    q = pmf.sum(axis=0)
+    longest = len(q) - 1
+    size = deck_length + 1
+
+    # Probability that a vehicle of length <= r loads, per type, for r = 0..deck_length
+    fits_by_type = np.cumsum(np.pad(pmf, ((0, 0), (0, max(0, size - pmf.shape[1])))), axis=1)[:, :size]
+    fits = fits_by_type.sum(axis=0)
+    r = np.arange(size)
+
+    mass = np.zeros((size, size))
+    mass[deck_length, deck_length] = 1.0
+    wasted_space = 0.0
+    vehicles_by_type = np.zeros(len(VEHICLE_TYPES))
+
+    for r0 in range(deck_length, -1, -1):
+        # Vehicles longer than r0 fall through to column 1
+        a = np.zeros(longest + 1)
+        a[0] = 1.0
+        a[r0 + 1:] = -q[r0 + 1:]
+        row = lfilter([1.0], a, mass[r0, ::-1])[::-1]
+
+        # A vehicle loads when it fits the roomier column
+        room = np.maximum(r0, r)
+        wasted_space += row @ ((1.0 - fits[room]) * (r0 + r))
+        vehicles_by_type += fits_by_type[:, room] @ row
+
+        for length in range(1, min(r0, longest) + 1):
+            if q[length]:
+                mass[r0 - length] += q[length] * row
+
+    vehicles_carried = vehicles_by_type.sum()
+    return {
+        'wasted_space': wasted_space / 10.0,
+        'vehicles_carried': vehicles_carried,
+        'vehicles_by_type': dict(zip(VEHICLE_TYPES, vehicles_by_type)),
+        'type_shares': dict(zip(VEHICLE_TYPES, vehicles_by_type / vehicles_carried)),
+    }
+
+
+def exact_report(solution, deck_length=DECK_LENGTH_DM):
+    # Same lines as report(), without rounding noise to average away
+    string = ''
+    string += 'Exact solution\n'
+    string += 'Algorithm: 1\n'
+    string += f"Average wasted space: {round(solution['wasted_space'] * 1000 / (2 * deck_length), 2)}%\n"
+    string += f"Average vehicles carried: {solution['vehicles_carried']}\n"
+    string += f"Average cars carried: {round(solution['type_shares']['Car'] * 100, 2)}%\n"
+    string += f"Average lorries carried: {round(solution['type_shares']['Lorry'] * 100, 2)}%\n"
+    string += f"Average motorcycles carried: {round(solution['type_shares']['Motorcycle'] * 100, 2)}%\n"
+    return string
+
+
+def reference_line(solution, deck_length=DECK_LENGTH_DM):
+    # The headline figures of exact_report() on one line, next to a simulated report
+    return (f"Exact: average wasted space {round(solution['wasted_space'] * 1000 / (2 * deck_length), 2)}%, "
+            f"average vehicles carried {solution['vehicles_carried']:.4f}\n")
+
+
+if __name__ == '__main__':
+    print(exact_report(solve_one_deck_first()))
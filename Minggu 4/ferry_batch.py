@@ -0,0 +1,167 @@
+import os
+import sys
+from functools import partial
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from simcore.cache import cached_rows
+from simcore.store import write_batches
+from compact import DECK_LENGTH_DM, DeckManifest
+from main import VEHICLE_LENGTHS, VEHICLE_TYPE_DIST, report
+
+# Same deck as FerryDeck, DECK_LENGTH_DM long
+COLUMNS = 2
+# Vehicle rows simulate_to_store reserves per deck, a deck takes under 9 on average
+VEHICLES_PER_DECK = 10
+
+# Type codes follow FerryDeck.vehicle_count_by_type
+VEHICLE_TYPES = ['Car', 'Lorry', 'Motorcycle']
+TYPE_BY_ROLL = np.array([0] + [VEHICLE_TYPES.index(vehicle_type) for vehicle_type
+                               in VEHICLE_TYPE_DIST.lookup(np.arange(1, VEHICLE_TYPE_DIST.die + 1))])
+LENGTH_LOW = np.array([VEHICLE_LENGTHS[vehicle_type][0] for vehicle_type in VEHICLE_TYPES])
+LENGTH_HIGH = np.array([VEHICLE_LENGTHS[vehicle_type][1] for vehicle_type in VEHICLE_TYPES])
+
+
+def random_vehicles(u_type, u_length):
+    # random_vehicle() for many decks at once, from uniforms in [0, 1)
+    types = TYPE_BY_ROLL[(u_type * VEHICLE_TYPE_DIST.die).astype(np.intp) + 1]
+    low = LENGTH_LOW[types]
+    length = low + (LENGTH_HIGH[types] - low) * u_length
+    # Whole decimetres like Vehicle.__init__
+    return types, np.trunc(length * 10).astype(np.int16)
+
+
+def column_order(algorithm, types, u_column):
+    # First and second column each deck tries for its next vehicle
+    random_first = (u_column < 0.5).astype(np.intp)
+    if algorithm == 1:
+        first = np.zeros(len(types), dtype=np.intp)
+    elif algorithm == 2:
+        # Cars on column 0, lorries on column 1, motorcycles anywhere
+        first = np.where(types == 0, 0, np.where(types == 1, 1, random_first))
+    elif algorithm == 3:
+        first = random_first
+    else:
+        raise ValueError(f"Loading procedure {algorithm} has no batched version")
+    return first, 1 - first
+
+
+def load_decks(total_sim, algorithm=1, rng=None, uniforms=None, compact=False, manifest=None):
+    """Load ``total_sim`` decks until each one rejects a vehicle.
+
+    Returns the (decks x columns) space remaining in metres and the
+    (decks x 3) vehicle count by type. ``uniforms(step, decks)`` supplies
+    the (3 x len(decks)) type, length and column uniforms of every
+    still-open deck; by default they come from ``rng``.
+
+    Lengths and space are int16 decimetres as in FerryDeck, and with
+    ``compact`` the space remaining comes back in decimetres. A
+    ``DeckManifest`` passed as ``manifest`` receives every loaded vehicle
+    (implies ``compact``).
+    """
+    if uniforms is None:
+        rng = np.random.default_rng(rng)
+        uniforms = lambda step, decks: rng.random((3, len(decks)))
+    compact = compact or manifest is not None
+
+    space_remaining = np.full((total_sim, COLUMNS), DECK_LENGTH_DM, dtype=np.int16)
+    loaded_steps = []
+    vehicle_count_by_type = np.zeros((total_sim, len(VEHICLE_TYPES)), dtype=np.int64)
+    open_decks = np.arange(total_sim)
+    step = 0
+
+    while len(open_decks):
+        u_type, u_length, u_column = uniforms(step, open_decks)
+        types, lengths = random_vehicles(u_type, u_length)
+        first, second = column_order(algorithm, types, u_column)
+
+        space = space_remaining[open_decks]
+        rows = np.arange(len(open_decks))
+        fits_first = space[rows, first] >= lengths
+        loaded = fits_first | (space[rows, second] >= lengths)
+        column = np.where(fits_first, first, second)
+
+        decks = open_decks[loaded]
+        space_remaining[decks, column[loaded]] -= lengths[loaded]
+        vehicle_count_by_type[decks, types[loaded]] += 1
+        if manifest is not None:
+            loaded_steps.append((decks, types[loaded].astype(np.uint8), lengths[loaded],
+                                 column[loaded].astype(np.uint8)))
+        open_decks = decks
+        step += 1
+
+    if manifest is not None and total_sim:
+        # Steps are in loading order, a stable sort by deck groups them per deck
+        decks, types, lengths, columns = (np.concatenate(part) for part in zip(*loaded_steps))
+        order = np.argsort(decks, kind='stable')
+        manifest.extend(np.bincount(decks, minlength=total_sim), types[order], lengths[order], columns[order])
+
+    if compact:
+        return space_remaining, vehicle_count_by_type
+    return space_remaining / 10.0, vehicle_count_by_type
+
+
+def simulate_batch(total_sim, algorithm=1, rng=None):
+    # Batched simulate(), prints the same report
+    space_remaining, vehicle_count_by_type = load_decks(total_sim, algorithm, rng)
+    total_cars_carried, total_lorries_carried, total_motorcycles_carried = vehicle_count_by_type.sum(axis=0)
+    print(report(total_sim, algorithm, space_remaining.sum(), vehicle_count_by_type.sum(),
+                 total_cars_carried, total_lorries_carried, total_motorcycles_carried))
+
+
+def deck_rows(rng, count, algorithm=1):
+    # One row per deck: wasted space (m) and the vehicle count by type
+    space_remaining, vehicle_count_by_type = load_decks(count, algorithm, rng)
+    return np.column_stack([space_remaining.sum(axis=1), vehicle_count_by_type])
+
+
+CACHE_VERSION = 2
+
+
+def cached_simulate(total_sim, algorithm=1, seed=0, cache=None, workers=1):
+    # simulate_batch() from cached deck rows, prints the same report
+    parameters = {'algorithm': algorithm, 'deck_length': DECK_LENGTH_DM, 'columns': COLUMNS,
+                  'vehicle_types': VEHICLE_TYPE_DIST, 'vehicle_lengths': VEHICLE_LENGTHS}
+    rows = cached_rows('ferry', parameters, partial(deck_rows, algorithm=algorithm), total_sim, seed, CACHE_VERSION,
+                       cache, block_size=10000, names=['wasted_space'] + VEHICLE_TYPES, workers=workers)
+    total_cars_carried, total_lorries_carried, total_motorcycles_carried = rows[:, 1:].sum(axis=0)
+    print(report(total_sim, algorithm, rows[:, 0].sum(), rows[:, 1:].sum(),
+                 total_cars_carried, total_lorries_carried, total_motorcycles_carried))
+
+
+def write_decks(writer, rng, deck, algorithm=1):
+    manifest = DeckManifest()
+    space_remaining, vehicle_count_by_type = load_decks(len(deck), algorithm, rng, manifest=manifest)
+    writer.append('decks', {
+        'deck': deck, 'space_remaining_0': space_remaining[:, 0], 'space_remaining_1': space_remaining[:, 1],
+        **{f'{vehicle_type.lower()}_count': vehicle_count_by_type[:, i] for i, vehicle_type in enumerate(VEHICLE_TYPES)}
+    })
+    writer.append('vehicles', {
+        'deck': np.repeat(deck, np.diff(manifest.offsets[:len(manifest) + 1])),
+        'type': manifest.types[:manifest.size], 'length': manifest.lengths[:manifest.size],
+        'column': manifest.columns[:manifest.size]
+    })
+
+
+def simulate_to_store(directory, total_sim, algorithm=1, seed=None, batch_size=10**5):
+    # Every deck and every loaded vehicle (compact decimetres) into a simcore result store
+    tables = {
+        'decks': [('deck', '<u4'), ('space_remaining_0', '<i2'), ('space_remaining_1', '<i2')]
+                 + [(f'{vehicle_type.lower()}_count', 'u1') for vehicle_type in VEHICLE_TYPES],
+        'vehicles': [('deck', '<u4'), ('type', 'u1'), ('length', '<i2'), ('column', 'u1')]
+    }
+    metadata = {'algorithm': algorithm, 'vehicle_types': VEHICLE_TYPES, 'length_unit': 'dm'}
+    capacity = {'decks': total_sim, 'vehicles': total_sim * VEHICLES_PER_DECK}
+    write_batches(directory, 'ferry', tables, partial(write_decks, algorithm=algorithm), total_sim, seed, metadata,
+                  capacity, batch_size)
+
+
+def main():
+    simulate_batch(10**6, 1)
+    simulate_batch(10**6, 2)
+    simulate_batch(10**6, 3)
+
+if __name__ == '__main__':
+    main()
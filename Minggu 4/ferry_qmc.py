@@ -0,0 +1,95 @@
+import functools
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ferry_batch import load_decks
+from simcore.replication import run_replications
+from simcore.stats import OnlineStats
+
+# Loading steps fed from the Sobol sequence, a deck rarely takes more vehicles
+MAX_SOBOL_STEPS = 32
+METRICS = ['Average wasted space (%)', 'Average vehicles carried', 'Average cars carried (%)',
+           'Average lorries carried (%)', 'Average motorcycles carried (%)']
+
+
+def sobol_uniforms(num_decks, rng, max_steps=MAX_SOBOL_STEPS):
+    """``load_decks`` uniforms from one scrambled Sobol sequence.
+
+    Deck ``i`` is point ``i`` of the sequence and loading step ``k`` uses
+    its dimensions ``3k`` to ``3k + 2`` (type, length, column), so the first
+    vehicles of every deck get the best-balanced dimensions. Steps past
+    ``max_steps`` fall back to ``rng``.
+    """
+    from scipy.stats import qmc
+
+    rng = np.random.default_rng(rng)
+    points = qmc.Sobol(3 * max_steps, scramble=True, seed=rng).random(num_decks)
+
+    def uniforms(step, decks):
+        if step < max_steps:
+            return points[decks, 3 * step:3 * step + 3].T
+        return rng.random((3, len(decks)))
+    return uniforms
+
+
+def deck_averages(space_remaining, vehicle_count_by_type):
+    # Same figures as report(), from one batch of decks
+    vehicles_carried = vehicle_count_by_type.sum()
+    type_shares = vehicle_count_by_type.sum(axis=0) * 100 / vehicles_carried
+    return (space_remaining.sum() * 100 / (len(space_remaining) * 64), vehicles_carried / len(space_remaining),
+            *type_shares)
+
+
+def replicate(rng, num_decks, algorithm=1, sampling='sobol'):
+    # One randomized replication: a freshly scrambled Sobol sequence, or plain Monte Carlo
+    uniforms = sobol_uniforms(num_decks, rng) if sampling == 'sobol' else None
+    return deck_averages(*load_decks(num_decks, algorithm, rng, uniforms))
+
+
+def replication_rows(rng, count, num_decks, algorithm=1, sampling='sobol'):
+    # count replications of num_decks decks, one row of METRICS each
+    return np.array([replicate(rng, num_decks, algorithm, sampling) for _ in range(count)])
+
+
+def estimate(num_decks, num_replications=16, algorithm=1, sampling='sobol', seed=None, workers=1):
+    """Randomized QMC estimate of the ferry averages.
+
+    Runs ``num_replications`` independently scrambled sequences of
+    ``num_decks`` decks each (a power of two keeps the Sobol balance) and
+    returns an OnlineStats over the replication averages, so the
+    confidence interval comes from the spread between scramblings.
+    """
+    stats = OnlineStats(METRICS)
+    for result in run_replications(functools.partial(replicate, num_decks=num_decks, algorithm=algorithm,
+                                                     sampling=sampling),
+                                   num_replications, seed, workers):
+        stats.update(result)
+    return stats
+
+
+def print_estimate(stats, title):
+    print(title)
+    for name, (mean, half_width) in stats.summary().items():
+        print(f"{name}: {mean:.4f} ± {half_width:.4f}")
+    print()
+
+
+def main():
+    # Same deck budget both ways, the variance ratio is how many times fewer
+    # decks randomized QMC needs for the same half-width
+    for algorithm in (1, 2, 3):
+        monte_carlo = estimate(1024, 16, algorithm, 'random', seed=algorithm)
+        sobol = estimate(1024, 16, algorithm, 'sobol', seed=algorithm)
+        print_estimate(monte_carlo, f"Algorithm {algorithm}, Monte Carlo, 16 x 1024 decks")
+        print_estimate(sobol, f"Algorithm {algorithm}, randomized QMC, 16 x 1024 decks")
+        print("Variance ratio, Monte Carlo / randomized QMC")
+        for name, ratio in zip(METRICS, monte_carlo.variance / sobol.variance):
+            print(f"{name}: {ratio:.1f}")
+        print()
+
+if __name__ == '__main__':
+    main()
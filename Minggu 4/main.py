@@ -1,10 +1,25 @@
+import itertools
+import os
 import random
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from simcore.distributions import DiscreteDistribution
+from compact import DECK_LENGTH_DM
 
 
 class Vehicle:
+    __slots__ = ('type', 'decimetres')
+
     def __init__(self, vehicle_type, length):
         self.type = vehicle_type
-        self.length = int(length*10)/10.0
+        # Truncated to whole decimetres, so loading compares exact integers
+        self.decimetres = int(length*10)
+
+    @property
+    def length(self):
+        return self.decimetres/10.0
 
     def __str__(self):
         return self.type + ', ' + str(self.length) + 'm'
@@ -12,7 +27,8 @@ class Vehicle:
 
 class FerryDeck:
     def __init__(self, loading_proceduce):
-        self.length = 32.0
+        # Lengths and space in whole decimetres
+        self.length = DECK_LENGTH_DM
         self.columns = 2
         self.deck = [[], []]
         self.space_remaining = [self.length] * self.columns
@@ -20,6 +36,12 @@ class FerryDeck:
         self.vehicle_count_by_type = [0, 0, 0]
         self.last_vehicle_failed_to_load = None
         self.loading_proceduce = loading_proceduce
+        if loading_proceduce == 5:
+            # Arrivals so far, their total length and the reachable column 0
+            # sums after each of them, as bitsets
+            self.arrivals = []
+            self.arrivals_length = 0
+            self.reachable = [1]
 
     def load_vehicle(self, vehicle):
         if self.loading_proceduce == 1:
@@ -28,6 +50,8 @@ class FerryDeck:
             return self.__load_cars_and_lorries_separately(vehicle)
         elif self.loading_proceduce == 3:
             return self.__load_randomly(vehicle)
+        elif self.loading_proceduce == 5:
+            return self.__load_optimally(vehicle)
         else:
             vehicle = random_vehicle_no_motor()
             return self.__load_motorcyle_after(vehicle)
@@ -35,9 +59,9 @@ class FerryDeck:
     def __load_one_deck_first(self, vehicle):
         for i in range(self.columns):
             #print(f"remaining space: {self.space_remaining[i]}")
-            if self.space_remaining[i] >= vehicle.length:
+            if self.space_remaining[i] >= vehicle.decimetres:
                 self.deck[i].append(vehicle)
-                self.space_remaining[i] -= vehicle.length
+                self.space_remaining[i] -= vehicle.decimetres
                 self.vehicle_count += 1
                 if vehicle.type == 'Car':
                     self.vehicle_count_by_type[0] += 1
@@ -52,30 +76,30 @@ class FerryDeck:
 
     def __load_cars_and_lorries_separately(self, vehicle):
         if vehicle.type == 'Car':
-            if self.space_remaining[0] >= vehicle.length:
+            if self.space_remaining[0] >= vehicle.decimetres:
                 self.deck[0].append(vehicle)
-                self.space_remaining[0] -= vehicle.length
+                self.space_remaining[0] -= vehicle.decimetres
                 self.vehicle_count += 1
                 self.vehicle_count_by_type[0] += 1
                 return 1
-            elif self.space_remaining[1] >= vehicle.length:
+            elif self.space_remaining[1] >= vehicle.decimetres:
                 self.deck[1].append(vehicle)
-                self.space_remaining[1] -= vehicle.length
+                self.space_remaining[1] -= vehicle.decimetres
                 self.vehicle_count += 1
                 self.vehicle_count_by_type[0] += 1
                 return 1
             else:
                 return 0
         elif vehicle.type == 'Lorry':
-            if self.space_remaining[1] >= vehicle.length:
+            if self.space_remaining[1] >= vehicle.decimetres:
                 self.deck[1].append(vehicle)
-                self.space_remaining[1] -= vehicle.length
+                self.space_remaining[1] -= vehicle.decimetres
                 self.vehicle_count += 1
                 self.vehicle_count_by_type[1] += 1
                 return 1
-            elif self.space_remaining[0] >= vehicle.length:
+            elif self.space_remaining[0] >= vehicle.decimetres:
                 self.deck[0].append(vehicle)
-                self.space_remaining[0] -= vehicle.length
+                self.space_remaining[0] -= vehicle.decimetres
                 self.vehicle_count += 1
                 self.vehicle_count_by_type[1] += 1
                 return 1
@@ -89,9 +113,9 @@ class FerryDeck:
         random.shuffle(random_col)
 
         for i in random_col:
-            if self.space_remaining[i] >= vehicle.length:
+            if self.space_remaining[i] >= vehicle.decimetres:
                 self.deck[i].append(vehicle)
-                self.space_remaining[i] -= vehicle.length
+                self.space_remaining[i] -= vehicle.decimetres
                 self.vehicle_count += 1
                 if vehicle.type == 'Car':
                     self.vehicle_count_by_type[0] += 1
@@ -107,9 +131,9 @@ class FerryDeck:
     def __load_motorcyle_after(self, vehicle):
         for i in range(self.columns):
             # print(f"remaining space: {self.space_remaining[i]}")
-            if self.space_remaining[i] >= vehicle.length:
+            if self.space_remaining[i] >= vehicle.decimetres:
                 self.deck[i].append(vehicle)
-                self.space_remaining[i] -= vehicle.length
+                self.space_remaining[i] -= vehicle.decimetres
                 self.vehicle_count += 1
                 if vehicle.type == 'Car':
                     self.vehicle_count_by_type[0] += 1
@@ -117,15 +141,62 @@ class FerryDeck:
                     self.vehicle_count_by_type[1] += 1
             else:
                 vehicle = random_vehicle_only_motor()
-                if self.space_remaining[i] >= vehicle.length:
+                if self.space_remaining[i] >= vehicle.decimetres:
                     self.deck[i].append(vehicle)
-                    self.space_remaining[i] -= vehicle.length
+                    self.space_remaining[i] -= vehicle.decimetres
                     self.vehicle_count += 1
                     self.vehicle_count_by_type[2] += 1
 
         self.last_vehicle_failed_to_load = vehicle
         return 0
 
+    def __load_optimally(self, vehicle):
+        # Upper bound for the heuristics: loads the longest prefix of the
+        # arrivals that fits the two columns in any assignment, repacking the
+        # columns on every load
+        capacity = self.length
+        length = vehicle.decimetres
+        total = self.arrivals_length + length
+        reachable = (self.reachable[-1] | (self.reachable[-1] << length)) & ((1 << (capacity + 1)) - 1)
+
+        # Column 0 sums that leave no more than capacity for column 1
+        least = max(0, total - capacity)
+        candidates = reachable >> least
+        if not candidates:
+            self.last_vehicle_failed_to_load = vehicle
+            return 0
+        self.arrivals.append(vehicle)
+        self.arrivals_length = total
+        self.reachable.append(reachable)
+
+        # Walk back through the arrivals, a vehicle is on column 0 when its
+        # sum is not reachable without it
+        column_0 = least + (candidates & -candidates).bit_length() - 1
+        self.deck = [[], []]
+        for i in range(len(self.arrivals) - 1, -1, -1):
+            if self.reachable[i] >> column_0 & 1:
+                self.deck[1].append(self.arrivals[i])
+            else:
+                self.deck[0].append(self.arrivals[i])
+                column_0 -= self.arrivals[i].decimetres
+        for i in range(self.columns):
+            self.deck[i].reverse()
+            self.space_remaining[i] = capacity - sum(loaded.decimetres for loaded in self.deck[i])
+
+        self.vehicle_count += 1
+        if vehicle.type == 'Car':
+            self.vehicle_count_by_type[0] += 1
+        elif vehicle.type == 'Lorry':
+            self.vehicle_count_by_type[1] += 1
+        else:
+            self.vehicle_count_by_type[2] += 1
+        return 1
+
+    @property
+    def wasted_space(self):
+        # In metres
+        return sum(self.space_remaining)/10.0
+
     def __str__(self):
         string = ''
         for i in range(self.columns):
@@ -133,8 +204,8 @@ class FerryDeck:
             for vehicle in self.deck[i]:
                 string += vehicle.__str__()
                 string += '; '
-            string += f'\nWasted space: {self.space_remaining[i]}m\n\n'
-        string += f'Total wasted space: {sum(self.space_remaining)}m\n'
+            string += f'\nWasted space: {self.space_remaining[i]/10.0}m\n\n'
+        string += f'Total wasted space: {self.wasted_space}m\n'
         string += f'Total vehicles carried: {self.vehicle_count}\n'
         string += f'Total cars carried: {self.vehicle_count_by_type[0]}\n'
         string += f'Total lorries carried: {self.vehicle_count_by_type[1]}\n'
@@ -144,51 +215,36 @@ class FerryDeck:
             {self.last_vehicle_failed_to_load.__str__()}\n'
         return string
 
-def random_vehicle():
-    r = random.randint(1, 100)
-    if r <= 40:
-        length = random.uniform(3.5, 5.5)
-        return Vehicle('Car', length)
-    elif r <= 95:
-        length = random.uniform(8.0, 10.0)
-        return Vehicle('Lorry', length)
-    else:
-        length = random.uniform(0.7, 0.9)
-        return Vehicle('Motorcycle', length)
+VEHICLE_TYPE_DIST = DiscreteDistribution.from_range_table([
+    (1, 40, 'Car'),
+    (41, 95, 'Lorry'),
+    (96, 100, 'Motorcycle')
+])
+# random.uniform(1.0, 100.0) <= 42.5 is a car
+NO_MOTOR_TYPE_DIST = DiscreteDistribution(['Car', 'Lorry'], [41.5, 57.5])
+VEHICLE_LENGTHS = {
+    'Car': (3.5, 5.5),
+    'Lorry': (8.0, 10.0),
+    'Motorcycle': (0.7, 0.9)
+}
+
+def random_vehicle(rng=random):
+    vehicle_type = VEHICLE_TYPE_DIST.draw(rng)
+    length = rng.uniform(*VEHICLE_LENGTHS[vehicle_type])
+    return Vehicle(vehicle_type, length)
     
 def random_vehicle_no_motor():
-    r = random.uniform(1.0, 100.0)
-    if r <= 42.5:
-        length = random.uniform(3.5, 5.5)
-        return Vehicle('Car', length)
-    else:
-        length = random.uniform(8.0, 10.0)
-        return Vehicle('Lorry', length)
+    vehicle_type = NO_MOTOR_TYPE_DIST.draw()
+    length = random.uniform(*VEHICLE_LENGTHS[vehicle_type])
+    return Vehicle(vehicle_type, length)
     
 def random_vehicle_only_motor():
-    length = random.uniform(0.7, 0.9)
+    length = random.uniform(*VEHICLE_LENGTHS['Motorcycle'])
     return Vehicle('Motorcycle', length)
 
-def simulate(total_sim, algorithm=1):
-    total_wasted_space = 0
-    total_vehicles_carried = 0
-    total_cars_carried = 0
-    total_lorries_carried = 0
-    total_motorcycles_carried = 0
-
-    for i in range(total_sim):
-        ferry_deck = FerryDeck(algorithm)
-        while ferry_deck.load_vehicle(random_vehicle()):
-            pass
-
-        total_wasted_space += sum(ferry_deck.space_remaining)
-        total_vehicles_carried += ferry_deck.vehicle_count
-        total_cars_carried += ferry_deck.vehicle_count_by_type[0]
-        total_lorries_carried += ferry_deck.vehicle_count_by_type[1]
-        total_motorcycles_carried += ferry_deck.vehicle_count_by_type[2]
-
-        #print(ferry_deck)
-
+def report(total_sim, algorithm, total_wasted_space, total_vehicles_carried,
+           total_cars_carried, total_lorries_carried, total_motorcycles_carried,
+           total_optimal_wasted_space=None):
     avg_wasted_space = round((total_wasted_space*100) / (total_sim*64), 2)
     avg_vehicles_carried = total_vehicles_carried / total_sim
     avg_cars_carried\
@@ -204,17 +260,70 @@ def simulate(total_sim, algorithm=1):
     string = ''
     string += f'Total simulation: {total_sim}\n'
     string += f'Algorithm: {algorithm}\n'
-    string += f'Average wasted space: {avg_wasted_space}%\n'
+    if total_optimal_wasted_space is None:
+        string += f'Average wasted space: {avg_wasted_space}%\n'
+    else:
+        # Gap to procedure 5 on the same arrivals, in percentage points
+        avg_optimal_wasted_space = round((total_optimal_wasted_space*100) / (total_sim*64), 2)
+        optimality_gap = round(((total_wasted_space - total_optimal_wasted_space)*100) / (total_sim*64), 2)
+        string += f'Average wasted space: {avg_wasted_space}% ' \
+                  f'(optimal {avg_optimal_wasted_space}%, gap {optimality_gap}%)\n'
     string += f'Average vehicles carried: {avg_vehicles_carried}\n'
     string += f'Average cars carried: {avg_cars_carried}%\n'
     string += f'Average lorries carried: {avg_lorries_carried}%\n'
     string +=\
         f'Average motorcycles carried: {avg_motorcycles_carried}%\n'
-    print(string)
+    return string
+
+def simulate(total_sim, algorithm=1):
+    total_wasted_space = 0
+    total_vehicles_carried = 0
+    total_cars_carried = 0
+    total_lorries_carried = 0
+    total_motorcycles_carried = 0
+    # Procedure 4 draws its own vehicles, procedure 5 is the optimum itself
+    paired = algorithm in (1, 2, 3)
+    total_optimal_wasted_space = 0 if paired else None
+    # The optimum's extra vehicles come from their own stream, seeded from
+    # the global state without drawing from it, so the heuristic decks are
+    # the same as in an unpaired run
+    optimal_rng = random.Random(hash(random.getstate()))
+
+    for i in range(total_sim):
+        ferry_deck = FerryDeck(algorithm)
+        arrivals = []
+        while True:
+            arrivals.append(random_vehicle())
+            if not ferry_deck.load_vehicle(arrivals[-1]):
+                break
+
+        if paired:
+            # Same arrivals, drawing more only if the optimum carries them
+            optimal_deck = FerryDeck(5)
+            for vehicle in itertools.chain(arrivals, iter(lambda: random_vehicle(optimal_rng), None)):
+                if not optimal_deck.load_vehicle(vehicle):
+                    break
+            total_optimal_wasted_space += optimal_deck.wasted_space
+
+        total_wasted_space += ferry_deck.wasted_space
+        total_vehicles_carried += ferry_deck.vehicle_count
+        total_cars_carried += ferry_deck.vehicle_count_by_type[0]
+        total_lorries_carried += ferry_deck.vehicle_count_by_type[1]
+        total_motorcycles_carried += ferry_deck.vehicle_count_by_type[2]
+
+        #print(ferry_deck)
+
+    print(report(total_sim, algorithm, total_wasted_space, total_vehicles_carried,
+                 total_cars_carried, total_lorries_carried, total_motorcycles_carried,
+                 total_optimal_wasted_space))
 
 
 def main():
+    # Procedure 1 also has an exact solution, the simulation should agree with
+    # it to within its noise
+    from exact import reference_line, solve_one_deck_first
     simulate(10000, 1)
+    print(reference_line(solve_one_deck_first()))
     simulate(10000, 2)
     simulate(10000, 3)
     #simulate(10, 4) # motors after
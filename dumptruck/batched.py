@@ -0,0 +1,213 @@
+import os
+import sys
+from functools import partial
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from simcore.cache import cached_rows
+from simcore.store import write_batches
+from main2 import DISTRIBUTIONS, NUM_LOADERS, NUM_SCALERS, NUM_TRUCKS, TIME_UNITS
+
+# Truck stages
+LOADER_QUEUE = 0
+LOADING = 1
+SCALER_QUEUE = 2
+SCALING = 3
+DUMPING = 4
+
+NO_TRUCK = -1
+NOT_QUEUED = np.iinfo(np.int64).max
+
+
+def _fill_servers(busy, stage, stamp, queue_stage, service_stage, slot, time_remaining,
+                  distribution, rng, process_times, process_counts):
+    # Hands the oldest queued truck of every replication to each free server, in server order
+    replications = np.arange(stage.shape[0])
+    for i in range(busy.shape[1]):
+        queued = np.where(stage == queue_stage, stamp, NOT_QUEUED)
+        first = queued.argmin(axis=1)
+        rows = np.flatnonzero((busy[:, i] == NO_TRUCK) & (queued[replications, first] != NOT_QUEUED))
+        if len(rows) == 0:
+            continue
+        trucks = first[rows]
+        durations = distribution.sample(len(rows), rng)
+        stage[rows, trucks] = service_stage
+        slot[rows, trucks] = i
+        time_remaining[rows, trucks] = durations
+        busy[rows, i] = trucks
+        process_times[rows] += durations
+        process_counts[rows] += 1
+
+
+def _finish_service(busy, stage, slot, time_remaining, service_stage):
+    # Counts down every truck in service and frees the servers that finished
+    in_service = stage == service_stage
+    time_remaining[in_service] -= 1
+    rows, trucks = np.nonzero(in_service & (time_remaining <= 0))
+    busy[rows, slot[rows, trucks]] = NO_TRUCK
+    return rows, trucks
+
+
+def simulate_batch(num_replications, horizon=TIME_UNITS, num_trucks=NUM_TRUCKS, num_loaders=NUM_LOADERS,
+                   num_scalers=NUM_SCALERS, distributions=DISTRIBUTIONS, rng=None):
+    # Runs R independent replications of the DumpTruckSystem tick loop in
+    # lockstep. Fleet state is kept as (replications x trucks) arrays and the
+    # loader and scaler assignments are vectorized masks, so the interpreter
+    # only loops over time units and servers. Queue order is kept with stamps:
+    # the smallest stamp is the front of the queue.
+    rng = np.random.default_rng(rng)
+    shape = (num_replications, num_trucks)
+
+    stage = np.full(shape, LOADER_QUEUE, dtype=np.int8)
+    slot = np.zeros(shape, dtype=np.int64)
+    time_remaining = np.zeros(shape, dtype=np.int32)
+    loader_wait_time = np.zeros(shape, dtype=np.int32)
+    scaler_wait_time = np.zeros(shape, dtype=np.int32)
+    loader_wait_count = np.zeros(shape, dtype=np.int32)
+    scaler_wait_count = np.zeros(shape, dtype=np.int32)
+    loader_seen = np.zeros(shape, dtype=bool)
+    scaler_seen = np.zeros(shape, dtype=bool)
+
+    # Initial loader queue is in truck order, ahead of anything stamped at time >= 0
+    loader_stamp = np.broadcast_to(np.arange(num_trucks, dtype=np.int64) - num_trucks, shape).copy()
+    scaler_stamp = np.zeros(shape, dtype=np.int64)
+    dumping_stamp = np.zeros(shape, dtype=np.int64)
+    stamps_per_tick = horizon * max(num_loaders, num_scalers) + 1
+
+    loader_busy = np.full((num_replications, num_loaders), NO_TRUCK, dtype=np.int64)
+    scaler_busy = np.full((num_replications, num_scalers), NO_TRUCK, dtype=np.int64)
+    loader_time_utilization = np.zeros((num_replications, num_loaders), dtype=np.int32)
+    scaler_time_utilization = np.zeros((num_replications, num_scalers), dtype=np.int32)
+
+    process_times = {process: np.zeros(num_replications, dtype=np.int64) for process in distributions}
+    process_counts = {process: np.zeros(num_replications, dtype=np.int64) for process in distributions}
+
+    for current_time in range(horizon):
+        # Increment waiting times for trucks in loader and scaler queues
+        in_queue = stage == LOADER_QUEUE
+        loader_wait_time += in_queue
+        loader_wait_count += in_queue & ~loader_seen
+        loader_seen |= in_queue
+
+        in_queue = stage == SCALER_QUEUE
+        scaler_wait_time += in_queue
+        scaler_wait_count += in_queue & ~scaler_seen
+        scaler_seen |= in_queue
+
+        # Check loaders, finished trucks join the scaler queue in loader order
+        rows, trucks = _finish_service(loader_busy, stage, slot, time_remaining, LOADING)
+        stage[rows, trucks] = SCALER_QUEUE
+        scaler_stamp[rows, trucks] = current_time * num_loaders + slot[rows, trucks]
+        scaler_seen[rows, trucks] = False
+        loader_time_utilization += loader_busy != NO_TRUCK
+
+        _fill_servers(loader_busy, stage, loader_stamp, LOADER_QUEUE, LOADING, slot, time_remaining,
+                      distributions["loading"], rng, process_times["loading"], process_counts["loading"])
+
+        # Check scalers, finished trucks start dumping in scaler order
+        rows, trucks = _finish_service(scaler_busy, stage, slot, time_remaining, SCALING)
+        durations = distributions["dumping"].sample(len(rows), rng)
+        stage[rows, trucks] = DUMPING
+        time_remaining[rows, trucks] = durations
+        dumping_stamp[rows, trucks] = current_time * num_scalers + slot[rows, trucks]
+        np.add.at(process_times["dumping"], rows, durations)
+        np.add.at(process_counts["dumping"], rows, 1)
+        scaler_time_utilization += scaler_busy != NO_TRUCK
+
+        _fill_servers(scaler_busy, stage, scaler_stamp, SCALER_QUEUE, SCALING, slot, time_remaining,
+                      distributions["scaling"], rng, process_times["scaling"], process_counts["scaling"])
+
+        # Check dumping trucks, they rejoin the loader queue in dumping order
+        dumping = stage == DUMPING
+        time_remaining[dumping] -= 1
+        rows, trucks = np.nonzero(dumping & (time_remaining <= 0))
+        stage[rows, trucks] = LOADER_QUEUE
+        loader_stamp[rows, trucks] = current_time * stamps_per_tick + dumping_stamp[rows, trucks]
+        loader_seen[rows, trucks] = False
+
+    def average(total, count):
+        return np.divide(total, count, out=np.zeros(num_replications), where=count > 0)
+
+    loader_utilization = loader_time_utilization / horizon * 100
+    scaler_utilization = scaler_time_utilization / horizon * 100
+
+    return {
+        'loader_avg_waiting_time': average(loader_wait_time.sum(axis=1), loader_wait_count.sum(axis=1)),
+        'scaler_avg_waiting_time': average(scaler_wait_time.sum(axis=1), scaler_wait_count.sum(axis=1)),
+        'average_loading_time': average(process_times["loading"], process_counts["loading"]),
+        'average_scaling_time': average(process_times["scaling"], process_counts["scaling"]),
+        'average_dumping_time': average(process_times["dumping"], process_counts["dumping"]),
+        'loader_utilization': loader_utilization,
+        'scaler_utilization': scaler_utilization,
+        'average_loader_utilization': loader_utilization.mean(axis=1),
+        'average_scaler_utilization': scaler_utilization.mean(axis=1),
+        # Sum of (duration - mean) over every draw, the draw count is a
+        # stopping time so by Wald's identity these have mean exactly 0
+        **{f'{process}_time_deviation': process_times[process] - distributions[process].mean * process_counts[process]
+           for process in distributions}
+    }
+
+
+# Per-replication scalars kept by the cache and the result store
+SCALAR_METRICS = ['loader_avg_waiting_time', 'scaler_avg_waiting_time', 'average_loading_time',
+                  'average_scaling_time', 'average_dumping_time', 'average_loader_utilization',
+                  'average_scaler_utilization']
+
+
+def replication_rows(rng, count, horizon=TIME_UNITS, num_trucks=NUM_TRUCKS, num_loaders=NUM_LOADERS,
+                     num_scalers=NUM_SCALERS, distributions=DISTRIBUTIONS):
+    results = simulate_batch(count, horizon, num_trucks, num_loaders, num_scalers, distributions, rng)
+    return np.column_stack([results[name] for name in SCALAR_METRICS])
+
+
+CACHE_VERSION = 1
+
+
+def cached_replications(num_replications, horizon=TIME_UNITS, num_trucks=NUM_TRUCKS, num_loaders=NUM_LOADERS,
+                        num_scalers=NUM_SCALERS, distributions=DISTRIBUTIONS, seed=0, cache=None, workers=1):
+    # SCALAR_METRICS arrays over the cached replications, keyed by name
+    parameters = {'horizon': horizon, 'num_trucks': num_trucks, 'num_loaders': num_loaders,
+                  'num_scalers': num_scalers, 'distributions': distributions}
+    rows = cached_rows('dumptruck', parameters,
+                       partial(replication_rows, horizon=horizon, num_trucks=num_trucks, num_loaders=num_loaders,
+                               num_scalers=num_scalers, distributions=distributions),
+                       num_replications, seed, CACHE_VERSION, cache, block_size=1000, names=SCALAR_METRICS,
+                       workers=workers)
+    return dict(zip(SCALAR_METRICS, rows.T))
+
+
+def write_replications(writer, rng, replication, horizon=TIME_UNITS, num_trucks=NUM_TRUCKS,
+                       num_loaders=NUM_LOADERS, num_scalers=NUM_SCALERS, distributions=DISTRIBUTIONS):
+    results = simulate_batch(len(replication), horizon, num_trucks, num_loaders, num_scalers, distributions, rng)
+    record = {'replication': replication, **{name: results[name] for name in SCALAR_METRICS}}
+    for process in ('loader', 'scaler'):
+        for i, utilization in enumerate(results[f'{process}_utilization'].T):
+            record[f'{process}_utilization_{i}'] = utilization
+    writer.append('replications', record)
+
+
+def simulate_to_store(directory, num_replications, horizon=TIME_UNITS, num_trucks=NUM_TRUCKS,
+                      num_loaders=NUM_LOADERS, num_scalers=NUM_SCALERS, distributions=DISTRIBUTIONS, seed=None,
+                      batch_size=10000):
+    # Every replication's results into a simcore result store, one field per
+    # loader and scaler utilization
+    fields = ([('replication', '<u4')] + [(name, '<f8') for name in SCALAR_METRICS]
+              + [(f'loader_utilization_{i}', '<f8') for i in range(num_loaders)]
+              + [(f'scaler_utilization_{i}', '<f8') for i in range(num_scalers)])
+    metadata = {'horizon': horizon, 'num_trucks': num_trucks, 'num_loaders': num_loaders,
+                'num_scalers': num_scalers}
+    write_batches(directory, 'dumptruck', {'replications': fields},
+                  partial(write_replications, horizon=horizon, num_trucks=num_trucks, num_loaders=num_loaders,
+                          num_scalers=num_scalers, distributions=distributions),
+                  num_replications, seed, metadata, batch_size=batch_size)
+
+
+if __name__ == '__main__':
+    from events import print_summary
+
+    NUM_REPLICATIONS = 10000
+    results = simulate_batch(NUM_REPLICATIONS)
+    print(f"Average over {NUM_REPLICATIONS} replications")
+    print_summary({name: values.mean(axis=0) for name, values in results.items()})
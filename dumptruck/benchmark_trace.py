@@ -0,0 +1,43 @@
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from main2 import NUM_LOADERS, NUM_SCALERS, NUM_TRUCKS, DumpTruckSystem
+from tracing import TraceWriter
+
+
+def run_time(horizon, path=None, seed=1):
+    # Seconds for one tick loop run, traced to path when given
+    system = DumpTruckSystem(rng=random.Random(seed))
+    start = time.perf_counter()
+    if path is None:
+        system.run(horizon)
+    else:
+        with TraceWriter(path, NUM_TRUCKS, NUM_LOADERS, NUM_SCALERS, horizon) as trace:
+            system.run(horizon, trace)
+    return time.perf_counter() - start
+
+
+def trace_overhead(horizon=50000, repeats=15):
+    """Median relative extra run time of a traced run over an untraced one.
+
+    Every traced run is timed between two untraced runs on the same seed and
+    compared with their mean, so slow drifts of the machine cancel out.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'trace.bin')
+        overheads = []
+        for _ in range(repeats):
+            before = run_time(horizon)
+            traced = run_time(horizon, path)
+            after = run_time(horizon)
+            overheads.append(2 * traced / (before + after) - 1)
+    return statistics.median(overheads)
+
+
+if __name__ == '__main__':
+    horizon = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    print(f"Trace overhead over {horizon} time units: {trace_overhead(horizon) * 100:.1f}%")
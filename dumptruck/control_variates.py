@@ -0,0 +1,57 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from simcore.stats import control_variate_estimate
+from batched import simulate_batch
+from main2 import DISTRIBUTIONS, NUM_LOADERS, NUM_SCALERS, NUM_TRUCKS, TIME_UNITS
+
+TARGETS = ['loader_avg_waiting_time', 'scaler_avg_waiting_time',
+           'average_loader_utilization', 'average_scaler_utilization']
+# Summed deviations of the drawn service times from their means. The
+# sampled mean times are no controls: how many draws fit in the horizon
+# depends on the earlier draws, so their expectation is not the
+# distribution mean
+CONTROLS = ['loading_time_deviation', 'scaling_time_deviation', 'dumping_time_deviation']
+
+
+def estimate(num_replications, horizon=TIME_UNITS, num_trucks=NUM_TRUCKS, num_loaders=NUM_LOADERS,
+             num_scalers=NUM_SCALERS, distributions=DISTRIBUTIONS, seed=None):
+    # Runs the replications in lockstep and adjusts every target with how
+    # far the loading, scaling and dumping draws fell from their means
+    results = simulate_batch(num_replications, horizon, num_trucks, num_loaders, num_scalers, distributions, seed)
+    observations = np.column_stack([results[name] for name in TARGETS])
+    controls = np.column_stack([results[name] for name in CONTROLS])
+    control_means = np.zeros(len(CONTROLS))
+
+    plain_mean = observations.mean(axis=0)
+    plain_half_width = control_variate_estimate(observations, np.zeros((num_replications, 0)), [])[1]
+    mean, half_width, variance_reduction, _ = control_variate_estimate(observations, controls, control_means)
+    return {name: values for name, values in zip(TARGETS, zip(plain_mean, plain_half_width, mean, half_width,
+                                                              variance_reduction))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Control-variate estimates of the dump truck metrics")
+    parser.add_argument("--replications", type=int, default=1000)
+    parser.add_argument("--trucks", type=int, default=NUM_TRUCKS)
+    parser.add_argument("--loaders", type=int, default=NUM_LOADERS)
+    parser.add_argument("--scalers", type=int, default=NUM_SCALERS)
+    parser.add_argument("--time-units", type=int, default=TIME_UNITS)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    estimates = estimate(args.replications, args.time_units, args.trucks, args.loaders, args.scalers,
+                         seed=args.seed)
+    print(f"Estimates over {args.replications} replications (mean ± 95% confidence half-width)")
+    for name, (plain_mean, plain_half_width, mean, half_width, variance_reduction) in estimates.items():
+        print(f"{name}: {plain_mean:.4f} ± {plain_half_width:.4f}, "
+              f"control variates {mean:.4f} ± {half_width:.4f} (variance reduction {variance_reduction:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import json
+import os
+
+import numpy as np
+
+# Tables the scripts use, precomputed so importing them needs no computation
+PRECOMPUTED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'distributions.json')
+_precomputed = None
+
+def normal_pdf(x):
+    # Standard normal density in closed form
+    return np.exp(-0.5 * np.square(x)) / np.sqrt(2 * np.pi)
+
+def precomputed_key(start, end, peak_probability):
+    return f"{start}-{end}-{peak_probability!r}"
+
+def generate_times_and_probabilities(start, end, peak_probability=0.3):
+    # Read from PRECOMPUTED_PATH when the table is there, computed otherwise
+    global _precomputed
+    if _precomputed is None:
+        _precomputed = {}
+        if os.path.exists(PRECOMPUTED_PATH):
+            with open(PRECOMPUTED_PATH) as file:
+                _precomputed = json.load(file)
+    key = precomputed_key(start, end, peak_probability)
+    if key in _precomputed:
+        return list(range(start, end + 1)), list(_precomputed[key])
+    return compute_times_and_probabilities(start, end, peak_probability)
+
+def save_precomputed(tables, path=PRECOMPUTED_PATH):
+    # tables is a list of (start, end, peak_probability)
+    precomputed = {precomputed_key(*table): compute_times_and_probabilities(*table)[1] for table in tables}
+    with open(path, 'w') as file:
+        json.dump(precomputed, file, indent=2)
+
+# Function to generate time ranges and probabilities
+def compute_times_and_probabilities(start, end, peak_probability=0.3):
+    time_values = list(range(start, end + 1))
+    n = len(time_values)
+
+    # Generate probabilities based on normal distribution
+    if n <= 3:
+        # Special case: if 3 or fewer values, set 40% for the middle value and 30% for others
+        if n == 1:
+            probabilities = [1.0]
+        elif n == 2:
+            probabilities = [0.5, 0.5]
+        else:
+            probabilities = [0.3, 0.4, 0.3]
+    else:
+        # Normal distribution with peak probability in the middle
+        mid_idx = n // 2
+        x = np.linspace(-2, 2, n)
+        pdf = normal_pdf(x)
+        pdf = pdf / pdf.sum()  # Normalize to make sum 1
+        probabilities = pdf.tolist()
+
+    # Ensure the middle value gets the specified peak probability
+    probabilities[mid_idx] = peak_probability
+    probabilities = [p * (1 - peak_probability) / sum(probabilities[:mid_idx] + probabilities[mid_idx+1:]) if i != mid_idx else peak_probability for i, p in enumerate(probabilities)]
+    return time_values, probabilities
+
+if __name__ == '__main__':
+    # Loading, scaling and dumping tables of main.py, main2.py and events.py
+    save_precomputed([(1, 9, 0.3), (2, 6, 0.3), (10, 20, 0.3), (10, 30, 0.3)])
@@ -0,0 +1,157 @@
+import argparse
+import heapq
+import os
+import random
+import sys
+from collections import deque
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from simcore.distributions import DiscreteDistribution
+from distributions import generate_times_and_probabilities
+
+# Event phases, processed in this order within a time unit to match the tick loop
+ARRIVE = 0  # Truck joins the loader queue (the time unit after it finished dumping)
+LOADED = 1
+SCALED = 2
+DUMPED = 3
+
+
+def simulate_events(num_trucks, num_loaders, num_scalers, horizon,
+                    loading_dist, scaling_dist, dump_dist, rng=random):
+    # Next-event version of the tick loop in main2.py: jumps straight to the
+    # next completion instead of walking every time unit. Durations are drawn
+    # in the same order as the tick loop, so both give identical metrics for
+    # the same random state. main.py counts a loader busy from the tick it
+    # fills, one tick more per loading, and is not reproduced.
+    events = [(0, ARRIVE, truck, truck) for truck in range(num_trucks)]
+    heapq.heapify(events)
+    sequence = num_trucks
+
+    loader_queue = deque()  # (truck, time unit it joined the queue)
+    scaler_queue = deque()
+    loader_busy = [False] * num_loaders
+    scaler_busy = [False] * num_scalers
+    loader_time_utilization = [0] * num_loaders
+    scaler_time_utilization = [0] * num_scalers
+    loader_wait_time = loader_wait_count = 0
+    scaler_wait_time = scaler_wait_count = 0
+    loading_times = []
+    scaling_times = []
+    dumping_times = []
+
+    while events and events[0][0] < horizon:
+        time = events[0][0]
+
+        while events and events[0][0] == time and events[0][1] == ARRIVE:
+            _, _, _, truck = heapq.heappop(events)
+            loader_queue.append((truck, time - 1))
+            loader_wait_count += 1
+
+        while events and events[0][0] == time and events[0][1] == LOADED:
+            _, _, i, truck = heapq.heappop(events)
+            loader_busy[i] = False
+            scaler_queue.append((truck, time))
+
+        for i in range(num_loaders):
+            if not loader_busy[i] and loader_queue:
+                truck, joined = loader_queue.popleft()
+                loader_wait_time += time - joined
+                process_time = loading_dist.draw(rng)
+                loading_times.append(process_time)
+                loader_time_utilization[i] += min(process_time - 1, horizon - 1 - time)
+                loader_busy[i] = True
+                heapq.heappush(events, (time + process_time, LOADED, i, truck))
+
+        while events and events[0][0] == time and events[0][1] == SCALED:
+            _, _, i, truck = heapq.heappop(events)
+            scaler_busy[i] = False
+            process_time = dump_dist.draw(rng)
+            dumping_times.append(process_time)
+            # The tick loop already counts down the time unit the dump starts in
+            heapq.heappush(events, (time + process_time - 1, DUMPED, sequence, truck))
+            sequence += 1
+
+        for i in range(num_scalers):
+            if not scaler_busy[i] and scaler_queue:
+                truck, joined = scaler_queue.popleft()
+                if time > joined:
+                    scaler_wait_time += time - joined
+                    scaler_wait_count += 1
+                process_time = scaling_dist.draw(rng)
+                scaling_times.append(process_time)
+                scaler_time_utilization[i] += min(process_time - 1, horizon - 1 - time)
+                scaler_busy[i] = True
+                heapq.heappush(events, (time + process_time, SCALED, i, truck))
+
+        while events and events[0][0] == time and events[0][1] == DUMPED:
+            _, _, key, truck = heapq.heappop(events)
+            # The tick loop draws (but does not record) a time when a truck goes back to waiting
+            dump_dist.draw(rng)
+            heapq.heappush(events, (time + 1, ARRIVE, key, truck))
+
+    # Trucks still queueing at the horizon
+    for truck, joined in loader_queue:
+        loader_wait_time += horizon - 1 - joined
+    for truck, joined in scaler_queue:
+        if horizon - 1 > joined:
+            scaler_wait_time += horizon - 1 - joined
+            scaler_wait_count += 1
+
+    loader_utilization = [(time / horizon) * 100 for time in loader_time_utilization]
+    scaler_utilization = [(time / horizon) * 100 for time in scaler_time_utilization]
+
+    return {
+        'loader_avg_waiting_time': loader_wait_time / loader_wait_count if loader_wait_count > 0 else 0,
+        'scaler_avg_waiting_time': scaler_wait_time / scaler_wait_count if scaler_wait_count > 0 else 0,
+        'average_loading_time': sum(loading_times) / len(loading_times) if loading_times else 0,
+        'average_scaling_time': sum(scaling_times) / len(scaling_times) if scaling_times else 0,
+        'average_dumping_time': sum(dumping_times) / len(dumping_times) if dumping_times else 0,
+        'loader_utilization': loader_utilization,
+        'scaler_utilization': scaler_utilization,
+        'average_loader_utilization': sum(loader_utilization) / num_loaders if num_loaders > 0 else 0,
+        'average_scaler_utilization': sum(scaler_utilization) / num_scalers if num_scalers > 0 else 0
+    }
+
+
+def print_summary(results):
+    print("\nSummary of Average Times:")
+    print(f"Average Waiting Time in Loader Queue: {results['loader_avg_waiting_time']:.2f} time units")
+    print(f"Average Waiting Time in Scaler Queue: {results['scaler_avg_waiting_time']:.2f} time units")
+    print(f"Average Loading Time: {results['average_loading_time']:.2f} time units")
+    print(f"Average Scaling Time: {results['average_scaling_time']:.2f} time units")
+    print(f"Average Dumping Time: {results['average_dumping_time']:.2f} time units")
+    print("\nLoader Utilizations:")
+    for i, utilization in enumerate(results['loader_utilization']):
+        print(f"Loader {i+1} Utilization: {utilization:.2f}%")
+    print(f"Average Loader Utilization: {results['average_loader_utilization']:.2f}%")
+
+    print("\nScaler Utilizations:")
+    for i, utilization in enumerate(results['scaler_utilization']):
+        print(f"Scaler {i+1} Utilization: {utilization:.2f}%")
+    print(f"Average Scaler Utilization: {results['average_scaler_utilization']:.2f}%")
+
+
+def main():
+    # Defaults are the main2.py configuration
+    parser = argparse.ArgumentParser(description="Next-event dump truck simulation")
+    parser.add_argument("--trucks", type=int, default=10)
+    parser.add_argument("--loaders", type=int, default=2)
+    parser.add_argument("--scalers", type=int, default=1)
+    parser.add_argument("--time-units", type=int, default=200)
+    parser.add_argument("--dump-max", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    results = simulate_events(
+        args.trucks, args.loaders, args.scalers, args.time_units,
+        DiscreteDistribution(*generate_times_and_probabilities(1, 9)),
+        DiscreteDistribution(*generate_times_and_probabilities(2, 6)),
+        DiscreteDistribution(*generate_times_and_probabilities(10, args.dump_max))
+    )
+    print_summary(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,38 +1,16 @@
-import random
+import os
+import sys
 from collections import deque
-from scipy.stats import norm
-import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from simcore.distributions import DiscreteDistribution
+from distributions import generate_times_and_probabilities
 
 # Constants
 NUM_TRUCKS = 6
 TIME_UNITS = 200
 
-def generate_times_and_probabilities(start, end, peak_probability=0.3):
-    time_values = list(range(start, end + 1))
-    n = len(time_values)
-
-    # Generate probabilities based on normal distribution
-    if n <= 3:
-        # Special case: if 3 or fewer values, set 40% for the middle value and 30% for others
-        if n == 1:
-            probabilities = [1.0]
-        elif n == 2:
-            probabilities = [0.5, 0.5]
-        else:
-            probabilities = [0.3, 0.4, 0.3]
-    else:
-        # Normal distribution with peak probability in the middle
-        mid_idx = n // 2
-        x = np.linspace(-2, 2, n)
-        pdf = norm.pdf(x, loc=0, scale=1)
-        pdf = pdf / pdf.sum()  # Normalize to make sum 1
-        probabilities = pdf.tolist()
-
-    # Ensure the middle value gets the specified peak probability
-    probabilities[mid_idx] = peak_probability
-    probabilities = [p * (1 - peak_probability) / sum(probabilities[:mid_idx] + probabilities[mid_idx+1:]) if i != mid_idx else peak_probability for i, p in enumerate(probabilities)]
-    return time_values, probabilities
-
 # Generate loading, scaling, and dumping times with specified distributions
 print("Generating Loading Distribution")
 LOADING_TIMES, LOADING_PROB = generate_times_and_probabilities(1, 9)
@@ -46,6 +24,11 @@ print("Loading Times and Probabilities:", LOADING_TIMES, LOADING_PROB)
 print("Scaling Times and Probabilities:", SCALING_TIMES, SCALING_PROB)
 print("Dumping Times and Probabilities:", DUMP_TIMES, DUMP_PROB)
 
+# Samplers built once instead of rebuilding cumulative weights on every draw
+LOADING_DIST = DiscreteDistribution(LOADING_TIMES, LOADING_PROB)
+SCALING_DIST = DiscreteDistribution(SCALING_TIMES, SCALING_PROB)
+DUMP_DIST = DiscreteDistribution(DUMP_TIMES, DUMP_PROB)
+
 # Initialize truck states
 class Truck:
     def __init__(self, id):
@@ -74,14 +57,13 @@ scaling_times = []
 dumping_times = []
 
 # Helper functions
-def get_probabilistic_time(options, probabilities):
-    return random.choices(options, probabilities)[0]
+def get_probabilistic_time(distribution):
+    return distribution.draw()
 
 def advance_time(truck, process, time_log):
     truck.current_process = process
     process_time = get_probabilistic_time(
-        LOADING_TIMES if process == "loading" else SCALING_TIMES if process == "scaling" else DUMP_TIMES,
-        LOADING_PROB if process == "loading" else SCALING_PROB if process == "scaling" else DUMP_PROB
+        LOADING_DIST if process == "loading" else SCALING_DIST if process == "scaling" else DUMP_DIST
     )
     truck.time_remaining = process_time
     time_log[truck.id].append((process, process_time))
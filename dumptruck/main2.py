@@ -1,7 +1,14 @@
+import os
 import random
+import sys
 from collections import deque
-from scipy.stats import norm
-import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from simcore.distributions import DiscreteDistribution
+from distributions import generate_times_and_probabilities
+from events import simulate_events, print_summary
+from tracing import DUMPING, LOADER_QUEUE, LOADING, SCALER_QUEUE, SCALING, TraceWriter, pack_record
 
 # Constants
 NUM_TRUCKS = 10
@@ -9,37 +16,23 @@ TIME_UNITS = 200
 NUM_LOADERS = 2
 NUM_SCALERS = 1
 
-# Function to generate time ranges and probabilities
-def generate_times_and_probabilities(start, end, peak_probability=0.3):
-    time_values = list(range(start, end + 1))
-    n = len(time_values)
-
-    if n <= 3:
-        if n == 1:
-            probabilities = [1.0]
-        elif n == 2:
-            probabilities = [0.5, 0.5]
-        else:
-            probabilities = [0.3, 0.4, 0.3]
-    else:
-        mid_idx = n // 2
-        x = np.linspace(-2, 2, n)
-        pdf = norm.pdf(x, loc=0, scale=1)
-        pdf = pdf / pdf.sum()
-        probabilities = pdf.tolist()
-
-    probabilities[mid_idx] = peak_probability
-    probabilities = [p * (1 - peak_probability) / sum(probabilities[:mid_idx] + probabilities[mid_idx+1:]) if i != mid_idx else peak_probability for i, p in enumerate(probabilities)]
-    return time_values, probabilities
+# "off" prints nothing, "summary" prints the averages, "trace" also writes every
+# time unit to TRACE_PATH (render it with render_trace.py)
+VERBOSITY = "summary"
+TRACE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "trace.bin")
+# Ticks between checks for a full trace block
+TRACE_FLUSH_TICKS = 1024
 
 # Generate times and probabilities
 LOADING_TIMES, LOADING_PROB = generate_times_and_probabilities(1, 9)
 SCALING_TIMES, SCALING_PROB = generate_times_and_probabilities(2, 6)
 DUMP_TIMES, DUMP_PROB = generate_times_and_probabilities(10, 20)
 
-print("Loading Times and Probabilities:", LOADING_TIMES, LOADING_PROB)
-print("Scaling Times and Probabilities:", SCALING_TIMES, SCALING_PROB)
-print("Dumping Times and Probabilities:", DUMP_TIMES, DUMP_PROB)
+# Samplers built once instead of rebuilding cumulative weights on every draw
+LOADING_DIST = DiscreteDistribution(LOADING_TIMES, LOADING_PROB)
+SCALING_DIST = DiscreteDistribution(SCALING_TIMES, SCALING_PROB)
+DUMP_DIST = DiscreteDistribution(DUMP_TIMES, DUMP_PROB)
+DISTRIBUTIONS = {"loading": LOADING_DIST, "scaling": SCALING_DIST, "dumping": DUMP_DIST}
 
 # Initialize truck states
 class Truck:
@@ -52,165 +45,223 @@ class Truck:
         self.loader_wait_count = 0
         self.scaler_wait_count = 0
 
-# Create trucks and queues
-all_trucks = [Truck(i) for i in range(NUM_TRUCKS)]
-loader_queue = deque(all_trucks)
-loader_busy = [None] * NUM_LOADERS
-scaler_queue = deque()
-scaler_busy = [None] * NUM_SCALERS
-dumping_queue = deque()
-time_log = {truck.id: [] for truck in all_trucks}
-loader_time_utilization = [0] * NUM_LOADERS
-scaler_time_utilization = [0] * NUM_SCALERS
-
-# Lists for process times
-loading_times = []
-scaling_times = []
-dumping_times = []
-
-# Helper functions
-def get_probabilistic_time(options, probabilities):
-    return random.choices(options, probabilities)[0]
-
-def advance_time(truck, process, time_log):
-    truck.current_process = process
-    process_time = get_probabilistic_time(
-        LOADING_TIMES if process == "loading" else SCALING_TIMES if process == "scaling" else DUMP_TIMES,
-        LOADING_PROB if process == "loading" else SCALING_PROB if process == "scaling" else DUMP_PROB
-    )
-    truck.time_remaining = process_time
-    time_log[truck.id].append((process, process_time))
-
-    if process == "loading":
-        loading_times.append(process_time)
-    elif process == "scaling":
-        scaling_times.append(process_time)
-    elif process == "dumping":
-        dumping_times.append(process_time)
-
-# Simulation
-for current_time in range(TIME_UNITS):
-    print(f"\nTime Unit {current_time}")
-
-    # Increment waiting times for trucks in loader and scaler queues
-    for truck in loader_queue:
-        truck.loader_wait_time += 1
-        if truck.current_process != "waiting_in_loader_queue":
-            truck.loader_wait_count += 1
-            truck.current_process = "waiting_in_loader_queue"
-
-    for truck in scaler_queue:
-        truck.scaler_wait_time += 1
-        if truck.current_process != "waiting_in_scaler_queue":
-            truck.scaler_wait_count += 1
-            truck.current_process = "waiting_in_scaler_queue"
-
-    # Check loaders
-    for i in range(NUM_LOADERS):
-        if loader_busy[i]:
-            loader_busy[i].time_remaining -= 1
-            if loader_busy[i].time_remaining <= 0:  # Move to scaler queue
-                loader_busy[i].current_process = "moving_to_scaler_queue"
-                scaler_queue.append(loader_busy[i])
-                loader_busy[i] = None
-
-        # Track loader utilization
-        if loader_busy[i] is not None:
-            loader_time_utilization[i] += 1
-
-    # Fill loaders if available
-    for i in range(NUM_LOADERS):
-        if loader_busy[i] is None and loader_queue:
-            next_truck = loader_queue.popleft()
-            advance_time(next_truck, "loading", time_log)
-            loader_busy[i] = next_truck
-
-    # Check scalers
-    for i in range(NUM_SCALERS):
-        if scaler_busy[i]:
-            scaler_busy[i].time_remaining -= 1
-            if scaler_busy[i].time_remaining <= 0:  # Move to dumping queue
-                scaler_busy[i].current_process = "moving_to_dumping_queue"
-                advance_time(scaler_busy[i], "dumping", time_log)
-                dumping_queue.append(scaler_busy[i])
-                scaler_busy[i] = None
-
-        # Track scaler utilization
-        if scaler_busy[i] is not None:
-            scaler_time_utilization[i] += 1
-
-    # Move truck from scaler queue if scaler is free
-    for i in range(NUM_SCALERS):
-        if scaler_busy[i] is None and scaler_queue:
-            next_truck = scaler_queue.popleft()
-            advance_time(next_truck, "scaling", time_log)
-            scaler_busy[i] = next_truck
-
-    # Check dumping trucks
-    for truck in list(dumping_queue):
-        truck.time_remaining -= 1
-        if truck.time_remaining <= 0:  # Return to loader queue after dumping
-            dumping_queue.remove(truck)
-            advance_time(truck, "waiting", time_log)
-            truck.current_process = "waiting"
-            loader_queue.append(truck)
-
-    # Per-time unit log
-    loader_queue_ids = [truck.id for truck in loader_queue]
-    scaler_queue_ids = [truck.id for truck in scaler_queue]
-    dumping_queue_ids = [truck.id for truck in dumping_queue]
-    loaders_status = [(f'{truck.id}' if truck else "Empty") for truck in loader_busy]
-    scalers_status = [(f'{truck.id}' if truck else "Empty") for truck in scaler_busy]
-    loading_times_display = [truck.time_remaining if truck else "-" for truck in loader_busy]
-    scaling_times_display = [truck.time_remaining if truck else "-" for truck in scaler_busy]
-    dumping_times_display = [truck.time_remaining for truck in dumping_queue]
-
-    print("Loader Queue:", loader_queue_ids)
-    print("Loader Status:", loaders_status, "Time Left:", loading_times_display)
-    print("Scaler Queue:", scaler_queue_ids)
-    print("Scaler Status:", scalers_status, "Time Left:", scaling_times_display)
-    print("Dumping Queue:", dumping_queue_ids, "Time Left for each:", dumping_times_display)
-
-# Print final time logs for each truck
-for truck_id, log in time_log.items():
-    print(f"\nTruck {truck_id} Log:")
-    for process, time in log:
-        print(f" - {process.capitalize()} for {time} time units")
-
-# Calculate average waiting times for all trucks
-total_loader_wait_time = sum(truck.loader_wait_time for truck in all_trucks)
-total_loader_wait_count = sum(truck.loader_wait_count for truck in all_trucks)
-loader_avg_waiting_time = total_loader_wait_time / total_loader_wait_count if total_loader_wait_count > 0 else 0
-
-total_scaler_wait_time = sum(truck.scaler_wait_time for truck in all_trucks)
-total_scaler_wait_count = sum(truck.scaler_wait_count for truck in all_trucks)
-scaler_avg_waiting_time = total_scaler_wait_time / total_scaler_wait_count if total_scaler_wait_count > 0 else 0
-
-# Calculate average process times
-average_loading_time = sum(loading_times) / len(loading_times) if loading_times else 0
-average_scaling_time = sum(scaling_times) / len(scaling_times) if scaling_times else 0
-average_dumping_time = sum(dumping_times) / len(dumping_times) if dumping_times else 0
-
-# Utilization
-loader_utilization = [(time / TIME_UNITS) * 100 for time in loader_time_utilization]
-scaler_utilization = [(time / TIME_UNITS) * 100 for time in scaler_time_utilization]
-
-average_loader_utilization = sum(loader_utilization) / NUM_LOADERS if NUM_LOADERS > 0 else 0
-average_scaler_utilization = sum(scaler_utilization) / NUM_SCALERS if NUM_SCALERS > 0 else 0
-
-# Summary of average times
-print("\nSummary of Average Times:")
-print(f"Average Waiting Time in Loader Queue: {loader_avg_waiting_time:.2f} time units")
-print(f"Average Waiting Time in Scaler Queue: {scaler_avg_waiting_time:.2f} time units")
-print(f"Average Loading Time: {average_loading_time:.2f} time units")
-print(f"Average Scaling Time: {average_scaling_time:.2f} time units")
-print(f"Average Dumping Time: {average_dumping_time:.2f} time units")
-print("\nLoader Utilizations:")
-for i, utilization in enumerate(loader_utilization):
-    print(f"Loader {i+1} Utilization: {utilization:.2f}%")
-print(f"Average Loader Utilization: {average_loader_utilization:.2f}%")
-
-print("\nScaler Utilizations:")
-for i, utilization in enumerate(scaler_utilization):
-    print(f"Scaler {i+1} Utilization: {utilization:.2f}%")
-print(f"Average Scaler Utilization: {average_scaler_utilization:.2f}%")
+class DumpTruckResults:
+    def __init__(self, loader_avg_waiting_time, scaler_avg_waiting_time, average_loading_time,
+                 average_scaling_time, average_dumping_time, loader_utilization, scaler_utilization,
+                 average_loader_utilization, average_scaler_utilization, time_log=None):
+        self.loader_avg_waiting_time = loader_avg_waiting_time
+        self.scaler_avg_waiting_time = scaler_avg_waiting_time
+        self.average_loading_time = average_loading_time
+        self.average_scaling_time = average_scaling_time
+        self.average_dumping_time = average_dumping_time
+        self.loader_utilization = loader_utilization
+        self.scaler_utilization = scaler_utilization
+        self.average_loader_utilization = average_loader_utilization
+        self.average_scaler_utilization = average_scaler_utilization
+        self.time_log = time_log  # Only kept by the tick loop
+
+    def as_dict(self):
+        return {name: value for name, value in vars(self).items() if name != "time_log"}
+
+class DumpTruckSystem:
+    def __init__(self, num_trucks=NUM_TRUCKS, num_loaders=NUM_LOADERS, num_scalers=NUM_SCALERS,
+                 distributions=DISTRIBUTIONS, rng=random):
+        self.num_trucks = num_trucks
+        self.num_loaders = num_loaders
+        self.num_scalers = num_scalers
+        self.distributions = distributions
+        self.rng = rng
+        self.reset()
+
+    def reset(self):
+        # Create trucks and queues
+        self.all_trucks = [Truck(i) for i in range(self.num_trucks)]
+        self.loader_queue = deque(self.all_trucks)
+        self.loader_busy = [None] * self.num_loaders
+        self.scaler_queue = deque()
+        self.scaler_busy = [None] * self.num_scalers
+        self.dumping_queue = deque()
+        self.time_log = {truck.id: [] for truck in self.all_trucks}
+        self.loader_time_utilization = [0] * self.num_loaders
+        self.scaler_time_utilization = [0] * self.num_scalers
+        self.current_time = 0
+        self.trace = None
+
+        # Lists for process times
+        self.loading_times = []
+        self.scaling_times = []
+        self.dumping_times = []
+
+    def advance_time(self, truck, process):
+        truck.current_process = process
+        process_time = self.distributions[
+            process if process in ("loading", "scaling") else "dumping"
+        ].draw(self.rng)
+        truck.time_remaining = process_time
+        self.time_log[truck.id].append((process, process_time))
+
+        if process == "loading":
+            self.loading_times.append(process_time)
+        elif process == "scaling":
+            self.scaling_times.append(process_time)
+        elif process == "dumping":
+            self.dumping_times.append(process_time)
+
+    def step(self):
+        # Increment waiting times for trucks in loader and scaler queues
+        for truck in self.loader_queue:
+            truck.loader_wait_time += 1
+            if truck.current_process != "waiting_in_loader_queue":
+                truck.loader_wait_count += 1
+                truck.current_process = "waiting_in_loader_queue"
+
+        for truck in self.scaler_queue:
+            truck.scaler_wait_time += 1
+            if truck.current_process != "waiting_in_scaler_queue":
+                truck.scaler_wait_count += 1
+                truck.current_process = "waiting_in_scaler_queue"
+
+        # Check loaders
+        for i in range(self.num_loaders):
+            if self.loader_busy[i]:
+                self.loader_busy[i].time_remaining -= 1
+                if self.loader_busy[i].time_remaining <= 0:  # Move to scaler queue
+                    self.loader_busy[i].current_process = "moving_to_scaler_queue"
+                    self.scaler_queue.append(self.loader_busy[i])
+                    self.record(self.loader_busy[i], SCALER_QUEUE)
+                    self.loader_busy[i] = None
+
+            # Track loader utilization
+            if self.loader_busy[i] is not None:
+                self.loader_time_utilization[i] += 1
+
+        # Fill loaders if available
+        for i in range(self.num_loaders):
+            if self.loader_busy[i] is None and self.loader_queue:
+                next_truck = self.loader_queue.popleft()
+                self.advance_time(next_truck, "loading")
+                self.record(next_truck, LOADING, i)
+                self.loader_busy[i] = next_truck
+
+        # Check scalers
+        for i in range(self.num_scalers):
+            if self.scaler_busy[i]:
+                self.scaler_busy[i].time_remaining -= 1
+                if self.scaler_busy[i].time_remaining <= 0:  # Move to dumping queue
+                    self.scaler_busy[i].current_process = "moving_to_dumping_queue"
+                    self.advance_time(self.scaler_busy[i], "dumping")
+                    self.dumping_queue.append(self.scaler_busy[i])
+                    self.record(self.scaler_busy[i], DUMPING)
+                    self.scaler_busy[i] = None
+
+            # Track scaler utilization
+            if self.scaler_busy[i] is not None:
+                self.scaler_time_utilization[i] += 1
+
+        # Move truck from scaler queue if scaler is free
+        for i in range(self.num_scalers):
+            if self.scaler_busy[i] is None and self.scaler_queue:
+                next_truck = self.scaler_queue.popleft()
+                self.advance_time(next_truck, "scaling")
+                self.record(next_truck, SCALING, i)
+                self.scaler_busy[i] = next_truck
+
+        # Check dumping trucks
+        for truck in list(self.dumping_queue):
+            truck.time_remaining -= 1
+            if truck.time_remaining <= 0:  # Return to loader queue after dumping
+                self.dumping_queue.remove(truck)
+                self.advance_time(truck, "waiting")
+                truck.current_process = "waiting"
+                self.loader_queue.append(truck)
+                self.record(truck, LOADER_QUEUE)
+
+    def record(self, truck, state, slot=0):
+        if self.trace is not None:
+            self.trace += pack_record(self.current_time, truck.id, state, slot, truck.time_remaining)
+
+    def run(self, horizon=TIME_UNITS, trace=None):
+        # Tick loop, starts from a fresh system every time. With a TraceWriter
+        # every state change is packed into its records as it happens, and
+        # full blocks are written out every TRACE_FLUSH_TICKS ticks.
+        self.reset()
+        self.trace = None if trace is None else trace.records
+        for start in range(0, horizon, TRACE_FLUSH_TICKS):
+            for current_time in range(start, min(start + TRACE_FLUSH_TICKS, horizon)):
+                self.current_time = current_time
+                self.step()
+            if trace is not None and trace.full:
+                trace.flush()
+        self.trace = None
+        return self.results(horizon)
+
+    def run_events(self, horizon=TIME_UNITS):
+        # Same metrics from the next-event engine, no per-truck log
+        self.reset()
+        return DumpTruckResults(**simulate_events(
+            self.num_trucks, self.num_loaders, self.num_scalers, horizon,
+            self.distributions["loading"], self.distributions["scaling"], self.distributions["dumping"],
+            self.rng
+        ))
+
+    def results(self, horizon):
+        # Calculate average waiting times for all trucks
+        total_loader_wait_time = sum(truck.loader_wait_time for truck in self.all_trucks)
+        total_loader_wait_count = sum(truck.loader_wait_count for truck in self.all_trucks)
+        loader_avg_waiting_time = total_loader_wait_time / total_loader_wait_count if total_loader_wait_count > 0 else 0
+
+        total_scaler_wait_time = sum(truck.scaler_wait_time for truck in self.all_trucks)
+        total_scaler_wait_count = sum(truck.scaler_wait_count for truck in self.all_trucks)
+        scaler_avg_waiting_time = total_scaler_wait_time / total_scaler_wait_count if total_scaler_wait_count > 0 else 0
+
+        # Calculate average process times
+        average_loading_time = sum(self.loading_times) / len(self.loading_times) if self.loading_times else 0
+        average_scaling_time = sum(self.scaling_times) / len(self.scaling_times) if self.scaling_times else 0
+        average_dumping_time = sum(self.dumping_times) / len(self.dumping_times) if self.dumping_times else 0
+
+        # Utilization
+        loader_utilization = [(time / horizon) * 100 for time in self.loader_time_utilization]
+        scaler_utilization = [(time / horizon) * 100 for time in self.scaler_time_utilization]
+
+        average_loader_utilization = sum(loader_utilization) / self.num_loaders if self.num_loaders > 0 else 0
+        average_scaler_utilization = sum(scaler_utilization) / self.num_scalers if self.num_scalers > 0 else 0
+
+        return DumpTruckResults(loader_avg_waiting_time, scaler_avg_waiting_time, average_loading_time,
+                                average_scaling_time, average_dumping_time, loader_utilization,
+                                scaler_utilization, average_loader_utilization, average_scaler_utilization,
+                                self.time_log)
+
+def run_replications(num_replications, horizon=TIME_UNITS, num_trucks=NUM_TRUCKS, num_loaders=NUM_LOADERS,
+                     num_scalers=NUM_SCALERS, distributions=DISTRIBUTIONS, seed=None, engine="tick"):
+    # Independent replications back to back on one system, distributions are built only once
+    system = DumpTruckSystem(num_trucks, num_loaders, num_scalers, distributions, random.Random(seed))
+    run = system.run if engine == "tick" else system.run_events
+    return [run(horizon) for _ in range(num_replications)]
+
+if __name__ == '__main__':
+    system = DumpTruckSystem()
+
+    # Simulation
+    if VERBOSITY == "trace":
+        with TraceWriter(TRACE_PATH, NUM_TRUCKS, NUM_LOADERS, NUM_SCALERS, TIME_UNITS) as trace:
+            results = system.run(TIME_UNITS, trace)
+    else:
+        results = system.run(TIME_UNITS)
+
+    if VERBOSITY != "off":
+        print("Loading Times and Probabilities:", LOADING_TIMES, LOADING_PROB)
+        print("Scaling Times and Probabilities:", SCALING_TIMES, SCALING_PROB)
+        print("Dumping Times and Probabilities:", DUMP_TIMES, DUMP_PROB)
+
+    if VERBOSITY == "trace":
+        print(f"\nTrace written to {TRACE_PATH}")
+
+        # Print final time logs for each truck
+        for truck_id, log in results.time_log.items():
+            print(f"\nTruck {truck_id} Log:")
+            for process, time in log:
+                print(f" - {process.capitalize()} for {time} time units")
+
+    if VERBOSITY != "off":
+        # Summary of average times
+        print_summary(results.as_dict())
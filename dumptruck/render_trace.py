@@ -0,0 +1,70 @@
+import sys
+from collections import deque
+
+from tracing import DUMPING, LOADER_QUEUE, LOADING, SCALER_QUEUE, SCALING, read_trace
+
+
+def render_trace(path, out=sys.stdout):
+    # Replays the state changes of a trace and prints the per-time unit log
+    # the tick loop used to print
+    header, records = read_trace(path)
+    time_remaining = [0] * header['num_trucks']
+    loader_queue = deque(range(header['num_trucks']))
+    scaler_queue = deque()
+    dumping_queue = []
+    loader_busy = [None] * header['num_loaders']
+    scaler_busy = [None] * header['num_scalers']
+
+    changes = zip(records['tick'].tolist(), records['entity'].tolist(), records['state'].tolist(),
+                  records['slot'].tolist(), records['time_remaining'].tolist())
+    change = next(changes, None)
+
+    for current_time in range(header['horizon']):
+        # Loaders and scalers count down before any truck moves
+        for truck in loader_busy + scaler_busy:
+            if truck is not None:
+                time_remaining[truck] -= 1
+
+        while change is not None and change[0] == current_time:
+            _, truck, state, slot, remaining = change
+            time_remaining[truck] = remaining
+            if state == LOADER_QUEUE:
+                dumping_queue.remove(truck)
+                loader_queue.append(truck)
+            elif state == LOADING:
+                loader_queue.remove(truck)
+                loader_busy[slot] = truck
+            elif state == SCALER_QUEUE:
+                loader_busy[loader_busy.index(truck)] = None
+                scaler_queue.append(truck)
+            elif state == SCALING:
+                scaler_queue.remove(truck)
+                scaler_busy[slot] = truck
+            elif state == DUMPING:
+                scaler_busy[scaler_busy.index(truck)] = None
+                dumping_queue.append(truck)
+            change = next(changes, None)
+
+        # Dumping trucks count down after everything else, new arrivals included
+        for truck in dumping_queue:
+            time_remaining[truck] -= 1
+
+        loaders_status = [(f'{truck}' if truck is not None else "Empty") for truck in loader_busy]
+        scalers_status = [(f'{truck}' if truck is not None else "Empty") for truck in scaler_busy]
+        loading_times_display = [time_remaining[truck] if truck is not None else "-" for truck in loader_busy]
+        scaling_times_display = [time_remaining[truck] if truck is not None else "-" for truck in scaler_busy]
+        dumping_times_display = [time_remaining[truck] for truck in dumping_queue]
+
+        print(f"\nTime Unit {current_time}", file=out)
+        print("Loader Queue:", list(loader_queue), file=out)
+        print("Loader Status:", loaders_status, "Time Left:", loading_times_display, file=out)
+        print("Scaler Queue:", list(scaler_queue), file=out)
+        print("Scaler Status:", scalers_status, "Time Left:", scaling_times_display, file=out)
+        print("Dumping Queue:", dumping_queue, "Time Left for each:", dumping_times_display, file=out)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print("Usage: python render_trace.py <trace file>")
+        sys.exit(1)
+    render_trace(sys.argv[1])
@@ -0,0 +1,83 @@
+import struct
+
+import numpy as np
+
+# Fixed-width trace record, one per truck state change
+TRACE_DTYPE = np.dtype([
+    ('tick', '<u4'),
+    ('entity', '<u2'),  # Truck id
+    ('state', 'u1'),
+    ('slot', 'u1'),  # Loader or scaler index, 0 for queues
+    ('time_remaining', '<i2')  # Right after the change
+])
+
+# Truck states, a truck joins the back of a queue in the order its records are written
+LOADER_QUEUE = 0
+LOADING = 1
+SCALER_QUEUE = 2
+SCALING = 3
+DUMPING = 4
+
+# magic, format version, trucks, loaders, scalers, time units
+HEADER = struct.Struct('<4sHHHHI')
+MAGIC = b'DTTR'
+VERSION = 1
+
+
+# A TRACE_DTYPE record packed by struct, so the tick loop writes straight
+# into the file layout
+RECORD = struct.Struct('<IHBBh')
+assert RECORD.size == TRACE_DTYPE.itemsize
+pack_record = RECORD.pack
+
+
+class TraceWriter:
+    """Appends trace records to a compact binary file in large blocks.
+
+    The tick loop adds every record to ``records``, a bytearray of packed
+    TRACE_DTYPE records (one ``pack_record`` and a bytearray append cost
+    less than writing the fields into a NumPy array or converting a list of
+    ints later). Once ``full`` the block is written out as is.
+    """
+
+    def __init__(self, path, num_trucks, num_loaders, num_scalers, horizon, block_records=1 << 16):
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, num_trucks, num_loaders, num_scalers, horizon))
+        self.block_bytes = block_records * RECORD.size
+        self.records = bytearray()
+
+    @property
+    def full(self):
+        return len(self.records) >= self.block_bytes
+
+    def flush(self):
+        self.file.write(self.records)
+        # Cleared in place, the tick loop holds on to the bytearray
+        del self.records[:]
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_trace(path):
+    """Header dict and the records of a trace file as a read-only memmap."""
+    with open(path, 'rb') as file:
+        magic, version, num_trucks, num_loaders, num_scalers, horizon = HEADER.unpack(file.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a dump truck trace file")
+    header = {
+        'version': version,
+        'num_trucks': num_trucks,
+        'num_loaders': num_loaders,
+        'num_scalers': num_scalers,
+        'horizon': horizon
+    }
+    records = np.memmap(path, dtype=TRACE_DTYPE, mode='r', offset=HEADER.size)
+    return header, records
@@ -0,0 +1,3 @@
+"""Shared building blocks for the simulation models in this repository."""
+
+from simcore.distributions import DiscreteDistribution
@@ -0,0 +1,152 @@
+import functools
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from simcore.distributions import DiscreteDistribution
+from simcore.replication import run_replications
+
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser('~'), '.cache', 'simcore')
+DEFAULT_MAX_BYTES = 1 << 30
+
+
+def fingerprint(value):
+    """JSON-ready form of parameters, distributions and arrays for hashing."""
+    if isinstance(value, np.random.SeedSequence):
+        return {'entropy': fingerprint(value.entropy), 'spawn_key': list(value.spawn_key)}
+    if isinstance(value, DiscreteDistribution):
+        return {'values': fingerprint(list(value.values)), 'probabilities': [float(p) for p in value.probabilities]}
+    if isinstance(value, dict):
+        return {str(key): fingerprint(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [fingerprint(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def engine_name(run):
+    # Qualified name of the function behind a run callable, partials unwrapped
+    while isinstance(run, functools.partial):
+        run = run.func
+    return f'{run.__module__}.{run.__qualname__}'
+
+
+def _save_atomic(path, write):
+    # Write next to path and move into place, an interrupted write never
+    # leaves a truncated file under the real name
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as file:
+        write(file)
+    os.replace(temporary, path)
+
+
+def _run_block(run, block_size, rng):
+    return np.asarray(run(rng, block_size), dtype=float)
+
+
+class ResultCache:
+    """Per-replication results on local disk, keyed by model, parameters and seed.
+
+    ``get`` returns a (replications x metrics) array. Replications are run
+    in blocks of ``block_size`` and block ``b`` always draws from the b-th
+    child of ``seed`` (see replication_seeds), so a cached study is a prefix
+    of any longer one: asking for more replications only runs the missing
+    blocks and appends them. Entries are evicted least recently used first
+    once the cache is over ``max_bytes``.
+
+    The key also covers the engine (the qualified name of ``run``) and a
+    ``version`` the model bumps whenever its results change, so results of
+    older code are never served.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or os.environ.get('SIMCORE_CACHE', DEFAULT_DIRECTORY)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, model, parameters, seed, block_size, version=0, engine=None):
+        description = json.dumps(fingerprint({'model': model, 'parameters': parameters, 'seed': seed,
+                                              'block_size': block_size, 'version': version, 'engine': engine}),
+                                 sort_keys=True)
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def _paths(self, key):
+        return os.path.join(self.directory, f'{key}.npy'), os.path.join(self.directory, f'{key}.json')
+
+    def get(self, model, parameters, run, num_replications, seed, block_size=1, names=None, workers=1, version=0):
+        """Results of ``num_replications`` replications of ``run``.
+
+        ``run(rng, count)`` simulates ``count`` replications from a numpy
+        Generator and returns one row per replication; it must be picklable
+        when ``workers`` is not 1. Without a seed nothing is cached.
+        """
+        num_blocks = -(-num_replications // block_size)
+        replicate = functools.partial(_run_block, run, block_size)
+        if seed is None:
+            return np.concatenate(run_replications(replicate, num_blocks, None, workers))[:num_replications]
+
+        key = self.key(model, parameters, seed, block_size, version, engine_name(run))
+        results_path, info_path = self._paths(key)
+        try:
+            results = np.load(results_path)
+        except (OSError, ValueError, EOFError):
+            # Missing or unreadable, run everything again
+            results = None
+        cached_blocks = 0 if results is None else len(results) // block_size
+
+        if cached_blocks < num_blocks:
+            blocks = run_replications(replicate, num_blocks - cached_blocks, seed, workers, start=cached_blocks)
+            results = np.concatenate(([] if results is None else [results]) + blocks)
+            info = {'model': model, 'parameters': fingerprint(parameters), 'seed': fingerprint(seed),
+                    'block_size': block_size, 'version': version, 'engine': engine_name(run),
+                    'replications': len(results), 'names': names}
+            _save_atomic(results_path, lambda file: np.save(file, results))
+            _save_atomic(info_path, lambda file: file.write(json.dumps(info).encode()))
+            self.evict(keep=key)
+        else:
+            # Reading counts as a use for the LRU order
+            os.utime(results_path)
+
+        return results[:num_replications]
+
+    def entries(self):
+        # (last use, size, key) of every cached result
+        entries = []
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith('.npy'):
+                stat = os.stat(os.path.join(self.directory, file_name))
+                entries.append((stat.st_mtime, stat.st_size, file_name[:-len('.npy')]))
+        return sorted(entries)
+
+    def evict(self, keep=None):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            for path in self._paths(key):
+                if os.path.exists(path):
+                    os.remove(path)
+            total -= size
+
+    def clear(self):
+        for _, _, key in self.entries():
+            for path in self._paths(key):
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+def cached_rows(model, parameters, run, num_replications, seed, version, cache=None, **options):
+    """``ResultCache.get`` on ``cache``, the default cache when None.
+
+    ``version`` is the model's CACHE_VERSION. It is part of the key, so a
+    model bumps it whenever ``run`` changes its results and entries of the
+    older code are ignored. ``options`` go to ``get`` (block_size, names,
+    workers).
+    """
+    return (cache or ResultCache()).get(model, parameters, run, num_replications, seed, version=version, **options)
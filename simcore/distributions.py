@@ -0,0 +1,95 @@
+import random
+
+import numpy as np
+
+
+class DiscreteDistribution:
+    """Discrete distribution sampled in O(1) per draw.
+
+    Built either from explicit values and probabilities (sampled with an
+    alias table) or from a range table of (start, end, value) dice rolls
+    (sampled with a dense roll -> value lookup). Scalar draws use the
+    ``random`` module so the scripts stay seedable with ``random.seed``;
+    batched draws use a NumPy generator.
+    """
+
+    def __init__(self, values, probabilities, default=0):
+        total = float(sum(probabilities))
+        self.values = list(values)
+        self.probabilities = [p / total for p in probabilities]
+        self.default = default
+        self.die = None
+        self._rolls = None
+        self._roll_array = None
+        self._value_array = np.asarray(self.values)
+        self._build_alias_table()
+
+    @classmethod
+    def from_range_table(cls, table, default=0):
+        # table rows are (Assigned Number 1, Assigned Number 2, Value)
+        die = max(end for _, end, _ in table)
+        distribution = cls([value for _, _, value in table],
+                           [end - start + 1 for start, end, _ in table],
+                           default)
+        distribution.die = die
+        distribution._rolls = [default] * (die + 1)
+        for start, end, value in table:
+            for roll in range(start, end + 1):
+                distribution._rolls[roll] = value
+        # Default at both ends so clipped out-of-range rolls map to it
+        distribution._roll_array = np.asarray(distribution._rolls + [default])
+        return distribution
+
+    def _build_alias_table(self):
+        # Vose's alias method
+        n = len(self.values)
+        scaled = [p * n for p in self.probabilities]
+        self._accept = [1.0] * n
+        self._alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self._accept[s] = scaled[s]
+            self._alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+        self._accept_array = np.asarray(self._accept)
+        self._alias_array = np.asarray(self._alias)
+
+    @property
+    def mean(self):
+        return sum(v * p for v, p in zip(self.values, self.probabilities))
+
+    def lookup(self, roll):
+        """Value for a dice roll (or an array of rolls) of a range table."""
+        if isinstance(roll, np.ndarray):
+            return self._roll_array[np.clip(roll, 0, self.die + 1)]
+        if 1 <= roll <= self.die:
+            return self._rolls[roll]
+        return self.default
+
+    def draw(self, rng=random):
+        """Single draw, ``rng`` is the ``random`` module or a ``random.Random``."""
+        if self._rolls is not None:
+            return self._rolls[rng.randint(1, self.die)]
+        u = rng.random() * len(self.values)
+        i = int(u)
+        if u - i < self._accept[i]:
+            return self.values[i]
+        return self.values[self._alias[i]]
+
+    def sample(self, size=None, rng=None):
+        """NumPy array of ``size`` draws from a ``numpy.random.Generator``."""
+        rng = np.random.default_rng(rng)
+        if self._rolls is not None:
+            return self._roll_array[rng.integers(1, self.die + 1, size=size)]
+        # An array even for a single draw (size None), astype needs one
+        u = np.asarray(rng.random(size) * len(self.values))
+        i = u.astype(np.intp)
+        keep = (u - i) < self._accept_array[i]
+        return self._value_array[np.where(keep, i, self._alias_array[i])]
@@ -0,0 +1,44 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def replication_seeds(num_replications, seed=None, start=0):
+    """One independent SeedSequence per replication, spawned from ``seed``.
+
+    Replication ``i`` always gets the i-th child of the master sequence, so a
+    replication's stream does not depend on how the work is split.
+    """
+    master = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return [np.random.SeedSequence(master.entropy, spawn_key=master.spawn_key + (i,))
+            for i in range(start, start + num_replications)]
+
+
+def _run_shard(replicate, seeds):
+    return [replicate(np.random.default_rng(seed)) for seed in seeds]
+
+
+def run_replications(replicate, num_replications, seed=None, workers=None, start=0):
+    """Run ``replicate(rng)`` once per replication and return the results in order.
+
+    Replications are split into contiguous shards and run on a
+    ``ProcessPoolExecutor``; ``replicate`` must be picklable (a module level
+    function or a ``functools.partial`` of one) and should return a small
+    summary tuple. The results are identical for any number of workers.
+    """
+    seeds = replication_seeds(num_replications, seed, start)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or num_replications <= 1:
+        return _run_shard(replicate, seeds)
+
+    # A few shards per worker keeps them all busy until the end
+    num_shards = min(num_replications, workers * 4)
+    bounds = np.linspace(0, num_replications, num_shards + 1).astype(int)
+    shards = [seeds[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for shard_results in executor.map(_run_shard, [replicate] * len(shards), shards):
+            results.extend(shard_results)
+    return results
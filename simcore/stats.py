@@ -0,0 +1,98 @@
+import numpy as np
+
+
+class OnlineStats:
+    """Running mean, variance and confidence interval of a set of metrics.
+
+    Uses Welford's update so memory stays O(number of metrics) no matter
+    how many replications are added.
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.count = 0
+        self.mean = np.zeros(len(self.names))
+        self._m2 = np.zeros(len(self.names))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (values - self.mean)
+
+    def update_many(self, values):
+        """Add a (replications x metrics) block at once (Chan's parallel update)."""
+        values = np.asarray(values, dtype=float).reshape(-1, len(self.names))
+        count = len(values)
+        if count == 0:
+            return
+        block_mean = values.mean(axis=0)
+        block_m2 = ((values - block_mean) ** 2).sum(axis=0)
+        total = self.count + count
+        delta = block_mean - self.mean
+        self.mean = self.mean + delta * count / total
+        self._m2 = self._m2 + block_m2 + delta ** 2 * self.count * count / total
+        self.count = total
+
+    @property
+    def variance(self):
+        if self.count < 2:
+            return np.full(len(self.names), np.nan)
+        return self._m2 / (self.count - 1)
+
+    def half_width(self, confidence=0.95):
+        """Half-width of the Student t confidence interval of each mean."""
+        if self.count < 2:
+            return np.full(len(self.names), np.inf)
+        from scipy.stats import t
+        quantile = t.ppf((1 + confidence) / 2, self.count - 1)
+        return quantile * np.sqrt(self.variance / self.count)
+
+    def summary(self, confidence=0.95):
+        return dict(zip(self.names, zip(self.mean, self.half_width(confidence))))
+
+
+def run_until_precise(replicate, names, target_half_width, confidence=0.95,
+                      min_replications=10, max_replications=None):
+    """Call ``replicate()`` until every metric's CI half-width is below target.
+
+    ``target_half_width`` is a single number or one number per metric.
+    ``min_replications`` guards against stopping on a lucky low-variance
+    start; ``max_replications`` caps the run when the target is unreachable.
+    """
+    stats = OnlineStats(names)
+    targets = np.broadcast_to(np.asarray(target_half_width, dtype=float), stats.mean.shape)
+
+    while max_replications is None or stats.count < max_replications:
+        stats.update(replicate())
+        if stats.count >= min_replications and np.all(stats.half_width(confidence) <= targets):
+            break
+    return stats
+
+
+def control_variate_estimate(observations, controls, control_means, confidence=0.95):
+    """Control-variate adjusted means of ``observations``.
+
+    ``observations`` is (replications x metrics) and ``controls`` is
+    (replications x controls) with known expectations ``control_means``.
+    The coefficients are the least-squares fit of the observations on the
+    controls across replications, and the half-width is a Student t
+    interval with one degree of freedom less per control. Returns the
+    adjusted means, their half-widths, the variance reduction factor of
+    each metric and the coefficients (controls x metrics).
+    """
+    from scipy.stats import t
+
+    observations = np.asarray(observations, dtype=float)
+    controls = np.asarray(controls, dtype=float)
+    count, num_controls = controls.shape
+    centered = controls - controls.mean(axis=0)
+    coefficients = np.linalg.lstsq(centered, observations - observations.mean(axis=0), rcond=None)[0]
+
+    adjusted = observations - (controls - np.asarray(control_means, dtype=float)) @ coefficients
+    residual_variance = np.var(adjusted - adjusted.mean(axis=0), axis=0, ddof=1 + num_controls)
+    quantile = t.ppf((1 + confidence) / 2, count - 1 - num_controls)
+    with np.errstate(divide='ignore'):
+        variance_reduction = np.var(observations, axis=0, ddof=1) / residual_variance
+    return adjusted.mean(axis=0), quantile * np.sqrt(residual_variance / count), variance_reduction, coefficients
@@ -0,0 +1,184 @@
+import json
+import os
+
+import numpy as np
+
+HEADER_NAME = 'header.json'
+FORMAT_VERSION = 1
+
+
+def _table_path(directory, name):
+    return os.path.join(directory, f'{name}.bin')
+
+
+def _as_records(dtype, records):
+    # Structured array in the table's dtype, from one or a dict of equal-length columns
+    if isinstance(records, np.ndarray) and records.dtype == dtype:
+        return records
+    columns = {name: np.asarray(values) for name, values in records.items()}
+    block = np.empty(len(next(iter(columns.values()))), dtype=dtype)
+    for name in dtype.names:
+        block[name] = columns[name]
+    return block
+
+
+def _seed_record(seed_sequence):
+    # JSON form of a SeedSequence, the entropy alone unless it was spawned
+    entropy = seed_sequence.entropy
+    entropy = int(entropy) if np.ndim(entropy) == 0 else [int(word) for word in entropy]
+    if seed_sequence.spawn_key:
+        return {'entropy': entropy, 'spawn_key': list(seed_sequence.spawn_key)}
+    return entropy
+
+
+class ResultWriter:
+    """Appends simulation results to fixed-width tables in ``np.memmap`` files.
+
+    ``tables`` maps a table name (e.g. 'customers', 'replications') to a
+    list of (field, dtype) pairs and the directory gets one ``<name>.bin``
+    per table plus a JSON header with the schemas, row counts, model name,
+    seed and any extra ``metadata``. ``capacity`` is the expected row count,
+    one number or one per table; a table that outgrows it doubles, and the
+    files are trimmed to the rows written on close.
+
+    The header is written up front and its lengths after every append, so
+    the rows of a killed run can still be read; ``complete`` is only set by
+    a close without an error, and a ``with`` block that raises leaves it
+    False. ``seed_sequence`` is the SeedSequence of ``seed`` (fresh entropy
+    when None) and the header records its entropy, so every run can be
+    reproduced.
+    """
+
+    def __init__(self, directory, model, tables, seed=None, metadata=None, capacity=1 << 16):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.header = {
+            'version': FORMAT_VERSION,
+            'model': model,
+            'seed': _seed_record(self.seed_sequence),
+            'metadata': metadata or {},
+            'complete': False,
+            'tables': {name: {'dtype': [list(field) for field in fields], 'length': 0}
+                       for name, fields in tables.items()}
+        }
+        self.dtypes = {name: np.dtype([tuple(field) for field in fields]) for name, fields in tables.items()}
+        self.lengths = {name: 0 for name in tables}
+        if not isinstance(capacity, dict):
+            capacity = {name: capacity for name in tables}
+        self.maps = {name: self._map(name, max(capacity[name], 1), 'w+') for name in tables}
+        self._write_header()
+
+    def _map(self, name, rows, mode):
+        return np.memmap(_table_path(self.directory, name), dtype=self.dtypes[name], mode=mode, shape=(rows,))
+
+    def append(self, name, records):
+        """Append a structured array or a dict of columns to table ``name``."""
+        block = _as_records(self.dtypes[name], records)
+        start = self.lengths[name]
+        end = start + len(block)
+        if end > len(self.maps[name]):
+            # np.memmap cannot grow in place, flush and map a larger file
+            capacity = max(end, 2 * len(self.maps[name]))
+            self.maps[name].flush()
+            del self.maps[name]
+            self.maps[name] = self._map(name, capacity, 'r+')
+        self.maps[name][start:end] = block
+        self.lengths[name] = end
+        self._write_header()
+
+    def _write_header(self):
+        for name, length in self.lengths.items():
+            self.header['tables'][name]['length'] = length
+        path = os.path.join(self.directory, HEADER_NAME)
+        with open(f'{path}.tmp', 'w') as file:
+            json.dump(self.header, file, indent=2)
+        os.replace(f'{path}.tmp', path)
+
+    def close(self, complete=True):
+        for table in self.maps.values():
+            table.flush()
+        self.maps = {}
+        for name, length in self.lengths.items():
+            with open(_table_path(self.directory, name), 'r+b') as file:
+                file.truncate(length * self.dtypes[name].itemsize)
+        self.header['complete'] = complete
+        self._write_header()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        # The rows so far are still flushed and trimmed, only not marked complete
+        self.close(complete=exc_info[0] is None)
+
+
+def write_batches(directory, model, tables, write_batch, count, seed=None, metadata=None, capacity=None,
+                  batch_size=10000):
+    """Simulate ``count`` replications into a result store, ``batch_size`` at a time.
+
+    ``write_batch(writer, rng, index)`` simulates the replications numbered
+    ``index`` (an arange) from ``rng`` and appends their rows. ``rng`` is
+    one Generator over the writer's seed sequence, so the seed in the
+    header reproduces the whole run for a given ``batch_size``.
+    ``capacity`` defaults to ``count`` rows per table.
+    """
+    with ResultWriter(directory, model, tables, seed, metadata, count if capacity is None else capacity) as writer:
+        rng = np.random.default_rng(writer.seed_sequence)
+        for start in range(0, count, batch_size):
+            write_batch(writer, rng, np.arange(start, min(start + batch_size, count)))
+
+
+class ResultStore:
+    """Read side of a ResultWriter directory.
+
+    ``table(name)`` is a read-only memmap, so ``store.table('customers')['waiting_time']``
+    is a zero-copy view; ``chunks(name)`` yields pandas DataFrames of at
+    most ``chunk_size`` rows for analysis that does not fit in memory.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, HEADER_NAME)) as file:
+            self.header = json.load(file)
+        if self.header['version'] != FORMAT_VERSION:
+            raise ValueError(f"{directory} has result store version {self.header['version']}")
+
+    @property
+    def model(self):
+        return self.header['model']
+
+    @property
+    def seed(self):
+        return self.header['seed']
+
+    @property
+    def seed_sequence(self):
+        # The SeedSequence the run's Generator was made from
+        if isinstance(self.seed, dict):
+            return np.random.SeedSequence(self.seed['entropy'], spawn_key=tuple(self.seed['spawn_key']))
+        return np.random.SeedSequence(self.seed)
+
+    @property
+    def complete(self):
+        # False for a run that was killed before close()
+        return self.header.get('complete', True)
+
+    @property
+    def tables(self):
+        return list(self.header['tables'])
+
+    def table(self, name):
+        schema = self.header['tables'][name]
+        dtype = np.dtype([tuple(field) for field in schema['dtype']])
+        if schema['length'] == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(_table_path(self.directory, name), dtype=dtype, mode='r', shape=(schema['length'],))
+
+    def chunks(self, name, chunk_size=1 << 20):
+        import pandas as pd
+
+        records = self.table(name)
+        for start in range(0, len(records), chunk_size):
+            chunk = records[start:start + chunk_size]
+            yield pd.DataFrame({field: chunk[field] for field in records.dtype.names})
@@ -0,0 +1,98 @@
+import csv
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from simcore.replication import replication_seeds
+from simcore.stats import OnlineStats
+
+
+def expand_grid(grid):
+    """Every combination of a dict of parameter lists, the last key varying fastest."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+class SweepJob:
+    """One grid point: ``replications`` runs of ``run(rng, count)``.
+
+    ``run`` returns one row of ``names`` per replication and must be
+    picklable. ``cost`` is the relative work of one replication, it only
+    orders the schedule.
+    """
+
+    def __init__(self, model, parameters, run, names, replications, cost=1, block_size=1000):
+        self.model = model
+        self.parameters = parameters
+        self.run = run
+        self.names = list(names)
+        self.replications = replications
+        self.cost = cost
+        self.block_size = block_size
+
+
+def _run_task(run, count, seed_sequence):
+    return np.asarray(run(np.random.default_rng(seed_sequence), count), dtype=float)
+
+
+def run_sweep(jobs, seed=None, workers=None, confidence=0.95):
+    """Run every job on one worker pool and return one result row per job.
+
+    Jobs are cut into blocks of ``block_size`` replications and the blocks
+    are handed out largest first, so the long runs start early and the
+    small ones fill in at the end. Block ``b`` of every job draws from the
+    b-th child of ``seed`` as in ResultCache, so the results do not depend
+    on ``workers``. Jobs with the same block size whose runs draw from the
+    rng the same way share random numbers; others only share the seed.
+    A row holds the model, the parameters, the replication count and the
+    mean and confidence half-width of each metric.
+    """
+    master = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    tasks = []
+    for job_index, job in enumerate(jobs):
+        num_blocks = -(-job.replications // job.block_size)
+        for block, seed_sequence in enumerate(replication_seeds(num_blocks, master)):
+            count = min(job.block_size, job.replications - block * job.block_size)
+            tasks.append((job.cost * count, job_index, block, count, seed_sequence))
+    tasks.sort(key=lambda task: -task[0])
+
+    blocks = [{} for _ in jobs]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for _, job_index, block, count, seed_sequence in tasks:
+            blocks[job_index][block] = _run_task(jobs[job_index].run, count, seed_sequence)
+    else:
+        # The pool starts tasks in submission order, which is largest first
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [(job_index, block, executor.submit(_run_task, jobs[job_index].run, count, seed_sequence))
+                       for _, job_index, block, count, seed_sequence in tasks]
+            for job_index, block, future in futures:
+                blocks[job_index][block] = future.result()
+
+    rows = []
+    for job, job_blocks in zip(jobs, blocks):
+        stats = OnlineStats(job.names)
+        for block in sorted(job_blocks):
+            stats.update_many(job_blocks[block])
+        row = {'model': job.model, **job.parameters, 'replications': stats.count}
+        for name, (mean, half_width) in stats.summary(confidence).items():
+            row[name] = mean
+            row[f'{name}_half_width'] = half_width
+        rows.append(row)
+    return rows
+
+
+def write_table(rows, path=None):
+    # CSV of run_sweep rows, the columns are the union of every row's keys
+    fields = list(dict.fromkeys(field for row in rows for field in row))
+    file = open(path, 'w', newline='') if path else sys.stdout
+    try:
+        writer = csv.DictWriter(file, fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    finally:
+        if path:
+            file.close()
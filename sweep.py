@@ -0,0 +1,188 @@
+import argparse
+import importlib
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(ROOT)
+
+from simcore.sweep import SweepJob, expand_grid, run_sweep, write_table
+
+QUEUE_DIRECTORY = 'Minggu 2 & 3'
+FERRY_DIRECTORY = 'Minggu 4'
+DUMPTRUCK_DIRECTORY = 'dumptruck'
+
+# Rough microseconds per replication, only used to order the schedule
+SIMULASI_COST = 0.3
+LOCKSTEP_COST = 0.2
+MULTI_SERVER_COST = 3.5
+DUMPTRUCK_COST = 0.06
+FERRY_COST = 1.0
+
+_models = {}
+
+
+def import_model(directory, name):
+    """Module ``name`` of a model directory, imported from that directory.
+
+    The model directories share module names (Minggu 4 and dumptruck both
+    have a main.py), so the directory is put first on sys.path only while
+    importing, and any same-named module already loaded from elsewhere is
+    set aside meanwhile so the model binds its own sibling modules.
+    """
+    if (directory, name) in _models:
+        return _models[(directory, name)]
+    path = os.path.join(ROOT, directory)
+    shadowed = {}
+    for file_name in os.listdir(path):
+        module = sys.modules.get(file_name[:-len('.py')]) if file_name.endswith('.py') else None
+        if module is not None and os.path.dirname(os.path.abspath(getattr(module, '__file__', None) or '')) != path:
+            shadowed[module.__name__] = sys.modules.pop(module.__name__)
+    sys.path.insert(0, path)
+    try:
+        module = importlib.import_module(name)
+    finally:
+        sys.path.remove(path)
+        sys.modules.update(shadowed)
+    _models[(directory, name)] = module
+    return module
+
+
+class ModelCall:
+    """Picklable ``function(*args, **kwargs)`` of a model module.
+
+    Only the directory, module and function names are pickled, and workers
+    import the module through import_model, so they do not depend on the
+    order of sys.path either.
+    """
+
+    def __init__(self, directory, module, function, **kwargs):
+        self.directory = directory
+        self.module = module
+        self.function = function
+        self.kwargs = kwargs
+
+    def __call__(self, *args):
+        return getattr(import_model(self.directory, self.module), self.function)(*args, **self.kwargs)
+
+
+def staff(num_servers):
+    # Servers alternate Ali's and Badu's service tables: Ali, Badu, Ali 2, Badu 2, ...
+    service_dists = import_model(QUEUE_DIRECTORY, 'simulasi_2_server').SERVICE_DISTS
+    names = list(service_dists)
+    specs = []
+    for i in range(num_servers):
+        name = names[i % len(names)]
+        specs.append((name if i < len(names) else f"{name} {i // len(names) + 1}", service_dists[name]))
+    return specs
+
+
+def simulasi_job(replications, customers):
+    simulasi = import_model(QUEUE_DIRECTORY, 'simulasi')
+    return SweepJob('simulasi', {'customers': customers},
+                    ModelCall(QUEUE_DIRECTORY, 'simulasi', 'replication_rows', num_customers=customers),
+                    simulasi.REPORT_METRICS, replications, SIMULASI_COST * customers, block_size=10000)
+
+
+def multi_server_job(replications, customers, servers, policy):
+    summary_metrics = import_model(QUEUE_DIRECTORY, 'multi_server').SUMMARY_METRICS
+    parameters = {'customers': customers, 'servers': servers, 'policy': policy}
+    # Both engines draw the rolls alike, with equal blocks every grid point
+    # gets the same customers
+    if servers == 2 and policy in ("first-listed", "random"):
+        # Ali and Badu, the lockstep engine runs a whole block at once
+        return SweepJob('multi_server', parameters,
+                        ModelCall(QUEUE_DIRECTORY, 'two_server_batch', 'summary_rows', num_customers=customers,
+                                  policy=policy),
+                        summary_metrics, replications, LOCKSTEP_COST * customers, block_size=1000)
+    arrival_dist = import_model(QUEUE_DIRECTORY, 'simulasi_2_server').ARRIVAL_DELAY_DIST
+    return SweepJob('multi_server', parameters,
+                    ModelCall(QUEUE_DIRECTORY, 'multi_server', 'replication_rows', num_customers=customers,
+                              server_specs=staff(servers), arrival_dist=arrival_dist, policy=policy),
+                    summary_metrics, replications, MULTI_SERVER_COST * customers, block_size=1000)
+
+
+def dumptruck_job(replications, trucks, loaders, scalers, horizon):
+    batched = import_model(DUMPTRUCK_DIRECTORY, 'batched')
+    return SweepJob('dumptruck', {'trucks': trucks, 'loaders': loaders, 'scalers': scalers, 'horizon': horizon},
+                    ModelCall(DUMPTRUCK_DIRECTORY, 'batched', 'replication_rows', horizon=horizon,
+                              num_trucks=trucks, num_loaders=loaders, num_scalers=scalers),
+                    batched.SCALAR_METRICS, replications, DUMPTRUCK_COST * horizon * trucks, block_size=1000)
+
+
+def ferry_job(replications, procedure, decks, sampling):
+    # A replication is a batch of decks with the report() percentages, as in ferry_qmc
+    ferry_qmc = import_model(FERRY_DIRECTORY, 'ferry_qmc')
+    return SweepJob('ferry', {'procedure': procedure, 'decks': decks, 'sampling': sampling},
+                    ModelCall(FERRY_DIRECTORY, 'ferry_qmc', 'replication_rows', num_decks=decks,
+                              algorithm=procedure, sampling=sampling),
+                    ferry_qmc.METRICS, replications, FERRY_COST * decks, block_size=1)
+
+
+MODELS = {
+    'simulasi': simulasi_job,
+    'multi_server': multi_server_job,
+    'dumptruck': dumptruck_job,
+    'ferry': ferry_job
+}
+
+
+def sweep(model, grid, seed=0, workers=None, confidence=0.95):
+    """Run ``model`` at every point of ``grid`` and return one row per point.
+
+    ``grid`` maps the model's parameters (always ``replications``, see the
+    *_job functions for the rest) to lists of values. Every point is
+    scheduled on one worker pool, see simcore.sweep.run_sweep.
+    """
+    jobs = [MODELS[model](**point) for point in expand_grid(grid)]
+    return run_sweep(jobs, seed, workers, confidence)
+
+
+def parse_args(args=None):
+    main2 = import_model(DUMPTRUCK_DIRECTORY, 'main2')
+
+    parser = argparse.ArgumentParser(description="Run a parameter grid of one model and write a CSV of the "
+                                                 "mean and confidence half-width of every metric.")
+    models = parser.add_subparsers(dest='model', required=True)
+
+    def model_parser(name, replications):
+        model_args = models.add_parser(name)
+        model_args.add_argument('--replications', type=int, nargs='+', default=[replications])
+        model_args.add_argument('--seed', type=int, default=0)
+        model_args.add_argument('--workers', type=int, default=None, help="default: one per CPU")
+        model_args.add_argument('--output', default=None, help="CSV path, default: standard output")
+        return model_args
+
+    simulasi_args = model_parser('simulasi', 10000)
+    simulasi_args.add_argument('--customers', type=int, nargs='+', default=[20])
+
+    multi_server_args = model_parser('multi_server', 10000)
+    multi_server_args.add_argument('--customers', type=int, nargs='+', default=[20])
+    multi_server_args.add_argument('--servers', type=int, nargs='+', default=[2])
+    multi_server_args.add_argument('--policy', nargs='+', default=["first-listed"],
+                                   choices=["first-listed", "random", "fastest-expected", "least-busy"])
+
+    dumptruck_args = model_parser('dumptruck', 1000)
+    dumptruck_args.add_argument('--trucks', type=int, nargs='+', default=[main2.NUM_TRUCKS])
+    dumptruck_args.add_argument('--loaders', type=int, nargs='+', default=[main2.NUM_LOADERS])
+    dumptruck_args.add_argument('--scalers', type=int, nargs='+', default=[main2.NUM_SCALERS])
+    dumptruck_args.add_argument('--horizon', type=int, nargs='+', default=[main2.TIME_UNITS])
+
+    ferry_args = model_parser('ferry', 32)
+    # Procedures 4 and 5 only exist in main.py's per-deck FerryDeck, not in the batched engine
+    ferry_args.add_argument('--procedure', type=int, nargs='+', default=[1], choices=[1, 2, 3],
+                            help="loading procedure, 4 and 5 have no batched version")
+    ferry_args.add_argument('--decks', type=int, nargs='+', default=[8192],
+                            help="decks per replication, a power of two for sobol")
+    ferry_args.add_argument('--sampling', nargs='+', default=['sobol'], choices=['sobol', 'random'])
+
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    args = vars(parse_args(args))
+    model, seed, workers, output = args.pop('model'), args.pop('seed'), args.pop('workers'), args.pop('output')
+    write_table(sweep(model, args, seed, workers), output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The models import simcore and sweep.py from the repository root
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
@@ -0,0 +1,32 @@
+import numpy as np
+
+from sweep import QUEUE_DIRECTORY, import_model
+
+
+def test_antithetic_pairs_average_mirrored_rolls():
+    simulasi = import_model(QUEUE_DIRECTORY, 'simulasi')
+    stats, _ = simulasi.simulate_antithetic(30, 5, rng=2)
+
+    rng = np.random.default_rng(2)
+    arrival_rolls = rng.integers(1, simulasi.ARRIVAL_DIST.die + 1, size=(5, 30))
+    service_rolls = rng.integers(1, simulasi.SERVICE_DIST.die + 1, size=(5, 30))
+    pairs = []
+    for arrival, service in zip(arrival_rolls, service_rolls):
+        plain = simulasi.report_vectorized(simulasi.simulate_from_rolls(arrival, service), 30)
+        mirrored = simulasi.report_vectorized(simulasi.simulate_from_rolls(simulasi.ARRIVAL_DIST.die + 1 - arrival,
+                                                                           simulasi.SERVICE_DIST.die + 1 - service),
+                                              30)
+        pairs.append([(a[0] + b[0]) / 2 for a, b in zip(plain, mirrored)])
+
+    assert stats.count == 5
+    assert np.allclose(stats.mean, np.mean(pairs, axis=0))
+
+
+def test_antithetic_pairs_reduce_variance_without_bias():
+    simulasi = import_model(QUEUE_DIRECTORY, 'simulasi')
+    stats, variance_reduction = simulasi.simulate_antithetic(20, 4000, rng=3)
+    assert (variance_reduction[:2] > 1).all()
+    # Mirrored rolls are still uniform, the pair means estimate the plain ones
+    plain = np.column_stack(simulasi.report_vectorized(simulasi.simulate_customers_vectorized(20, 8000, 4), 20))
+    standard_error = np.sqrt(plain.var(axis=0, ddof=1) / len(plain) + stats.variance / stats.count)
+    assert (np.abs(stats.mean - plain.mean(axis=0)) <= 4 * standard_error + 1e-12).all()
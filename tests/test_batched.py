@@ -0,0 +1,25 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from sweep import DUMPTRUCK_DIRECTORY, ROOT, import_model
+
+
+def test_imports_from_its_own_directory():
+    subprocess.run([sys.executable, '-c', 'import batched'], cwd=os.path.join(ROOT, DUMPTRUCK_DIRECTORY),
+                   env={key: value for key, value in os.environ.items() if key != 'PYTHONPATH'}, check=True)
+
+
+def test_lockstep_replications_match_the_tick_loop():
+    # Different streams, so the means agree within their standard errors
+    main2 = import_model(DUMPTRUCK_DIRECTORY, 'main2')
+    batched = import_model(DUMPTRUCK_DIRECTORY, 'batched')
+    lockstep = batched.simulate_batch(4000, rng=1)
+    tick = [results.as_dict() for results in main2.run_replications(400, seed=1)]
+    for name in batched.SCALAR_METRICS:
+        a = lockstep[name]
+        b = np.array([results[name] for results in tick])
+        standard_error = np.sqrt(a.var(ddof=1) / len(a) + b.var(ddof=1) / len(b))
+        assert abs(a.mean() - b.mean()) <= 4 * standard_error, name
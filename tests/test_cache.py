@@ -0,0 +1,84 @@
+import os
+from functools import partial
+
+import numpy as np
+
+from simcore.cache import ResultCache, cached_rows
+from sweep import QUEUE_DIRECTORY, import_model
+
+
+def counting_run(counts, rng, count):
+    # run(rng, count) that records every block it simulates in counts
+    counts.append(count)
+    return rng.random((count, 2))
+
+
+def uniform_run(rng, count):
+    return rng.random((count, 2))
+
+
+def test_longer_study_extends_cached_prefix(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    counts = []
+    run = partial(counting_run, counts)
+    short = cache.get('test', {'a': 1}, run, 25, seed=3, block_size=10)
+    assert sum(counts) == 30
+    longer = cache.get('test', {'a': 1}, run, 48, seed=3, block_size=10)
+    assert sum(counts) == 50
+    np.testing.assert_array_equal(longer[:25], short)
+    assert cache.get('test', {'a': 1}, run, 48, seed=3, block_size=10).shape == (48, 2)
+    assert sum(counts) == 50
+    # Same as one uncached run of the whole study
+    fresh = ResultCache(str(tmp_path / 'fresh')).get('test', {'a': 1}, partial(counting_run, []), 48, seed=3,
+                                                     block_size=10)
+    np.testing.assert_array_equal(longer, fresh)
+
+
+def test_key_covers_parameters_version_and_engine(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    counts = []
+    run = partial(counting_run, counts)
+    cache.get('test', {'a': 1}, run, 10, seed=3, block_size=10)
+    cache.get('test', {'a': 2}, run, 10, seed=3, block_size=10)
+    cache.get('test', {'a': 1}, run, 10, seed=3, block_size=10, version=1)
+    assert sum(counts) == 30
+    cache.get('test', {'a': 1}, uniform_run, 10, seed=3, block_size=10)
+    assert len(cache.entries()) == 4
+
+
+def test_corrupted_entry_is_a_miss(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    counts = []
+    run = partial(counting_run, counts)
+    expected = cache.get('test', {}, run, 10, seed=3, block_size=10)
+    (path,) = [os.path.join(str(tmp_path), name) for name in os.listdir(str(tmp_path)) if name.endswith('.npy')]
+    with open(path, 'wb') as file:
+        file.write(b'not an array')
+    np.testing.assert_array_equal(cache.get('test', {}, run, 10, seed=3, block_size=10), expected)
+    assert sum(counts) == 20
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=3000)
+    counts = []
+    run = partial(counting_run, counts)
+    for seed in range(3):
+        cache.get('test', {}, run, 100, seed=seed, block_size=100)
+    assert len(cache.entries()) == 1
+    cache.get('test', {}, run, 100, seed=2, block_size=100)
+    assert sum(counts) == 300
+
+
+def test_without_seed_nothing_is_cached(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cached_rows('test', {}, partial(counting_run, []), 10, None, 0, cache, block_size=5)
+    assert cache.entries() == []
+
+
+def test_model_cache_matches_direct_rows(tmp_path):
+    simulasi = import_model(QUEUE_DIRECTORY, 'simulasi')
+    cache = ResultCache(str(tmp_path))
+    rows = simulasi.cached_replications(20, 12000, seed=1, cache=cache)
+    assert rows.shape == (12000, len(simulasi.REPORT_METRICS))
+    np.testing.assert_array_equal(simulasi.cached_replications(20, 5000, seed=1, cache=cache), rows[:5000])
+    assert len(cache.entries()) == 1
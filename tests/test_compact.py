@@ -0,0 +1,52 @@
+import random
+
+import numpy as np
+
+from sweep import FERRY_DIRECTORY, import_model
+
+
+def test_exact_fit_loads_on_the_same_column():
+    # 32.0 - 5.3 - 9.5 - 8.0 - 5.4 is just under 3.8 in floats
+    main = import_model(FERRY_DIRECTORY, 'main')
+    ferry_deck = main.FerryDeck(1)
+    for vehicle_type, length in [('Car', 5.35), ('Lorry', 9.55), ('Lorry', 8.05), ('Car', 5.45), ('Car', 3.85)]:
+        assert ferry_deck.load_vehicle(main.Vehicle(vehicle_type, length))
+    assert ferry_deck.space_remaining == [0, 320]
+    assert ferry_deck.wasted_space == 32.0
+
+
+def test_manifest_keeps_ferry_decks(tmp_path):
+    main = import_model(FERRY_DIRECTORY, 'main')
+    compact = import_model(FERRY_DIRECTORY, 'compact')
+    rng = random.Random(1)
+    manifest = compact.DeckManifest(capacity=4, deck_capacity=2)
+    decks = []
+    for algorithm in (1, 5, 1, 5, 1):
+        ferry_deck = main.FerryDeck(algorithm)
+        while ferry_deck.load_vehicle(main.random_vehicle(rng)):
+            pass
+        manifest.append_deck(ferry_deck)
+        decks.append(ferry_deck)
+
+    manifest.save(tmp_path / 'manifest.npz')
+    loaded = compact.DeckManifest.load(tmp_path / 'manifest.npz')
+    assert len(loaded) == len(decks)
+    np.testing.assert_array_equal(loaded.space_remaining(), [ferry_deck.space_remaining for ferry_deck in decks])
+    for i, ferry_deck in enumerate(decks):
+        types, lengths, columns = loaded.deck(i)
+        vehicles = [vehicle for column in ferry_deck.deck for vehicle in column]
+        assert lengths.tolist() == [vehicle.decimetres for vehicle in vehicles]
+        assert types.tolist() == [compact.VEHICLE_CODES[vehicle.type] for vehicle in vehicles]
+        assert np.bincount(columns, minlength=2).tolist() == [len(column) for column in ferry_deck.deck]
+
+
+def test_batched_manifest_matches_space_remaining():
+    ferry_batch = import_model(FERRY_DIRECTORY, 'ferry_batch')
+    compact = import_model(FERRY_DIRECTORY, 'compact')
+    manifest = compact.DeckManifest()
+    space_remaining, vehicle_count_by_type = ferry_batch.load_decks(5000, 2, rng=2, manifest=manifest)
+    assert space_remaining.dtype == np.int16
+    np.testing.assert_array_equal(manifest.space_remaining(), space_remaining)
+    assert manifest.size == vehicle_count_by_type.sum()
+    # The default comes back in metres from the same decks
+    np.testing.assert_array_equal(ferry_batch.load_decks(5000, 2, rng=2)[0], space_remaining / 10.0)
@@ -0,0 +1,26 @@
+import random
+
+import numpy as np
+
+from sweep import QUEUE_DIRECTORY, import_model
+
+
+def test_compare_policies_leaves_global_random_alone():
+    compare_policies = import_model(QUEUE_DIRECTORY, 'compare_policies')
+    random.seed(7)
+    state = random.getstate()
+    stats, differences = compare_policies.compare_policies(50, 20, seed=3)
+    assert random.getstate() == state
+    assert differences.count == 20
+
+
+def test_compare_policies_is_reproducible():
+    compare_policies = import_model(QUEUE_DIRECTORY, 'compare_policies')
+    first = compare_policies.compare_policies(50, 20, seed=3)
+    random.random()
+    second = compare_policies.compare_policies(50, 20, seed=3)
+    for one, other in zip((*first[0].values(), first[1]), (*second[0].values(), second[1])):
+        assert np.array_equal(one.mean, other.mean)
+        assert np.array_equal(one.variance, other.variance)
+    # Paired differences are the difference of the policy means
+    assert np.allclose(first[1].mean, first[0]["Random tie-break"].mean - first[0]["Ali first"].mean)
@@ -0,0 +1,42 @@
+import numpy as np
+
+from simcore.stats import OnlineStats, control_variate_estimate
+from sweep import DUMPTRUCK_DIRECTORY, import_model
+
+
+def test_control_variate_estimate_removes_known_noise():
+    rng = np.random.default_rng(0)
+    controls = rng.normal(1.0, 1.0, size=(2000, 1))
+    observations = np.column_stack([3 + 2 * controls[:, 0] + rng.normal(0, 0.1, 2000)])
+    mean, half_width, variance_reduction, coefficients = control_variate_estimate(observations, controls, [1.0])
+    assert abs(mean[0] - 5) < half_width[0]
+    assert np.isclose(coefficients[0, 0], 2, atol=0.05)
+    assert variance_reduction[0] > 100
+
+
+def test_control_variate_estimate_without_controls_is_plain_mean():
+    observations = np.random.default_rng(1).random((50, 3))
+    mean, half_width, variance_reduction, _ = control_variate_estimate(observations, np.zeros((50, 0)), [])
+    stats = OnlineStats(range(3))
+    stats.update_many(observations)
+    assert np.allclose(mean, stats.mean)
+    assert np.allclose(half_width, stats.half_width())
+    assert np.allclose(variance_reduction, 1)
+
+
+def test_dump_truck_controls_have_zero_mean():
+    batched = import_model(DUMPTRUCK_DIRECTORY, 'batched')
+    control_variates = import_model(DUMPTRUCK_DIRECTORY, 'control_variates')
+    results = batched.simulate_batch(2000, rng=5)
+    for name in control_variates.CONTROLS:
+        deviations = np.asarray(results[name], dtype=float)
+        assert abs(deviations.mean()) <= 4 * deviations.std(ddof=1) / np.sqrt(len(deviations))
+
+
+def test_dump_truck_adjusted_means_agree_with_plain_means():
+    control_variates = import_model(DUMPTRUCK_DIRECTORY, 'control_variates')
+    estimates = control_variates.estimate(2000, seed=6)
+    for name, (plain_mean, plain_half_width, mean, half_width, variance_reduction) in estimates.items():
+        assert abs(mean - plain_mean) <= 2 * plain_half_width
+        assert half_width <= plain_half_width * 1.01
+        assert variance_reduction >= 1
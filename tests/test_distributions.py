@@ -0,0 +1,39 @@
+import random
+
+import numpy as np
+import pytest
+
+from simcore.distributions import DiscreteDistribution
+
+RANGE_TABLE = DiscreteDistribution.from_range_table([(1, 20, 3), (21, 70, 5), (71, 100, 9)])
+WEIGHTED = DiscreteDistribution([1, 2, 3, 4], [0.1, 0.2, 0.3, 0.4])
+
+
+@pytest.mark.parametrize('distribution', [RANGE_TABLE, WEIGHTED], ids=['dense', 'alias'])
+def test_single_sample_is_a_scalar(distribution):
+    value = distribution.sample(rng=1)
+    assert np.ndim(value) == 0
+    assert value in distribution.values
+
+
+@pytest.mark.parametrize('distribution', [RANGE_TABLE, WEIGHTED], ids=['dense', 'alias'])
+def test_sample_frequencies_match_probabilities(distribution):
+    draws = distribution.sample(200000, rng=2)
+    for value, probability in zip(distribution.values, distribution.probabilities):
+        frequency = np.mean(draws == value)
+        assert abs(frequency - probability) <= 4 * np.sqrt(probability * (1 - probability) / len(draws))
+
+
+@pytest.mark.parametrize('distribution', [RANGE_TABLE, WEIGHTED], ids=['dense', 'alias'])
+def test_draw_frequencies_match_probabilities(distribution):
+    rng = random.Random(3)
+    draws = np.array([distribution.draw(rng) for _ in range(100000)])
+    for value, probability in zip(distribution.values, distribution.probabilities):
+        frequency = np.mean(draws == value)
+        assert abs(frequency - probability) <= 4 * np.sqrt(probability * (1 - probability) / len(draws))
+
+
+def test_array_lookup_matches_scalar_lookup():
+    rolls = np.array([-5, 0, 1, 20, 21, 70, 71, 100, 101, 500])
+    assert RANGE_TABLE.lookup(rolls).tolist() == [RANGE_TABLE.lookup(int(roll)) for roll in rolls]
+    assert RANGE_TABLE.lookup(0) == RANGE_TABLE.default
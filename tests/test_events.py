@@ -0,0 +1,14 @@
+import random
+
+import pytest
+
+from sweep import DUMPTRUCK_DIRECTORY, import_model
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('trucks, loaders, scalers, horizon', [(10, 2, 1, 200), (3, 1, 1, 100), (15, 3, 2, 300)])
+def test_event_engine_matches_tick_loop(seed, trucks, loaders, scalers, horizon):
+    main2 = import_model(DUMPTRUCK_DIRECTORY, 'main2')
+    tick = main2.DumpTruckSystem(trucks, loaders, scalers, rng=random.Random(seed)).run(horizon)
+    events = main2.DumpTruckSystem(trucks, loaders, scalers, rng=random.Random(seed)).run_events(horizon)
+    assert events.as_dict() == tick.as_dict()
@@ -0,0 +1,43 @@
+import random
+
+import numpy as np
+
+from sweep import FERRY_DIRECTORY, import_model
+
+
+def within(simulated, exact, standard_errors=4):
+    # Mean of the simulated samples is within a few standard errors of exact
+    simulated = np.asarray(simulated, dtype=float)
+    assert abs(simulated.mean() - exact) <= standard_errors * simulated.std(ddof=1) / np.sqrt(len(simulated))
+
+
+def test_length_pmf_sums_to_one():
+    exact = import_model(FERRY_DIRECTORY, 'exact')
+    assert np.isclose(exact.length_pmf().sum(), 1.0)
+
+
+def test_batched_decks_match_exact_solution():
+    exact = import_model(FERRY_DIRECTORY, 'exact')
+    ferry_batch = import_model(FERRY_DIRECTORY, 'ferry_batch')
+    solution = exact.solve_one_deck_first()
+    space_remaining, vehicle_count_by_type = ferry_batch.load_decks(200000, 1, rng=1)
+    within(space_remaining.sum(axis=1), solution['wasted_space'])
+    within(vehicle_count_by_type.sum(axis=1), solution['vehicles_carried'])
+    for code, vehicle_type in enumerate(exact.VEHICLE_TYPES):
+        within(vehicle_count_by_type[:, code], solution['vehicles_by_type'][vehicle_type])
+
+
+def test_ferry_decks_match_exact_solution():
+    exact = import_model(FERRY_DIRECTORY, 'exact')
+    main = import_model(FERRY_DIRECTORY, 'main')
+    solution = exact.solve_one_deck_first()
+    rng = random.Random(2)
+    decks = []
+    for _ in range(20000):
+        ferry_deck = main.FerryDeck(1)
+        while ferry_deck.load_vehicle(main.random_vehicle(rng)):
+            pass
+        decks.append((ferry_deck.wasted_space, ferry_deck.vehicle_count))
+    wasted_space, vehicles_carried = np.array(decks).T
+    within(wasted_space, solution['wasted_space'])
+    within(vehicles_carried, solution['vehicles_carried'])
@@ -0,0 +1,43 @@
+import os
+import random
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from sweep import FERRY_DIRECTORY, ROOT, import_model
+
+
+def ferry_decks(num_decks, algorithm, seed):
+    # (wasted space, vehicles carried) of every deck of main.py's FerryDeck
+    main = import_model(FERRY_DIRECTORY, 'main')
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        decks = []
+        for _ in range(num_decks):
+            ferry_deck = main.FerryDeck(algorithm)
+            while ferry_deck.load_vehicle(main.random_vehicle()):
+                pass
+            decks.append((ferry_deck.wasted_space, ferry_deck.vehicle_count))
+    finally:
+        random.setstate(state)
+    return np.array(decks)
+
+
+def test_imports_from_its_own_directory():
+    subprocess.run([sys.executable, '-c', 'import ferry_batch'], cwd=os.path.join(ROOT, FERRY_DIRECTORY),
+                   env={key: value for key, value in os.environ.items() if key != 'PYTHONPATH'}, check=True)
+
+
+@pytest.mark.parametrize('algorithm', [1, 2, 3])
+def test_batched_decks_match_ferry_deck(algorithm):
+    # Different streams, so the means agree within their standard errors
+    ferry_batch = import_model(FERRY_DIRECTORY, 'ferry_batch')
+    space_remaining, vehicle_count_by_type = ferry_batch.load_decks(100000, algorithm, rng=algorithm)
+    batched = np.column_stack([space_remaining.sum(axis=1), vehicle_count_by_type.sum(axis=1)])
+    per_deck = ferry_decks(10000, algorithm, seed=algorithm)
+    for a, b in zip(batched.T, per_deck.T):
+        standard_error = np.sqrt(a.var(ddof=1) / len(a) + b.var(ddof=1) / len(b))
+        assert abs(a.mean() - b.mean()) <= 4 * standard_error
@@ -0,0 +1,40 @@
+import numpy as np
+
+from sweep import FERRY_DIRECTORY, import_model
+
+
+def test_sobol_uniforms_shape_and_fallback():
+    ferry_qmc = import_model(FERRY_DIRECTORY, 'ferry_qmc')
+    uniforms = ferry_qmc.sobol_uniforms(64, rng=0, max_steps=2)
+    decks = np.arange(0, 64, 3)
+    for step in range(4):
+        u = uniforms(step, decks)
+        assert u.shape == (3, len(decks))
+        assert ((u >= 0) & (u < 1)).all()
+    # The first dimension of a scrambled Sobol sequence stratifies [0, 1)
+    first = uniforms(0, np.arange(64))[0]
+    assert (np.bincount((first * 64).astype(int), minlength=64) == 1).all()
+
+
+def test_replication_rows_follow_metrics():
+    ferry_qmc = import_model(FERRY_DIRECTORY, 'ferry_qmc')
+    rows = ferry_qmc.replication_rows(np.random.default_rng(0), 3, 256)
+    assert rows.shape == (3, len(ferry_qmc.METRICS))
+    assert np.allclose(rows[:, 2:].sum(axis=1), 100)
+
+
+def test_randomized_qmc_matches_exact_solution():
+    exact = import_model(FERRY_DIRECTORY, 'exact')
+    ferry_qmc = import_model(FERRY_DIRECTORY, 'ferry_qmc')
+    solution = exact.solve_one_deck_first()
+    stats = ferry_qmc.estimate(1024, 16, 1, 'sobol', seed=3)
+    standard_error = np.sqrt(stats.variance / stats.count)
+    exact_figures = [solution['wasted_space'] * 100 / 64, solution['vehicles_carried']]
+    assert (np.abs(stats.mean[:2] - exact_figures) <= 4 * standard_error[:2]).all()
+
+
+def test_randomized_qmc_beats_monte_carlo():
+    ferry_qmc = import_model(FERRY_DIRECTORY, 'ferry_qmc')
+    monte_carlo = ferry_qmc.estimate(1024, 16, 1, 'random', seed=4)
+    sobol = ferry_qmc.estimate(1024, 16, 1, 'sobol', seed=4)
+    assert sobol.variance[0] < monte_carlo.variance[0]
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from sweep import DUMPTRUCK_DIRECTORY, QUEUE_DIRECTORY, ROOT, import_model
+
+# Loads the module and fails if pandas or scipy came along with it
+CHECK_IMPORT = """
+import sys
+import {module}
+heavy = sorted(name for name in ('pandas', 'scipy') if name in sys.modules)
+assert not heavy, heavy
+"""
+
+
+@pytest.mark.parametrize('directory, module', [
+    (QUEUE_DIRECTORY, 'simulasi'), (QUEUE_DIRECTORY, 'simulasi_2_server'),
+    (QUEUE_DIRECTORY, 'simulasi_2_server_random_ali_badu'), (DUMPTRUCK_DIRECTORY, 'main2'),
+    (DUMPTRUCK_DIRECTORY, 'events')
+])
+def test_import_does_not_load_pandas_or_scipy(directory, module):
+    subprocess.run([sys.executable, '-c', CHECK_IMPORT.format(module=module)], cwd=os.path.join(ROOT, directory),
+                   check=True)
+
+
+def test_precomputed_tables_match_scipy():
+    from scipy.stats import norm
+
+    distributions = import_model(DUMPTRUCK_DIRECTORY, 'distributions')
+    x = np.linspace(-2, 2, 11)
+    assert np.allclose(distributions.normal_pdf(x), norm.pdf(x), rtol=1e-15, atol=0)
+    for start, end in [(1, 9), (2, 6), (10, 20), (10, 30)]:
+        times, probabilities = distributions.generate_times_and_probabilities(start, end)
+        assert times == list(range(start, end + 1))
+        assert probabilities == distributions.compute_times_and_probabilities(start, end)[1]
+        assert np.isclose(sum(probabilities), 1)
+
+
+def test_missing_table_is_computed(tmp_path, monkeypatch):
+    distributions = import_model(DUMPTRUCK_DIRECTORY, 'distributions')
+    path = str(tmp_path / 'distributions.json')
+    distributions.save_precomputed([(1, 9, 0.3)], path)
+    monkeypatch.setattr(distributions, 'PRECOMPUTED_PATH', path)
+    monkeypatch.setattr(distributions, '_precomputed', None)
+    assert distributions.generate_times_and_probabilities(3, 12, 0.25) == \
+        distributions.compute_times_and_probabilities(3, 12, 0.25)
+    assert list(distributions._precomputed) == ['1-9-0.3']
@@ -0,0 +1,30 @@
+import numpy as np
+
+from sweep import QUEUE_DIRECTORY, import_model
+
+
+def within(simulated, exact, standard_errors=4):
+    # Mean of the simulated samples is within a few standard errors of exact
+    simulated = np.asarray(simulated, dtype=float)
+    assert abs(simulated.mean() - exact) <= standard_errors * simulated.std(ddof=1) / np.sqrt(len(simulated))
+
+
+def test_finite_horizon_matches_simulation():
+    simulasi = import_model(QUEUE_DIRECTORY, 'simulasi')
+    lindley_solver = import_model(QUEUE_DIRECTORY, 'lindley_solver')
+    exact = lindley_solver.finite_horizon(20)
+    columns = simulasi.simulate_customers_vectorized(20, 100000, rng=6)
+    average_idle_time, average_waiting_time, _, _ = simulasi.report_vectorized(columns, 20)
+    within(average_idle_time, exact['average_idle_time'])
+    within(average_waiting_time, exact['average_waiting_time'])
+    for i in (1, 5, 19):
+        within(columns['waiting_time'][:, i], exact['mean_waits'][i])
+
+
+def test_steady_state_is_the_long_horizon_limit():
+    simulasi = import_model(QUEUE_DIRECTORY, 'simulasi')
+    lindley_solver = import_model(QUEUE_DIRECTORY, 'lindley_solver')
+    steady = lindley_solver.steady_state()
+    assert np.isclose(steady['waiting_pmf'].sum(), 1)
+    assert np.isclose(lindley_solver.finite_horizon(2000)['mean_waits'][-1], steady['mean_wait'], atol=1e-6)
+    assert np.isclose(steady['idle_time_per_customer'], simulasi.ARRIVAL_DIST.mean - simulasi.SERVICE_DIST.mean)
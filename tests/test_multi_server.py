@@ -0,0 +1,73 @@
+import random
+
+import numpy as np
+import pytest
+
+from sweep import QUEUE_DIRECTORY, import_model
+
+
+def original_ali_badu(num_customers, arrival_rolls, service_rolls, arrival_dist, service_dists):
+    # simulasi_2_server.simulate_customers before the N-server engine
+    customers = []
+    available = {"Ali": 0, "Badu": 0}
+    idle_time = {"Ali": 0, "Badu": 0}
+    counts = {"Ali": 0, "Badu": 0}
+    arrival_time = 0
+    for i in range(num_customers):
+        arrival_delay = 0 if i == 0 else arrival_dist.lookup(arrival_rolls[i])
+        arrival_time += arrival_delay
+        if arrival_time >= available["Ali"]:
+            server = "Ali"
+        elif arrival_time >= available["Badu"]:
+            server = "Badu"
+        else:
+            server = "Ali" if available["Ali"] <= available["Badu"] else "Badu"
+        counts[server] += 1
+        idle_time[server] += max(arrival_time - available[server], 0)
+        service_time = service_dists[server].lookup(service_rolls[i])
+        service_start = max(arrival_time, available[server])
+        available[server] = service_start + service_time
+        customers.append({
+            'customer': i + 1,
+            'arrival_delay': arrival_delay,
+            'arrival_time': arrival_time,
+            'service_start': service_start,
+            'service_time': service_time,
+            'service_end': service_start + service_time,
+            'server_assigned': server,
+            'waiting_time': service_start - arrival_time,
+            'idle_time_Ali': idle_time["Ali"],
+            'idle_time_Badu': idle_time["Badu"]
+        })
+    return customers, counts["Ali"], counts["Badu"], idle_time
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_first_listed_matches_original_ali_badu(seed):
+    ali_first = import_model(QUEUE_DIRECTORY, 'simulasi_2_server')
+    rng = np.random.default_rng(seed)
+    arrival_rolls = rng.integers(1, 101, 500).tolist()
+    service_rolls = rng.integers(1, 101, 500).tolist()
+    assert ali_first.simulate_customers(500, arrival_rolls, service_rolls) == original_ali_badu(
+        500, arrival_rolls, service_rolls, ali_first.ARRIVAL_DELAY_DIST, ali_first.SERVICE_DISTS)
+
+
+@pytest.mark.parametrize('policy', ["first-listed", "random", "fastest-expected", "least-busy"])
+def test_servers_work_one_customer_at_a_time(policy):
+    multi_server = import_model(QUEUE_DIRECTORY, 'multi_server')
+    ali_first = import_model(QUEUE_DIRECTORY, 'simulasi_2_server')
+    servers = ali_first.SERVERS + [("Cici", ali_first.SERVICE_DISTS["Ali"])]
+    customers, counts, idle_time = multi_server.simulate_multi_server(2000, servers, ali_first.ARRIVAL_DELAY_DIST,
+                                                                      policy, rng=random.Random(3))
+    assert sum(counts.values()) == 2000
+    available = {name: 0 for name, _ in servers}
+    busy_time = {name: 0 for name, _ in servers}
+    for customer in customers:
+        server = customer['server_assigned']
+        assert customer['service_start'] == max(customer['arrival_time'], available[server])
+        # A customer only waits when every server is busy
+        assert customer['waiting_time'] == max(0, min(available.values()) - customer['arrival_time'])
+        available[server] = customer['service_end']
+        busy_time[server] += customer['service_time']
+    for name in available:
+        assert idle_time[name] == available[name] - busy_time[name]
@@ -0,0 +1,74 @@
+import itertools
+import random
+
+import pytest
+
+from sweep import FERRY_DIRECTORY, import_model
+
+
+def longest_prefix(lengths, capacity):
+    # Longest prefix that some split into two columns fits, by brute force
+    best = 0
+    for k in range(1, len(lengths) + 1):
+        prefix = lengths[:k]
+        if any(sum(column) <= capacity and sum(prefix) - sum(column) <= capacity
+               for r in range(k + 1) for column in itertools.combinations(prefix, r)):
+            best = k
+        else:
+            break
+    return best
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_optimal_procedure_loads_the_longest_prefix(seed):
+    main = import_model(FERRY_DIRECTORY, 'main')
+    rng = random.Random(seed)
+    arrivals = [main.random_vehicle(rng) for _ in range(12)]
+    ferry_deck = main.FerryDeck(5)
+    loaded = 0
+    while loaded < len(arrivals) and ferry_deck.load_vehicle(arrivals[loaded]):
+        loaded += 1
+
+    assert loaded == longest_prefix([vehicle.decimetres for vehicle in arrivals], ferry_deck.length)
+    assert sorted(map(id, ferry_deck.deck[0] + ferry_deck.deck[1])) == sorted(map(id, arrivals[:loaded]))
+    for column, space in zip(ferry_deck.deck, ferry_deck.space_remaining):
+        assert space == ferry_deck.length - sum(vehicle.decimetres for vehicle in column) >= 0
+
+
+@pytest.mark.parametrize('algorithm', [1, 2, 3])
+def test_optimum_never_wastes_more_than_a_heuristic(algorithm):
+    main = import_model(FERRY_DIRECTORY, 'main')
+    rng = random.Random(algorithm)
+    for _ in range(500):
+        ferry_deck = main.FerryDeck(algorithm)
+        arrivals = []
+        while True:
+            arrivals.append(main.random_vehicle(rng))
+            if not ferry_deck.load_vehicle(arrivals[-1]):
+                break
+        optimal_deck = main.FerryDeck(5)
+        for vehicle in itertools.chain(arrivals, iter(lambda: main.random_vehicle(rng), None)):
+            if not optimal_deck.load_vehicle(vehicle):
+                break
+        assert optimal_deck.vehicle_count >= ferry_deck.vehicle_count
+        assert optimal_deck.wasted_space <= ferry_deck.wasted_space
+
+
+def test_paired_optimum_leaves_the_heuristic_stream_alone(capsys):
+    main = import_model(FERRY_DIRECTORY, 'main')
+    state = random.getstate()
+    try:
+        random.seed(5)
+        main.simulate(300, 3)
+        simulated = capsys.readouterr().out
+
+        random.seed(5)
+        total_vehicles_carried = 0
+        for _ in range(300):
+            ferry_deck = main.FerryDeck(3)
+            while ferry_deck.load_vehicle(main.random_vehicle()):
+                pass
+            total_vehicles_carried += ferry_deck.vehicle_count
+    finally:
+        random.setstate(state)
+    assert f'Average vehicles carried: {total_vehicles_carried / 300}\n' in simulated
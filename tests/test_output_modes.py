@@ -0,0 +1,57 @@
+import random
+
+import numpy as np
+import pytest
+
+from sweep import QUEUE_DIRECTORY, import_model
+
+
+def simulate_seeded(simulate, seed, *args, **kwargs):
+    # The scripts draw from the global random, restored afterwards
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        return simulate(*args, **kwargs)
+    finally:
+        random.setstate(state)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_single_server_outputs_agree(seed):
+    import pandas as pd
+
+    simulasi = import_model(QUEUE_DIRECTORY, 'simulasi')
+    records = simulate_seeded(simulasi.simulate_customers, seed, 300)
+    columns = simulate_seeded(simulasi.simulate_customers, seed, 300, output="columns")
+    summary = simulate_seeded(simulasi.simulate_customers, seed, 300, output="summary")
+
+    assert all(values.dtype == np.int32 for values in columns.values())
+    pd.testing.assert_frame_equal(pd.DataFrame(columns), pd.DataFrame(records), check_dtype=False)
+    assert simulasi.report_summary(summary, 300) == simulasi.report(pd.DataFrame(records), 300)
+
+
+@pytest.mark.parametrize('script', ['simulasi_2_server', 'simulasi_2_server_random_ali_badu'])
+def test_two_server_outputs_agree(script):
+    import pandas as pd
+
+    model = import_model(QUEUE_DIRECTORY, script)
+    multi_server = import_model(QUEUE_DIRECTORY, 'multi_server')
+    records, *counts = model.simulate_customers(300, rng=random.Random(1))
+    columns, *column_counts = model.simulate_customers(300, output="columns", rng=random.Random(1))
+    summary, *summary_counts = model.simulate_customers(300, output="summary", rng=random.Random(1))
+    assert counts == column_counts == summary_counts
+
+    assert columns['server_assigned'].dtype == np.uint8
+    frame = multi_server.columns_frame(columns)
+    frame['server_assigned'] = frame['server_assigned'].astype(object)
+    pd.testing.assert_frame_equal(frame[list(records[0])], pd.DataFrame(records), check_dtype=False)
+
+    expected = model.report_metrics(model.report(pd.DataFrame(records), 300, *counts))
+    assert model.report_metrics(model.report(columns, 300, *counts)) == expected
+    assert model.report_metrics(model.report(summary, 300, *counts)) == expected
+
+
+def test_unknown_output_is_rejected():
+    simulasi = import_model(QUEUE_DIRECTORY, 'simulasi')
+    with pytest.raises(ValueError):
+        simulasi.simulate_customers(5, output="frame")
@@ -0,0 +1,23 @@
+from functools import partial
+
+from simcore.replication import run_replications
+from sweep import QUEUE_DIRECTORY, import_model
+
+
+def test_replications_do_not_depend_on_workers():
+    simulasi = import_model(QUEUE_DIRECTORY, 'simulasi')
+    replicate = partial(simulasi.replicate, 20)
+    serial = run_replications(replicate, 40, seed=3, workers=1)
+    assert run_replications(replicate, 40, seed=3, workers=3) == serial
+
+
+def test_start_continues_the_replications():
+    simulasi = import_model(QUEUE_DIRECTORY, 'simulasi')
+    replicate = partial(simulasi.replicate, 20)
+    assert run_replications(replicate, 5, seed=3, workers=1, start=5) == \
+        run_replications(replicate, 10, seed=3, workers=1)[5:]
+
+
+def test_parallel_report_does_not_depend_on_workers():
+    simulasi = import_model(QUEUE_DIRECTORY, 'simulasi')
+    assert simulasi.simulate_parallel(20, 60, seed=4, workers=3) == simulasi.simulate_parallel(20, 60, seed=4, workers=1)
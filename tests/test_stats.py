@@ -0,0 +1,60 @@
+from functools import partial
+
+import numpy as np
+from scipy.stats import t
+
+from simcore.replication import run_replications
+from simcore.stats import OnlineStats, run_until_precise
+from sweep import QUEUE_DIRECTORY, import_model
+
+NAMES = ['a', 'b', 'c']
+
+
+def test_online_stats_match_numpy():
+    values = np.random.default_rng(0).normal([1.0, -2.0, 50.0], [1.0, 0.1, 20.0], size=(500, 3))
+    stats = OnlineStats(NAMES)
+    for row in values:
+        stats.update(row)
+    assert stats.count == len(values)
+    np.testing.assert_allclose(stats.mean, values.mean(axis=0))
+    np.testing.assert_allclose(stats.variance, values.var(axis=0, ddof=1))
+    np.testing.assert_allclose(stats.half_width(0.9),
+                               t.ppf(0.95, len(values) - 1) * values.std(axis=0, ddof=1) / np.sqrt(len(values)))
+
+
+def test_block_updates_match_single_updates():
+    values = np.random.default_rng(1).exponential(size=(1000, 3))
+    single = OnlineStats(NAMES)
+    for row in values:
+        single.update(row)
+    blocks = OnlineStats(NAMES)
+    for start, end in [(0, 1), (1, 250), (250, 250), (250, 1000)]:
+        blocks.update_many(values[start:end])
+    assert blocks.count == single.count
+    np.testing.assert_allclose(blocks.mean, single.mean)
+    np.testing.assert_allclose(blocks.variance, single.variance)
+
+
+def test_run_until_precise_stops_at_the_target():
+    rng = np.random.default_rng(2)
+    stats = run_until_precise(lambda: rng.normal(size=3), NAMES, 0.1)
+    assert np.all(stats.half_width() <= 0.1)
+    # Unit variance needs about (1.96 / 0.1) ** 2 = 384 replications
+    assert 300 < stats.count < 500
+
+
+def test_run_until_precise_stops_at_the_cap():
+    rng = np.random.default_rng(3)
+    stats = run_until_precise(lambda: rng.normal(size=3), NAMES, 1e-6, max_replications=50)
+    assert stats.count == 50
+
+
+def test_streamed_report_does_not_depend_on_workers():
+    simulasi = import_model(QUEUE_DIRECTORY, 'simulasi')
+    summaries = []
+    for workers in (1, 3):
+        stats = OnlineStats(simulasi.REPORT_METRICS)
+        for result in run_replications(partial(simulasi.replicate, 20), 50, seed=5, workers=workers):
+            stats.update(result)
+        summaries.append(stats.summary())
+    assert summaries[0] == summaries[1]
@@ -0,0 +1,76 @@
+import os
+
+import numpy as np
+import pytest
+
+from simcore.store import ResultStore, ResultWriter, write_batches
+from sweep import FERRY_DIRECTORY, QUEUE_DIRECTORY, import_model
+
+TABLES = {'samples': [('index', '<u4'), ('value', '<f8')]}
+
+
+def test_round_trip_grows_and_trims(tmp_path):
+    directory = str(tmp_path / 'run')
+    with ResultWriter(directory, 'test', TABLES, seed=5, metadata={'note': 'x'}, capacity=4) as writer:
+        for start in range(0, 10, 3):
+            index = np.arange(start, min(start + 3, 10))
+            writer.append('samples', {'index': index, 'value': index / 2})
+
+    store = ResultStore(directory)
+    assert store.complete
+    assert store.model == 'test'
+    assert store.header['metadata'] == {'note': 'x'}
+    assert store.seed_sequence.entropy == 5
+    samples = store.table('samples')
+    np.testing.assert_array_equal(samples['index'], np.arange(10))
+    np.testing.assert_array_equal(samples['value'], np.arange(10) / 2)
+    assert os.path.getsize(os.path.join(directory, 'samples.bin')) == 10 * samples.dtype.itemsize
+    assert [len(chunk) for chunk in store.chunks('samples', 4)] == [4, 4, 2]
+
+
+def test_error_inside_with_leaves_store_incomplete(tmp_path):
+    directory = str(tmp_path / 'run')
+    with pytest.raises(RuntimeError):
+        with ResultWriter(directory, 'test', TABLES, capacity=100) as writer:
+            writer.append('samples', {'index': np.arange(3), 'value': np.ones(3)})
+            raise RuntimeError("killed")
+
+    store = ResultStore(directory)
+    assert not store.complete
+    # The rows written before the error are still flushed and trimmed
+    np.testing.assert_array_equal(store.table('samples')['index'], np.arange(3))
+    assert os.path.getsize(os.path.join(directory, 'samples.bin')) == 3 * store.table('samples').dtype.itemsize
+
+
+def test_write_batches_reproduces_from_stored_seed(tmp_path):
+    def write_batch(writer, rng, index):
+        writer.append('samples', {'index': index, 'value': rng.random(len(index))})
+
+    write_batches(str(tmp_path / 'run'), 'test', TABLES, write_batch, 25, seed=None, batch_size=10)
+    store = ResultStore(str(tmp_path / 'run'))
+    assert store.complete
+    np.testing.assert_array_equal(store.table('samples')['index'], np.arange(25))
+    rng = np.random.default_rng(store.seed_sequence)
+    expected = np.concatenate([rng.random(10), rng.random(10), rng.random(5)])
+    np.testing.assert_array_equal(store.table('samples')['value'], expected)
+
+
+def test_model_stores_match_their_simulations(tmp_path):
+    simulasi = import_model(QUEUE_DIRECTORY, 'simulasi')
+    simulasi.simulate_to_store(str(tmp_path / 'simulasi'), 20, 30, seed=2, batch_size=30)
+    store = ResultStore(str(tmp_path / 'simulasi'))
+    columns = simulasi.simulate_customers_vectorized(20, 30, np.random.default_rng(store.seed_sequence))
+    np.testing.assert_array_equal(store.table('customers')['waiting_time'], columns['waiting_time'].ravel())
+    np.testing.assert_array_equal(store.table('replications')['average_waiting_time'],
+                                  simulasi.report_vectorized(columns, 20)[1])
+
+    ferry_batch = import_model(FERRY_DIRECTORY, 'ferry_batch')
+    ferry_batch.simulate_to_store(str(tmp_path / 'ferry'), 500, seed=3, batch_size=200)
+    store = ResultStore(str(tmp_path / 'ferry'))
+    decks, vehicles = store.table('decks'), store.table('vehicles')
+    assert len(decks) == 500
+    # Every deck's vehicles add up to the space it used
+    used = np.zeros((500, 2), dtype=np.int64)
+    np.add.at(used, (vehicles['deck'], vehicles['column']), vehicles['length'])
+    np.testing.assert_array_equal(used[:, 0] + decks['space_remaining_0'], ferry_batch.DECK_LENGTH_DM)
+    np.testing.assert_array_equal(used[:, 1] + decks['space_remaining_1'], ferry_batch.DECK_LENGTH_DM)
@@ -0,0 +1,43 @@
+import csv
+
+import numpy as np
+import pytest
+
+import sweep
+from simcore.replication import replication_seeds
+from simcore.sweep import expand_grid
+from sweep import QUEUE_DIRECTORY, import_model
+
+
+def test_expand_grid_varies_last_key_fastest():
+    assert expand_grid({'a': [1, 2], 'b': ['x', 'y']}) == [
+        {'a': 1, 'b': 'x'}, {'a': 1, 'b': 'y'}, {'a': 2, 'b': 'x'}, {'a': 2, 'b': 'y'}]
+
+
+def test_sweep_row_is_the_mean_of_the_model_rows():
+    simulasi = import_model(QUEUE_DIRECTORY, 'simulasi')
+    (row,) = sweep.sweep('simulasi', {'replications': [300], 'customers': [20]}, seed=4, workers=1)
+    (seed_sequence,) = replication_seeds(1, np.random.SeedSequence(4))
+    rows = simulasi.replication_rows(np.random.default_rng(seed_sequence), 300, 20)
+    assert row['replications'] == 300
+    assert np.allclose([row[name] for name in simulasi.REPORT_METRICS], rows.mean(axis=0))
+
+
+@pytest.mark.parametrize('model, grid', [
+    ('multi_server', {'replications': [2500], 'customers': [30], 'servers': [2, 3],
+                      'policy': ["first-listed", "least-busy"]}),
+    ('dumptruck', {'replications': [1500], 'trucks': [5], 'loaders': [1, 2], 'scalers': [1], 'horizon': [50]})
+])
+def test_sweep_does_not_depend_on_workers(model, grid):
+    assert sweep.sweep(model, grid, seed=4, workers=3) == sweep.sweep(model, grid, seed=4, workers=1)
+
+
+def test_command_line_writes_one_row_per_grid_point(tmp_path):
+    path = str(tmp_path / 'sweep.csv')
+    sweep.main(['ferry', '--replications', '4', '--decks', '256', '--procedure', '1', '2',
+                '--sampling', 'sobol', 'random', '--workers', '1', '--output', path])
+    with open(path, newline='') as file:
+        rows = list(csv.DictReader(file))
+    assert [(row['procedure'], row['sampling']) for row in rows] == [
+        ('1', 'sobol'), ('1', 'random'), ('2', 'sobol'), ('2', 'random')]
+    assert all(row['replications'] == '4' for row in rows)
@@ -0,0 +1,47 @@
+import io
+import os
+import random
+
+import numpy as np
+import pytest
+
+from sweep import DUMPTRUCK_DIRECTORY, import_model
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+
+@pytest.mark.parametrize('seed', [1, 2])
+def test_rendered_trace_matches_console_log(seed, tmp_path):
+    # Golden files are the per-time unit output of main2.py before the
+    # binary trace, DumpTruckSystem(rng=random.Random(seed)).run(60, verbose=True)
+    main2 = import_model(DUMPTRUCK_DIRECTORY, 'main2')
+    tracing = import_model(DUMPTRUCK_DIRECTORY, 'tracing')
+    render_trace = import_model(DUMPTRUCK_DIRECTORY, 'render_trace')
+    system = main2.DumpTruckSystem(rng=random.Random(seed))
+    path = str(tmp_path / 'trace.bin')
+    with tracing.TraceWriter(path, system.num_trucks, system.num_loaders, system.num_scalers, 60) as trace:
+        system.run(60, trace)
+
+    out = io.StringIO()
+    render_trace.render_trace(path, out)
+    with open(os.path.join(DATA, f'main2_trace_seed{seed}.txt')) as file:
+        assert out.getvalue() == file.read()
+
+
+def test_trace_spans_several_blocks(tmp_path):
+    main2 = import_model(DUMPTRUCK_DIRECTORY, 'main2')
+    tracing = import_model(DUMPTRUCK_DIRECTORY, 'tracing')
+    path = str(tmp_path / 'trace.bin')
+    with tracing.TraceWriter(path, 10, 2, 1, 5000, block_records=100) as trace:
+        main2.DumpTruckSystem(rng=random.Random(3)).run(5000, trace)
+    header, records = tracing.read_trace(path)
+    assert header['horizon'] == 5000
+    assert len(records) > 1000
+    assert np.all(np.diff(records['tick'].astype(np.int64)) >= 0)
+    assert records['tick'][-1] < 5000
+
+
+def test_trace_overhead():
+    # A few percent on a quiet machine, the bound leaves room for noisy ones
+    benchmark_trace = import_model(DUMPTRUCK_DIRECTORY, 'benchmark_trace')
+    assert benchmark_trace.trace_overhead(horizon=20000, repeats=9) < 0.5
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from sweep import QUEUE_DIRECTORY, import_model
+
+
+def test_lockstep_customers_match_script():
+    two_server_batch = import_model(QUEUE_DIRECTORY, 'two_server_batch')
+    ali_first = import_model(QUEUE_DIRECTORY, 'simulasi_2_server')
+    rng = np.random.default_rng(4)
+    arrival_rolls = rng.integers(1, 101, (6, 200))
+    service_rolls = rng.integers(1, 101, (6, 200))
+    results, customers = two_server_batch.simulate_batch(200, 6, arrival_rolls=arrival_rolls,
+                                                         service_rolls=service_rolls, record_customers=True)
+    for replication in range(6):
+        columns, ali_count, badu_count, idle_time = ali_first.simulate_customers(
+            200, arrival_rolls[replication].tolist(), service_rolls[replication].tolist(), output="columns")
+        for name in ('arrival_time', 'service_start', 'service_end', 'server_assigned', 'waiting_time'):
+            np.testing.assert_array_equal(customers[name][replication], columns[name])
+        report = ali_first.report_metrics(ali_first.report(columns, 200, ali_count, badu_count, idle_time))
+        assert np.allclose(two_server_batch.batch_report_metrics(results)[replication], report)
+
+
+@pytest.mark.parametrize('policy', ["first-listed", "random"])
+def test_lockstep_matches_heap_engine(policy):
+    multi_server = import_model(QUEUE_DIRECTORY, 'multi_server')
+    two_server_batch = import_model(QUEUE_DIRECTORY, 'two_server_batch')
+    ali_first = import_model(QUEUE_DIRECTORY, 'simulasi_2_server')
+    lockstep = two_server_batch.summary_rows(np.random.default_rng(5), 300, 50, policy)
+    heap = multi_server.replication_rows(np.random.default_rng(5), 300, 50, ali_first.SERVERS,
+                                         ali_first.ARRIVAL_DELAY_DIST, policy)
+    if policy == "first-listed":
+        np.testing.assert_array_equal(lockstep, heap)
+    else:
+        # Tie-break coins come from different streams, the customers do not
+        np.testing.assert_array_equal(lockstep[:, 3], heap[:, 3])
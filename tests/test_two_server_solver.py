@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from sweep import QUEUE_DIRECTORY, import_model
+
+
+def within(simulated, exact, standard_errors=4):
+    # Mean of the simulated samples is within a few standard errors of exact
+    simulated = np.asarray(simulated, dtype=float)
+    assert abs(simulated.mean() - exact) <= standard_errors * simulated.std(ddof=1) / np.sqrt(len(simulated))
+
+
+@pytest.mark.parametrize('policy', ["Ali first", "Random tie-break"])
+def test_transition_matrix_is_stochastic(policy):
+    two_server_solver = import_model(QUEUE_DIRECTORY, 'two_server_solver')
+    transition = two_server_solver.transition_matrix(policy, 8).tocsr()
+    assert np.allclose(np.asarray(transition.sum(axis=1)).ravel(), 1)
+    pi = two_server_solver.stationary_distribution(transition)
+    assert np.isclose(pi.sum(), 1)
+    assert np.allclose(pi @ transition, pi)
+
+
+@pytest.mark.parametrize('policy, solver_policy', [("first-listed", "Ali first"), ("random", "Random tie-break")])
+def test_solver_matches_simulation(policy, solver_policy):
+    two_server_batch = import_model(QUEUE_DIRECTORY, 'two_server_batch')
+    two_server_solver = import_model(QUEUE_DIRECTORY, 'two_server_solver')
+    exact = two_server_solver.solve(solver_policy)
+    assert np.isclose(sum(exact['share'].values()), 1)
+    _, customers = two_server_batch.simulate_batch(400, 2000, policy, rng=7, record_customers=True)
+    # Per-replication averages after a warm-up, independent across replications
+    steady = slice(100, None)
+    within(customers['waiting_time'][:, steady].mean(axis=1), exact['mean_wait'])
+    within((customers['server_assigned'][:, steady] == 0).mean(axis=1), exact['share']["Ali"])
+    within((customers['waiting_time'][:, steady] == 0).mean(axis=1), exact['probability_no_wait'])